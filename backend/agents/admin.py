@@ -1,7 +1,54 @@
+import json
 from django.contrib import admin
-from .models import CallRecording, ExtractedClientInfo, Client
+from django.utils.html import format_html
+from .models import CallRecording, ExtractedClientInfo, Client, RawLLMOutput, RecordingStageTransition, TranscriptCache, TRANSCRIPT_FIELDS
 
 # Register your models here.
-admin.site.register(CallRecording)
-admin.site.register(ExtractedClientInfo)
-admin.site.register(Client)
\ No newline at end of file
+# Changelists join whatever __str__/list_display read, and foreign keys to large tables use raw id
+# inputs, so neither a list page nor a change form runs a query per row.
+
+@admin.register(CallRecording)
+class CallRecordingAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'upload_timestamp', 'updated_at')
+    list_filter = ('status',)
+    list_select_related = ('uploaded_by',) # __str__ shows the uploader's username
+    readonly_fields = TRANSCRIPT_FIELDS
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        # The change form shows the transcripts; the changelist leaves them deferred
+        if request.resolver_match and request.resolver_match.url_name == 'agents_callrecording_change':
+            queryset = queryset.with_transcripts()
+        return queryset
+
+
+@admin.register(ExtractedClientInfo)
+class ExtractedClientInfoAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'client_name', 'company_name', 'approved_by', 'updated_at')
+    list_filter = ('is_approved', 'is_speculative')
+    list_select_related = ('approved_by',)
+    raw_id_fields = ('call_recording', 'approved_by')
+    readonly_fields = ('raw_llm_output',)
+
+    @admin.display(description='Raw LLM output')
+    def raw_llm_output(self, obj):
+        raw_output = RawLLMOutput.objects.filter(extracted_info=obj).first() if obj.pk else None
+        if raw_output is None:
+            return '-'
+        return format_html('<pre>{}</pre>', json.dumps(raw_output.value, indent=2, ensure_ascii=False))
+
+
+@admin.register(Client)
+class ClientAdmin(admin.ModelAdmin):
+    list_display = ('name', 'company', 'email', 'onboard_date')
+    raw_id_fields = ('original_extraction',)
+
+
+@admin.register(RecordingStageTransition)
+class RecordingStageTransitionAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'stage', 'timestamp')
+    list_filter = ('stage',)
+    raw_id_fields = ('call_recording',)
+
+
+admin.site.register(TranscriptCache)
@@ -0,0 +1,160 @@
+# agents/async_views.py
+import asyncio
+import functools
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+from .conditional import LIST_STATE, ConditionalGetMixin, add_validators, changed_since, conditional_response, delta_page, list_validators
+from .pagination import KeysetPagination, encode_cursor
+from .serializers import CallRecordingListSerializer, ExtractedClientInfoSerializer
+from .views import CallRecordingViewSet, ExtractedClientInfoViewSet, call_recordings_for, extracted_info_for, get_user_status
+
+# Async versions of the read endpoints every open dashboard polls. DRF views are sync only, so
+# under an ASGI server each request to them holds a worker thread for its whole duration; these
+# await the async ORM instead. Responses (bodies, ETag/304, ?since= deltas, keyset pages, auth
+# errors) match the DRF views they stand in for. Other methods on the same URLs go to those views.
+
+# The DRF views for the same URLs, for the methods served there (create, OPTIONS)
+call_recordings_sync = CallRecordingViewSet.as_view({'get': 'list', 'post': 'create'}, basename='call-recording', detail=False)
+extracted_info_sync = ExtractedClientInfoViewSet.as_view({'get': 'list', 'post': 'create'}, basename='extracted-info', detail=False)
+
+
+# Async ORM calls run in a thread of their own per request, each with its own database connection
+# (closed when the request is done), so a burst of polls would open as many connections as there are
+# requests in flight. Bounded per process by ASYNC_READ_VIEWS_MAX_DB_CONNECTIONS.
+_db_slots = asyncio.Semaphore(settings.ASYNC_READ_VIEWS_MAX_DB_CONNECTIONS)
+
+
+def _release_connections():
+    # What the request_finished handler (close_old_connections) does, minus connections inside a
+    # transaction (TestCase wraps each test in one)
+    for conn in connections.all(initialized_only=True):
+        if not conn.in_atomic_block:
+            conn.close_if_unusable_or_obsolete()
+
+
+def json_response(data, status=200):
+    # Compact and unescaped, byte for byte what DRF's JSONRenderer produces
+    response = JsonResponse(
+        data, status=status, safe=False, encoder=JSONEncoder,
+        json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')},
+    )
+    patch_vary_headers(response, ('Accept',)) # as after DRF's content negotiation
+    return response
+
+
+async def authenticate(request):
+    """
+    Async equivalent of the REST_FRAMEWORK authentication and permission classes: a DRF token in
+    the Authorization header, otherwise the session, and the user must be authenticated.
+    """
+    auth = request.headers.get('Authorization', '').split()
+    if auth and auth[0].lower() == 'token':
+        # Same messages as TokenAuthentication
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed("Invalid token header. No credentials provided.")
+        if len(auth) > 2:
+            raise exceptions.AuthenticationFailed("Invalid token header. Token string should not contain spaces.")
+        try:
+            token = await Token.objects.select_related('user').aget(key=auth[1])
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed("Invalid token.")
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed("User inactive or deleted.")
+        return token.user
+
+    user = await request.auser()
+    if not user.is_authenticated:
+        raise exceptions.NotAuthenticated()
+    return user
+
+
+def async_api_view(sync_view):
+    """
+    Serves GET/HEAD with the decorated async view, given an authenticated DRF Request, and
+    turns DRF exceptions into the same error responses DRF sends. Any other method is passed
+    to sync_view, the DRF view for the same URL, which does its own authentication and CSRF checks.
+    """
+    def decorator(view):
+        @csrf_exempt
+        @functools.wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+            async with _db_slots:
+                try:
+                    user = await authenticate(request)
+                    request = Request(request)
+                    request.user = user
+                    return await view(request, *args, **kwargs)
+                except exceptions.APIException as exc:
+                    response = json_response({'detail': exc.detail}, status=exc.status_code)
+                    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                        response['WWW-Authenticate'] = 'Token'
+                    return response
+                finally:
+                    # Hand the connection back before the slot, rather than when the response is sent
+                    await sync_to_async(_release_connections)()
+        return wrapped
+    return decorator
+
+
+async def conditional_list(request, queryset, serializer_class, paginator=None):
+    """
+    ConditionalGetMixin.list through the async ORM: 304 when the client's copy is current,
+    ?since= deltas, otherwise the (optionally paginated) list with validators.
+    """
+    context = {'request': request}
+    since = request.query_params.get(ConditionalGetMixin.delta_cursor_param)
+    if since is not None:
+        limit = ConditionalGetMixin.delta_page_size
+        changed, next_since, has_more = delta_page([row async for row in changed_since(queryset, since, limit)], since, limit)
+        serializer = serializer_class(changed, many=True, context=context)
+        response = json_response({'results': serializer.data, 'next_since': next_since, 'has_more': has_more})
+        patch_vary_headers(response, ('Authorization', 'Cookie'))
+        return response
+
+    etag, last_modified = list_validators(request, await queryset.order_by().aaggregate(**LIST_STATE))
+    not_modified = conditional_response(request, etag, last_modified)
+    if not_modified is not None:
+        patch_vary_headers(not_modified, ('Accept',)) # DRF adds it to every response, 304s included
+        return not_modified
+
+    if paginator is None:
+        data = serializer_class([row async for row in queryset], many=True, context=context).data
+    else:
+        page = await paginator.apaginate_queryset(queryset, request)
+        data = paginator.get_paginated_data(serializer_class(page, many=True, context=context).data)
+    response = json_response(data)
+    if last_modified is not None:
+        # Starting point for the client's first ?since= poll
+        response['X-Since-Cursor'] = encode_cursor(last_modified, 0)
+    return add_validators(response, etag, last_modified)
+
+
+@async_api_view(call_recordings_sync)
+async def call_recording_list(request):
+    queryset = call_recordings_for(request.user, list_rows=True)
+    return await conditional_list(request, queryset, CallRecordingListSerializer, paginator=KeysetPagination())
+
+
+@async_api_view(extracted_info_sync)
+async def extracted_info_list(request):
+    return await conditional_list(request, extracted_info_for(request.user), ExtractedClientInfoSerializer)
+
+
+@async_api_view(get_user_status)
+async def user_status(request):
+    user = request.user
+    return json_response({
+        'username': user.username,
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser
+    })
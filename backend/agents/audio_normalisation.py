@@ -0,0 +1,164 @@
+# agents/audio_normalisation.py
+import os
+import subprocess
+import numpy as np
+
+SAMPLE_RATE = 16000 # what Whisper resamples everything to anyway
+FRAME_SECONDS = 0.03 # VAD frame length
+NOISE_FLOOR_MARGIN_DB = 10 # frames this far above the recording's own noise floor count as speech
+SPEECH_HEADROOM_DB = 20 # ... but never closer than this to the loud (speech) frames
+BLOCK_FRAMES = 2000 # frames read, measured and encoded at a time (60 s, ~1.9 MB of PCM)
+
+# Output encodings (file extension -> ffmpeg codec arguments). Opus at speech bitrates is a
+# fraction of the size of the upload; FLAC is lossless if transcription quality ever suffers.
+# Opus compression level 0 encodes ~4x faster than the default 10 for <2% bigger files.
+ENCODINGS = {
+    'ogg': ['-c:a', 'libopus', '-application', 'voip', '-compression_level', '0'],
+    'flac': ['-c:a', 'flac', '-compression_level', '8'],
+}
+
+
+def _decode_args(audio_file_path):
+    return ['ffmpeg', '-v', 'error', '-i', audio_file_path, '-vn', '-ac', '1', '-ar', str(SAMPLE_RATE),
+            '-f', 's16le', '-acodec', 'pcm_s16le', '-']
+
+
+def _encode_args(output_path, fmt, bitrate):
+    args = list(ENCODINGS[fmt])
+    if fmt == 'ogg':
+        args += ['-b:a', bitrate]
+    return ['ffmpeg', '-v', 'error', '-y', '-f', 's16le', '-ar', str(SAMPLE_RATE), '-ac', '1', '-i', '-', *args, output_path]
+
+
+def _wait(process):
+    # check=True for a Popen whose pipes the caller has drained
+    stderr = process.stderr.read() if process.stderr else b''
+    if process.wait():
+        raise subprocess.CalledProcessError(process.returncode, process.args, stderr=stderr)
+
+
+def pcm_blocks(stream, block_samples):
+    """
+    Reads 16-bit PCM from a binary stream block_samples at a time, as int16 NumPy arrays.
+    """
+    while block := stream.read(block_samples * 2):
+        yield np.frombuffer(block, dtype=np.int16)
+
+
+def decode_audio(audio_file_path):
+    """
+    Decodes any format ffmpeg reads to 16 kHz mono 16-bit PCM. Returns an int16 NumPy array
+    of the whole recording; normalise_audio streams instead.
+    """
+    result = subprocess.run(_decode_args(audio_file_path), capture_output=True, check=True)
+    return np.frombuffer(result.stdout, dtype=np.int16)
+
+
+def frame_levels(samples, frame_length):
+    """
+    RMS level of each whole frame, in dBFS.
+    """
+    count = len(samples) // frame_length
+    frames = samples[:count * frame_length].astype(np.float32).reshape(count, frame_length) / 32768.0
+    return 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+
+
+def speech_frames(levels, threshold_db, padding_frames):
+    """
+    Energy VAD: frames above the threshold (or NOISE_FLOOR_MARGIN_DB above the recording's noise
+    floor, whichever is higher), widened by padding_frames on each side so word edges survive.
+    The adaptive part never rises within SPEECH_HEADROOM_DB of the loud frames, so a recording
+    without pauses keeps its quieter speech.
+    """
+    if not len(levels):
+        return np.zeros(0, dtype=bool)
+    noise_floor, loud = np.percentile(levels, [10, 90])
+    threshold = max(threshold_db, min(noise_floor + NOISE_FLOOR_MARGIN_DB, loud - SPEECH_HEADROOM_DB))
+    speech = levels > threshold
+    if padding_frames:
+        speech = np.convolve(speech, np.ones(2 * padding_frames + 1), mode='same') > 0
+    return speech
+
+
+def keep_frames(speech, max_silence_frames):
+    """
+    Which frames to keep: all speech, internal silences shortened to max_silence_frames, and no
+    leading or trailing silence. Vectorised run-length bookkeeping, no per-frame Python loop.
+    """
+    count = len(speech)
+    if not count or not speech.any():
+        return np.ones(count, dtype=bool) # nothing recognised as speech: leave the audio alone
+
+    changes = np.flatnonzero(np.diff(speech.astype(np.int8))) + 1
+    run_starts = np.concatenate(([0], changes))
+    run_ids = np.zeros(count, dtype=np.int64)
+    run_ids[changes] = 1
+    run_ids = np.cumsum(run_ids)
+    position_in_run = np.arange(count) - run_starts[run_ids]
+
+    keep = speech | (position_in_run < max_silence_frames)
+    if not speech[0]:
+        keep[run_ids == 0] = False
+    if not speech[-1]:
+        keep[run_ids == run_ids[-1]] = False
+    return keep
+
+
+def normalise_audio(audio_file_path, output_dir, threshold_db=-40.0, max_silence_seconds=1.0,
+                    padding_seconds=0.2, fmt='ogg', bitrate='24k'):
+    """
+    Decodes, downmixes and resamples a recording to 16 kHz mono, drops leading/trailing silence,
+    cuts internal silences down to max_silence_seconds and encodes it compactly into output_dir.
+    Returns (normalised file path, report of bytes and seconds saved).
+
+    Audio is handled BLOCK_FRAMES at a time, so memory stays flat however long the call is: the
+    first pass spools the decoded PCM to disk and keeps only per-frame levels, the VAD runs on
+    those, and the second pass streams the kept samples from the spool into the encoder.
+    """
+    frame_length = int(SAMPLE_RATE * FRAME_SECONDS)
+    block_samples = BLOCK_FRAMES * frame_length
+    pcm_path = os.path.join(output_dir, 'decoded.pcm')
+    output_path = os.path.join(output_dir, f"normalised.{fmt}")
+
+    levels = []
+    input_samples = 0
+    decoder = subprocess.Popen(_decode_args(audio_file_path), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    with decoder, open(pcm_path, 'wb') as pcm:
+        for block in pcm_blocks(decoder.stdout, block_samples):
+            pcm.write(block)
+            levels.append(frame_levels(block, frame_length)) # blocks are whole frames, bar the last
+            input_samples += len(block)
+        _wait(decoder)
+
+    levels = np.concatenate(levels) if levels else np.zeros(0, dtype=np.float32)
+    speech = speech_frames(levels, threshold_db, int(round(padding_seconds / FRAME_SECONDS)))
+    keep = keep_frames(speech, max(1, int(round(max_silence_seconds / FRAME_SECONDS))))
+    keep_tail = len(keep) == 0 or keep[-1] # the partial last frame goes with the last whole one
+
+    output_samples = 0
+    encoder = subprocess.Popen(_encode_args(output_path, fmt, bitrate), stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    with encoder, open(pcm_path, 'rb') as pcm:
+        for index, block in enumerate(pcm_blocks(pcm, block_samples)):
+            frames = keep[index * BLOCK_FRAMES:(index + 1) * BLOCK_FRAMES]
+            whole = len(frames) * frame_length
+            kept = block[:whole][np.repeat(frames, frame_length)]
+            if keep_tail and len(block) > whole:
+                kept = np.concatenate((kept, block[whole:]))
+            encoder.stdin.write(kept.tobytes())
+            output_samples += len(kept)
+        encoder.stdin.close()
+        _wait(encoder)
+    os.remove(pcm_path)
+
+    input_bytes = os.path.getsize(audio_file_path)
+    output_bytes = os.path.getsize(output_path)
+    input_seconds = input_samples / SAMPLE_RATE
+    output_seconds = output_samples / SAMPLE_RATE
+    return output_path, {
+        'input_bytes': input_bytes,
+        'output_bytes': output_bytes,
+        'bytes_saved': input_bytes - output_bytes,
+        'input_seconds': round(input_seconds, 2),
+        'output_seconds': round(output_seconds, 2),
+        'seconds_saved': round(input_seconds - output_seconds, 2),
+    }
@@ -0,0 +1,103 @@
+# agents/compaction.py
+import re
+from .extraction import estimate_tokens
+
+# Disfluencies Whisper writes out verbatim. Multi-word fillers are only removed when set off by
+# commas, so "I mean it" or "do you know him" are left alone.
+_FILLERS = re.compile(
+    r"(,?)\s*\b(?:u+h+m*|u+m+|e+r+m+|e+r+|a+h+|h+m+|m{2,})\b,?"
+    r"|(?:,\s*|^|(?<=[.!?]\s))(?:you know|i mean|like|sort of|kind of|basically)(?:,|(?=[.!?]))",
+    re.IGNORECASE,
+)
+
+# Words that may legitimately repeat: spelled-out phone numbers ("nine nine nine") and the like
+_REPEATABLE_WORDS = {
+    'zero', 'oh', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine',
+    'double', 'triple', 'no', 'very', 'bye',
+}
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+# Whole sentences that carry no client information
+_BOILERPLATE = re.compile(
+    r"(?:(?:hi|hello|hey|good (?:morning|afternoon|evening))(?: there)?"
+    r"|how are you(?: doing)?(?: today)?|(?:i'm )?(?:good|fine|great),? thanks?(?: you)?(?:,? and you)?"
+    r"|how can i help you(?: today)?|thank you(?: so much| very much)?(?: for (?:your time|calling|letting us know))?"
+    r"|thanks(?: again)?|you're welcome|have a (?:good|great|nice) (?:day|one)|bye|goodbye|okay|ok|alright|sure|great|perfect)"
+    r"[.!?,]*",
+    re.IGNORECASE,
+)
+
+# Sentences likely to mention a client detail: digits, emails, spelled-out emails, capitalised
+# words mid-sentence (names, companies) and the phrases people use to introduce them
+_ENTITY_HINT = re.compile(
+    r"\d|@|\bat \w+ dot\b|(?<=[a-z,] )[A-Z][a-z]"
+    r"|\b(?i:name|this is|speaking with|company|email|e-mail|phone|number|reach|contact|call me"
+    r"|interested|interest|looking for|inquir|service|package|plan|budget)",
+)
+
+
+def _collapse_repeats(text, max_phrase_words=4):
+    """
+    Collapses immediately repeated words and short phrases ("I I think", "we need we need").
+    Phrases containing digits or spelled-out digits are never collapsed.
+    """
+    words = text.split(' ')
+    out = []
+    for word in words:
+        out.append(word)
+        for size in range(1, max_phrase_words + 1):
+            if len(out) < 2 * size:
+                break
+            phrase, previous = out[-size:], out[-2 * size:-size]
+            normalised = [w.strip(',.!?').lower() for w in phrase]
+            if normalised != [w.strip(',.!?').lower() for w in previous]:
+                continue
+            if any(w in _REPEATABLE_WORDS or any(ch.isdigit() for ch in w) for w in normalised):
+                continue
+            # Keep the later copy's punctuation, it usually ends the clause
+            del out[-2 * size:-size]
+            break
+    return ' '.join(out)
+
+
+def compact_transcript(text, entity_context_sentences=None):
+    """
+    Shrinks a transcript for the extraction prompt: removes fillers, collapses repeated words
+    and phrases, drops duplicate and boilerplate sentences. With entity_context_sentences set,
+    only sentences that look like they carry a client detail are kept, plus that many
+    neighbouring sentences on each side.
+    """
+    text = _FILLERS.sub(r'\1 ', text or '')
+    text = re.sub(r'\s+', ' ', text).strip()
+    text = re.sub(r'\s+([,.!?])', r'\1', text)
+    text = re.sub(r',+([.!?])|([.!?])[.!?,]+', r'\1\2', text)
+
+    sentences, seen = [], set()
+    for sentence in _SENTENCE_END.split(text):
+        sentence = _collapse_repeats(sentence.strip(' ,'))
+        if not sentence or _BOILERPLATE.fullmatch(sentence):
+            continue
+        key = sentence.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        sentences.append(sentence[0].upper() + sentence[1:])
+
+    if entity_context_sentences is not None:
+        keep = set()
+        for index, sentence in enumerate(sentences):
+            if _ENTITY_HINT.search(sentence):
+                keep.update(range(index - entity_context_sentences, index + entity_context_sentences + 1))
+        sentences = [sentence for index, sentence in enumerate(sentences) if index in keep]
+
+    return ' '.join(sentences)
+
+
+def compaction_report(original, compacted):
+    """
+    Token counts before and after compaction, for logging and the recording's stored counts.
+    """
+    input_tokens, output_tokens = estimate_tokens(original), estimate_tokens(compacted)
+    saved = 1 - output_tokens / input_tokens if input_tokens else 0
+    return {'input_tokens': input_tokens, 'output_tokens': output_tokens, 'saved_ratio': round(saved, 3)}
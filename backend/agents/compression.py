@@ -0,0 +1,44 @@
+# agents/compression.py
+import io
+import json
+import zstandard
+
+# Compression is paid once per write and these documents are small, so a fairly high level is cheap;
+# decompression speed is the same at every level.
+ZSTD_LEVEL = 9
+
+
+def compress_json(value):
+    """
+    Serialises value as compact JSON (no whitespace) and zstd-compresses it.
+    Returns (compressed bytes, uncompressed size in bytes).
+    """
+    data = json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode()
+    return zstandard.compress(data, ZSTD_LEVEL), len(data)
+
+
+def decompress_bytes(data):
+    # BinaryField values come back as memoryview on PostgreSQL
+    return zstandard.decompress(bytes(data))
+
+
+def decompress_json(data):
+    return json.loads(decompress_bytes(data))
+
+
+def compress_text(text):
+    return zstandard.compress(text.encode(), ZSTD_LEVEL)
+
+
+def decompress_text(data):
+    return decompress_bytes(data).decode()
+
+
+def iter_decompressed(data, chunk_size=64 * 1024):
+    """
+    Yields the decompressed bytes of data in chunks of at most chunk_size, without ever holding
+    the whole uncompressed document in memory.
+    """
+    with zstandard.ZstdDecompressor().stream_reader(io.BytesIO(bytes(data))) as reader:
+        while chunk := reader.read(chunk_size):
+            yield chunk
@@ -0,0 +1,109 @@
+# agents/conditional.py
+import hashlib
+from django.db.models import Count, Max, Q
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+from .pagination import decode_cursor, encode_cursor
+
+LIST_STATE = {'last_modified': Max('updated_at'), 'count': Count('id')}
+
+
+def list_validators(request, state):
+    """
+    (ETag, Last-Modified) of a list response from its LIST_STATE aggregate. The path is part
+    of the tag because cursor/page_size change the body for the same data.
+    """
+    last_modified = state['last_modified']
+    fingerprint = f"{request.get_full_path()}|{last_modified.isoformat() if last_modified else ''}|{state['count']}"
+    return quote_etag(hashlib.sha1(fingerprint.encode()).hexdigest()), last_modified
+
+
+def changed_since(queryset, since, limit):
+    # Rows changed after a ?since= cursor, oldest change first, one more than limit to detect has_more
+    updated_at, pk = decode_cursor(since)
+    return queryset.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk)).order_by('updated_at', 'id')[:limit + 1]
+
+
+def delta_page(changed, since, limit):
+    """
+    Returns (rows, next_since, has_more) for the rows fetched with changed_since.
+    """
+    has_more = len(changed) > limit
+    changed = changed[:limit]
+    next_since = encode_cursor(changed[-1].updated_at, changed[-1].id) if changed else since
+    return changed, next_since, has_more
+
+
+def conditional_response(request, etag, last_modified):
+    # Returns a 304 (or 412) response when the client's copy is current, otherwise None. A 304
+    # carries the same validators and caching headers as the 200 it stands in for.
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None and response.status_code == 304:
+        add_validators(response, etag, last_modified)
+    return response
+
+
+def add_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Let browsers cache but always revalidate, so repeat polls become 304s
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Authorization', 'Cookie'))
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    ETag/Last-Modified support for list and detail views of models with an updated_at field,
+    plus a ?since=<cursor> delta mode on list that returns only rows changed after the cursor.
+
+    An unchanged list poll costs one aggregate query over an indexed column and returns 304.
+    Delta mode doesn't report deleted rows, so clients should still reload the full list now and then.
+    """
+    delta_cursor_param = 'since'
+    delta_page_size = 200
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        since = request.query_params.get(self.delta_cursor_param)
+        if since is not None:
+            return self.delta_list(queryset, since)
+
+        etag, last_modified = list_validators(request, queryset.order_by().aggregate(**LIST_STATE))
+
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = super().list(request, *args, **kwargs)
+        if last_modified is not None:
+            # Starting point for the client's first ?since= poll
+            response['X-Since-Cursor'] = encode_cursor(last_modified, 0)
+        return add_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = quote_etag(f"{instance.pk}-{instance.updated_at.timestamp()}")
+
+        not_modified = conditional_response(request, etag, instance.updated_at)
+        if not_modified is not None:
+            return not_modified
+
+        serializer = self.get_serializer(instance)
+        return add_validators(Response(serializer.data), etag, instance.updated_at)
+
+    def delta_list(self, queryset, since):
+        changed, next_since, has_more = delta_page(
+            list(changed_since(queryset, since, self.delta_page_size)), since, self.delta_page_size
+        )
+        serializer = self.get_serializer(changed, many=True)
+        response = Response({'results': serializer.data, 'next_since': next_since, 'has_more': has_more})
+        patch_vary_headers(response, ('Authorization', 'Cookie'))
+        return response
@@ -22,6 +22,8 @@ class CallStatusConsumer(AsyncWebsocketConsumer):
 
 
     async def disconnect(self, close_code):
+        if not hasattr(self, 'group_name'): # rejected before joining a group
+            return
         # Leave user group
         await self.channel_layer.group_discard(
             self.group_name,
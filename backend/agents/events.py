@@ -0,0 +1,30 @@
+# agents/events.py
+import logging
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+logger = logging.getLogger(__name__)
+
+
+def send_status_update(user_id, recording_id, status, **extra):
+    """
+    Pushes a recording status change to the uploader's WebSocket group (see CallStatusConsumer).
+    Best effort: a channel layer outage must never fail the pipeline.
+    """
+    if user_id is None:
+        return
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    message = {'type': 'recording.status', 'recording_id': recording_id, 'status': status, **extra}
+    try:
+        async_to_sync(channel_layer.group_send)(
+            f"user_{user_id}",
+            {'type': 'send_message', 'message': message},
+        )
+    except Exception as e:
+        logger.warning(f"Could not publish status update for CallRecording {recording_id}: {e}")
+
+
+def publish_recording_status(recording, **extra):
+    send_status_update(recording.uploaded_by_id, recording.id, recording.status, **extra)
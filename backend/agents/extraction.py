@@ -0,0 +1,89 @@
+# agents/extraction.py
+import math
+import re
+from collections import defaultdict
+
+# Rough characters-per-token ratio for English text with the Llama 3 tokenizer. Only used to
+# keep windows safely inside the context, so erring towards more tokens is fine.
+CHARS_PER_TOKEN = 3.5
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text or '') / CHARS_PER_TOKEN)
+
+
+def _split_long_sentence(sentence, max_tokens):
+    # A single run-on "sentence" (Whisper sometimes omits punctuation) is cut on word boundaries
+    pieces, current = [], []
+    for word in sentence.split():
+        if current and estimate_tokens(' '.join(current + [word])) > max_tokens:
+            pieces.append(' '.join(current))
+            current = []
+        current.append(word)
+    if current:
+        pieces.append(' '.join(current))
+    return pieces
+
+
+def split_transcript(text, max_tokens, overlap_tokens=0):
+    """
+    Splits a transcript into windows of at most max_tokens (estimated), on sentence boundaries.
+    Consecutive windows share roughly overlap_tokens of trailing sentences, so details that
+    straddle a boundary are seen whole by at least one window.
+    """
+    sentences = []
+    for sentence in _SENTENCE_END.split((text or '').strip()):
+        if estimate_tokens(sentence) > max_tokens:
+            sentences.extend(_split_long_sentence(sentence, max_tokens))
+        elif sentence:
+            sentences.append(sentence)
+
+    windows, current = [], []
+    for sentence in sentences:
+        if current and estimate_tokens(' '.join(current + [sentence])) > max_tokens:
+            windows.append(' '.join(current))
+            # Carry the tail of this window into the next one, as long as the new sentence still fits
+            carried = []
+            for previous in reversed(current):
+                if (estimate_tokens(' '.join([previous] + carried)) > overlap_tokens
+                        or estimate_tokens(' '.join([previous] + carried + [sentence])) > max_tokens):
+                    break
+                carried.insert(0, previous)
+            current = carried
+        current.append(sentence)
+    if current:
+        windows.append(' '.join(current))
+    return windows
+
+
+def _normalise(field, value):
+    value = str(value).strip()
+    if field == 'contact_number':
+        return re.sub(r'\D', '', value)
+    return re.sub(r'\s+', ' ', value).lower()
+
+
+def merge_window_results(window_results):
+    """
+    Reduce step: picks one value per field from the per-window extractions.
+    The value found by the most windows wins; ties go to the earliest window, where
+    callers usually introduce themselves. Returns (merged fields, provenance).
+    """
+    candidates = defaultdict(lambda: defaultdict(list)) # field -> normalised value -> [(window, raw value)]
+    for index, fields in enumerate(window_results):
+        for field, value in fields.items():
+            if value in (None, ''):
+                continue
+            candidates[field][_normalise(field, value)].append((index, value))
+
+    merged, provenance = {}, {}
+    for field, by_value in candidates.items():
+        best = max(by_value.values(), key=lambda hits: (len(hits), -hits[0][0]))
+        merged[field] = best[0][1]
+        provenance[field] = {
+            'windows': [window for window, _ in best],
+            'alternatives': [hits[0][1] for hits in by_value.values() if hits is not best],
+        }
+    return merged, provenance
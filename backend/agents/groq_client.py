@@ -0,0 +1,53 @@
+# agents/groq_client.py
+import logging
+import httpx
+from django.conf import settings
+from groq import Groq
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def build_groq_client(base_url=None, api_key=None):
+    """
+    Creates a Groq client backed by a pooled keep-alive httpx client (HTTP/2 when enabled).
+    """
+    http_client = httpx.Client(
+        http2=settings.GROQ_HTTP2,
+        limits=httpx.Limits(
+            max_connections=settings.GROQ_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.GROQ_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.GROQ_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(settings.GROQ_TIMEOUT, connect=settings.GROQ_CONNECT_TIMEOUT),
+    )
+    # SDK-level retries would hide 429s from the shared rate limiter; tasks retry instead
+    return Groq(
+        api_key=api_key or settings.GROQ_API_KEY,
+        base_url=base_url or settings.GROQ_BASE_URL, # None = the real API
+        http_client=http_client,
+        max_retries=settings.GROQ_SDK_MAX_RETRIES,
+    )
+
+
+def init_groq_client(base_url=None, api_key=None):
+    """
+    (Re)creates this process's shared client. Called on worker_process_init, so every forked
+    Celery child gets its own connection pool instead of sockets inherited from the parent.
+    """
+    global _client
+    if _client is not None:
+        _client.close()
+    _client = build_groq_client(base_url=base_url, api_key=api_key)
+    logger.info("Initialised pooled Groq client for this worker process.")
+    return _client
+
+
+def get_groq_client():
+    """
+    Returns the process-wide Groq client, creating it on first use (web process, eager tasks).
+    """
+    if _client is None:
+        return init_groq_client()
+    return _client
@@ -0,0 +1,251 @@
+# agents/groq_stub.py
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .sample_scripts import EXPECTED_FIELDS, SCRIPTS
+
+# Canned transcripts: the generate_audio.py scripts, as Whisper would return them
+TRANSCRIPTS = {name: ' '.join(script.split()) for name, script in SCRIPTS.items()}
+_SCRIPT_WORDS = {name: set(re.findall(r"[a-z']{4,}", text.lower())) for name, text in TRANSCRIPTS.items()}
+_BATCH_SECTION = re.compile(r"--- Transcript for recording_id (\d+) ---")
+
+
+def script_for_audio(filename, data):
+    """
+    The script a transcription request is answered with: the one named in the file name
+    (test_audio/ fixtures and copies of them), otherwise a stable pick by content hash.
+    """
+    for name in SCRIPTS:
+        if name in filename:
+            return name
+    names = sorted(SCRIPTS)
+    return names[int(hashlib.sha256(data).hexdigest(), 16) % len(names)]
+
+
+def script_for_transcript(text, min_overlap=0.3):
+    """
+    The script a transcript (possibly compacted, or a window of one) most likely came from, or None.
+    """
+    words = set(re.findall(r"[a-z']{4,}", (text or '').lower()))
+    if not words:
+        return None
+    name, overlap = max(
+        ((name, len(words & script_words) / len(words)) for name, script_words in _SCRIPT_WORDS.items()),
+        key=lambda item: item[1],
+    )
+    return name if overlap >= min_overlap else None
+
+
+class StubBehaviour:
+    """
+    Latency, throughput and failure injection for the stub. Latencies are log-normal around the
+    given medians (latency_sigma=0 makes them fixed); error rates are per-request probabilities.
+    Requests beyond a per-endpoint requests-per-minute cap, or beyond max_concurrency in flight,
+    get a 429 like the real API. Response counts per (endpoint, status) are kept in .counts.
+    """
+    def __init__(self, transcription_latency=0.0, completion_latency=0.0, latency_sigma=0.0,
+                 rate_429=0.0, rate_5xx=0.0, transcription_rpm=0, completion_rpm=0, max_concurrency=0, seed=None):
+        self.latencies = {'transcriptions': transcription_latency, 'completions': completion_latency}
+        self.latency_sigma = latency_sigma
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.rpm = {'transcriptions': transcription_rpm, 'completions': completion_rpm} # 0 = uncapped
+        self.max_concurrency = max_concurrency # 0 = uncapped
+        self.counts = Counter()
+        self._in_flight = 0
+        self._recent = {endpoint: deque() for endpoint in self.rpm} # accepted request times, last minute
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def admit(self, endpoint):
+        """
+        Takes a slot for one request. Returns None, or the seconds to put in Retry-After when a cap is hit.
+        """
+        now = time.monotonic()
+        with self._lock:
+            recent = self._recent[endpoint]
+            while recent and now - recent[0] >= 60:
+                recent.popleft()
+            if self.rpm[endpoint] and len(recent) >= self.rpm[endpoint]:
+                return max(1, math.ceil(60 - (now - recent[0])))
+            if self.max_concurrency and self._in_flight >= self.max_concurrency:
+                return 1
+            recent.append(now)
+            self._in_flight += 1
+        return None
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def draw(self, endpoint):
+        """
+        Returns (seconds to wait, error status or None) for one request.
+        """
+        with self._lock:
+            roll = self._random.random()
+            noise = self._random.gauss(0, self.latency_sigma) if self.latency_sigma else 0.0
+        if roll < self.rate_429:
+            return 0.0, 429 # throttling is answered straight away
+        latency = self.latencies[endpoint] * math.exp(noise)
+        if roll < self.rate_429 + self.rate_5xx:
+            return latency, 503
+        return latency, None
+
+    def count(self, endpoint, status):
+        with self._lock:
+            self.counts[f"{endpoint}:{status}"] += 1
+
+
+class GroqStubHandler(BaseHTTPRequestHandler):
+    """
+    Local stand-in for the Groq endpoints used in tasks.py (audio/transcriptions and tool-calling
+    chat/completions), for benchmarks and load tests without network access or API quota.
+    Speaks HTTP/1.1 so clients can keep connections alive between requests.
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True # headers and body go out in separate writes
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stub/stats':
+            self._send_json(dict(self.server.behaviour.counts))
+        else:
+            self._send_json({"error": {"message": f"Unknown path {self.path}"}}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+
+        if self.path.endswith('/audio/transcriptions'):
+            endpoint, respond = 'transcriptions', self._transcription
+        elif self.path.endswith('/chat/completions'):
+            endpoint, respond = 'completions', self._chat_completion
+        else:
+            self._send_json({"error": {"message": f"Unknown path {self.path}"}}, status=404)
+            return
+
+        behaviour = self.server.behaviour
+        retry_after = behaviour.admit(endpoint)
+        if retry_after is not None:
+            behaviour.count(endpoint, 429)
+            self._send_json({"error": {"message": "Rate limit reached (stub cap)", "type": "requests"}}, status=429,
+                            headers={'Retry-After': str(retry_after)})
+            return
+        try:
+            latency, error = behaviour.draw(endpoint)
+            if latency:
+                time.sleep(latency)
+        finally:
+            behaviour.release()
+
+        behaviour.count(endpoint, error or 200)
+        if error == 429:
+            self._send_json({"error": {"message": "Rate limit reached (stub)", "type": "tokens"}}, status=429,
+                            headers={'Retry-After': '1'})
+        elif error:
+            self._send_json({"error": {"message": "Service unavailable (stub)"}}, status=error)
+        else:
+            self._send_json(respond(body))
+
+    def _transcription(self, body):
+        # Multipart upload: pick out the file part to find which script it is
+        filename, data = '', body
+        boundary = re.search(r'boundary="?([^";]+)"?', self.headers.get('Content-Type', ''))
+        if boundary:
+            for part in body.split(b'--' + boundary.group(1).encode()):
+                match = re.search(rb'filename="([^"]*)"', part)
+                if match:
+                    filename = match.group(1).decode(errors='replace')
+                    data = part.split(b'\r\n\r\n', 1)[-1]
+                    break
+        return {"text": TRANSCRIPTS[script_for_audio(filename, data)]}
+
+    def _chat_completion(self, body):
+        try:
+            request = json.loads(body or b'{}')
+        except ValueError:
+            request = {}
+        messages = request.get('messages') or []
+        prompt = next((m.get('content') or '' for m in reversed(messages) if m.get('role') == 'user'), '')
+        tools = request.get('tools') or []
+
+        tool_calls = []
+        if tools:
+            function = tools[0]['function']
+            fields = set(function.get('parameters', {}).get('properties', {}))
+            if 'recording_id' in fields:
+                # Batched request: one call per "--- Transcript for recording_id N ---" section
+                sections = _BATCH_SECTION.split(prompt)[1:]
+                for recording_id, text in zip(sections[::2], sections[1::2]):
+                    tool_calls.append(self._tool_call(function['name'], fields, text, recording_id=int(recording_id)))
+            else:
+                tool_calls.append(self._tool_call(function['name'], fields, prompt))
+
+        completion_tokens = sum(len(call['function']['arguments']) for call in tool_calls) // 4
+        prompt_tokens = len(json.dumps(messages)) // 4 + len(json.dumps(tools)) // 4
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get('model') or "llama3-8b-8192",
+            "choices": [{
+                "index": 0,
+                "finish_reason": "tool_calls" if tool_calls else "stop",
+                "message": {
+                    "role": "assistant",
+                    "content": None if tool_calls else "pong",
+                    "tool_calls": tool_calls or None,
+                },
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def _tool_call(self, name, fields, transcript, **extra):
+        # The fields a correct extraction gives for the script, limited to what the tool still asks for
+        script = script_for_transcript(transcript)
+        arguments = {k: v for k, v in EXPECTED_FIELDS.get(script, {}).items() if k in fields}
+        return {
+            "id": f"call_{uuid.uuid4().hex[:8]}",
+            "type": "function",
+            "function": {"name": name, "arguments": json.dumps({**extra, **arguments})},
+        }
+
+    def _send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # keep benchmark output clean
+
+
+def make_stub_server(host='127.0.0.1', port=0, handler_class=GroqStubHandler, behaviour=None):
+    server = ThreadingHTTPServer((host, port), handler_class)
+    server.daemon_threads = True
+    server.behaviour = behaviour or StubBehaviour()
+    return server
+
+
+def start_stub_server(host='127.0.0.1', port=0, handler_class=GroqStubHandler, behaviour=None):
+    """
+    Starts the stub on a background thread. Returns (server, base_url); call server.shutdown() to stop.
+    """
+    server = make_stub_server(host, port, handler_class, behaviour)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
@@ -0,0 +1,122 @@
+# agents/llm_cache.py
+import hashlib
+import json
+import logging
+import time
+from django.conf import settings
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'llm_cache'
+LRU_KEY = 'llm_cache:lru' # sorted set of entry keys, scored by last use
+HITS_KEY = 'llm_cache:hits'
+MISSES_KEY = 'llm_cache:misses'
+
+
+def transcript_hash(transcript_text, skip_fields=()):
+    """
+    Hash of everything transcript-specific that goes into the extraction prompt.
+    """
+    payload = f"{transcript_text or ''}\0{','.join(sorted(skip_fields))}"
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def cache_key(transcript_sha256, model, prompt_version):
+    return f"{KEY_PREFIX}:{prompt_version}:{model}:{transcript_sha256}"
+
+
+def get_cached_extraction(key):
+    """
+    Returns the cached (extracted fields, raw_llm_output) for this key, or None.
+    Cache errors are treated as misses.
+    """
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    try:
+        redis = get_redis()
+        value = redis.get(key)
+        if value is None:
+            redis.incr(MISSES_KEY)
+            return None
+        with redis.pipeline() as pipe:
+            pipe.zadd(LRU_KEY, {key: time.time()})
+            pipe.expire(key, settings.LLM_CACHE_TTL_SECONDS) # TTL slides with use
+            pipe.incr(HITS_KEY)
+            pipe.execute()
+    except Exception as e:
+        logger.warning(f"LLM cache lookup failed for {key}: {e}")
+        return None
+    entry = json.loads(value)
+    return entry['extracted'], entry['raw']
+
+
+def store_extraction(key, extracted_data, raw_llm_output):
+    """
+    Caches an extraction result and evicts the least recently used entries beyond LLM_CACHE_MAX_ENTRIES.
+    """
+    if not settings.LLM_CACHE_ENABLED:
+        return
+    try:
+        redis = get_redis()
+        with redis.pipeline() as pipe:
+            pipe.set(key, json.dumps({'extracted': extracted_data, 'raw': raw_llm_output}), ex=settings.LLM_CACHE_TTL_SECONDS)
+            pipe.zadd(LRU_KEY, {key: time.time()})
+            pipe.zcard(LRU_KEY)
+            size = pipe.execute()[-1]
+
+        overflow = size - settings.LLM_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            # Entries that expired on their own are still in the sorted set; removing them is harmless
+            stale = [member for member, _ in redis.zpopmin(LRU_KEY, overflow)]
+            if stale:
+                redis.delete(*stale)
+                logger.info(f"Evicted {len(stale)} LLM cache entries.")
+    except Exception as e:
+        logger.warning(f"Could not store LLM cache entry {key}: {e}")
+
+
+def invalidate_prompt_version(prompt_version):
+    """
+    Deletes every entry cached under prompt_version. Returns the number of live entries deleted.
+    """
+    redis = get_redis()
+    deleted = 0
+    batch = []
+    # Every entry is registered in the LRU set, including ones whose key already expired
+    for key, _ in redis.zscan_iter(LRU_KEY, match=f"{KEY_PREFIX}:{prompt_version}:*", count=1000):
+        batch.append(key)
+        if len(batch) >= 1000:
+            deleted += _delete(redis, batch)
+            batch = []
+    if batch:
+        deleted += _delete(redis, batch)
+    return deleted
+
+
+def _delete(redis, keys):
+    with redis.pipeline() as pipe:
+        pipe.delete(*keys)
+        pipe.zrem(LRU_KEY, *keys)
+        return pipe.execute()[0]
+
+
+def cache_stats():
+    """
+    Hit/miss counters and current size of the LLM result cache.
+    """
+    try:
+        redis = get_redis()
+        hits, misses = (int(v or 0) for v in redis.mget(HITS_KEY, MISSES_KEY))
+        entries = redis.zcard(LRU_KEY)
+    except Exception as e:
+        logger.warning(f"Could not read LLM cache counters: {e}")
+        hits = misses = entries = 0
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / lookups if lookups else 0.0,
+        'entries': entries,
+        'max_entries': settings.LLM_CACHE_MAX_ENTRIES,
+    }
@@ -0,0 +1,79 @@
+# agents/management/commands/bench_audio_normalisation.py
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from agents.audio_normalisation import SAMPLE_RATE, decode_audio, normalise_audio
+
+FIXTURES_DIR = os.path.join(settings.BASE_DIR.parent, 'test_audio')
+
+
+class Command(BaseCommand):
+    help = (
+        "Normalises the test_audio fixtures, as uploaded and as a stereo 44.1 kHz WAV with silence around "
+        "and between two copies of the call (the way long recordings with hold time arrive), and reports "
+        "bytes and audio seconds saved and the time it took."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fixtures', default=FIXTURES_DIR, help="Directory of audio fixtures.")
+        parser.add_argument('--silence-seconds', type=float, default=10.0,
+                            help="Silence added at the start, middle and end of the WAV variant.")
+        parser.add_argument('--format', default=settings.AUDIO_NORMALISED_FORMAT, choices=['ogg', 'flac'])
+
+    def handle(self, *args, **options):
+        if not os.path.isdir(options['fixtures']):
+            raise CommandError(f"No fixtures directory {options['fixtures']} (run generate_audio.py).")
+        fixtures = sorted(name for name in os.listdir(options['fixtures']) if name.endswith(('.mp3', '.wav')))
+
+        work_dir = tempfile.mkdtemp(prefix='bench_audio_normalisation_')
+        totals = {'input_bytes': 0, 'output_bytes': 0, 'input_seconds': 0.0, 'output_seconds': 0.0, 'elapsed': 0.0}
+        try:
+            self.stdout.write(f"{'recording':<52} {'bytes':>10} {'-> bytes':>10} {'seconds':>8} {'-> s':>7} {'took s':>7}")
+            for name in fixtures:
+                path = os.path.join(options['fixtures'], name)
+                wav_path = self._with_silence(path, work_dir, options['silence_seconds'])
+                for label, source in ((name, path), (f"{name} (wav + silence)", wav_path)):
+                    started = time.perf_counter()
+                    _, report = normalise_audio(
+                        source, work_dir,
+                        threshold_db=settings.AUDIO_SILENCE_THRESHOLD_DB,
+                        max_silence_seconds=settings.AUDIO_MAX_SILENCE_SECONDS,
+                        padding_seconds=settings.AUDIO_SILENCE_PADDING_SECONDS,
+                        fmt=options['format'],
+                        bitrate=settings.AUDIO_NORMALISED_BITRATE,
+                    )
+                    elapsed = time.perf_counter() - started
+                    for key in ('input_bytes', 'output_bytes', 'input_seconds', 'output_seconds'):
+                        totals[key] += report[key]
+                    totals['elapsed'] += elapsed
+                    self.stdout.write(
+                        f"{label:<52} {report['input_bytes']:>10} {report['output_bytes']:>10} "
+                        f"{report['input_seconds']:>8.1f} {report['output_seconds']:>7.1f} {elapsed:>7.2f}"
+                    )
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        self.stdout.write(
+            f"total: {1 - totals['output_bytes'] / totals['input_bytes']:.0%} bytes and "
+            f"{1 - totals['output_seconds'] / totals['input_seconds']:.0%} audio seconds saved, "
+            f"{totals['input_seconds'] / totals['elapsed']:.0f}x realtime"
+        )
+
+    def _with_silence(self, path, work_dir, silence_seconds):
+        speech = decode_audio(path)
+        silence = np.zeros(int(SAMPLE_RATE * silence_seconds), dtype=np.int16)
+        samples = np.concatenate((silence, speech, silence, speech, silence))
+        wav_path = os.path.join(work_dir, os.path.splitext(os.path.basename(path))[0] + '_silence.wav')
+        subprocess.run(
+            ['ffmpeg', '-v', 'error', '-y', '-f', 's16le', '-ar', str(SAMPLE_RATE), '-ac', '1', '-i', '-',
+             '-ar', '44100', '-ac', '2', wav_path],
+            input=samples.tobytes(), check=True,
+        )
+        return wav_path
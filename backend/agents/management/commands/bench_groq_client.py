@@ -0,0 +1,73 @@
+# agents/management/commands/bench_groq_client.py
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from groq import APIError, Groq
+
+from agents.groq_client import build_groq_client
+from agents.groq_stub import start_stub_server
+
+
+class Command(BaseCommand):
+    help = "Benchmarks per-task Groq latency with a new client per task vs. the pooled per-worker client, against a local stub."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=200, help="Number of simulated tasks per mode.")
+        parser.add_argument('--calls-per-task', type=int, default=2,
+                            help="API calls each task makes (transcription + extraction).")
+
+    def handle(self, *args, **options):
+        if options['tasks'] < 1 or options['calls_per_task'] < 1:
+            raise CommandError("--tasks and --calls-per-task must be at least 1.")
+
+        server, base_url = start_stub_server()
+        pooled = build_groq_client(base_url=base_url, api_key=settings.GROQ_API_KEY or 'stub')
+        try:
+            def fresh_client():
+                # What the tasks used to do: a brand new client (and connection pool) per task
+                return Groq(api_key=settings.GROQ_API_KEY or 'stub', base_url=base_url)
+
+            results = {
+                'new client per task': self._run(lambda: fresh_client(), options, close=True),
+                'pooled client': self._run(lambda: pooled, options, close=False),
+            }
+        finally:
+            pooled.close()
+            server.shutdown()
+
+        # Requests the SDK retried would pass the checks above but skew the latencies
+        expected = {'completions:200': 2 * options['tasks'] * options['calls_per_task']}
+        if dict(server.behaviour.counts) != expected:
+            raise CommandError(f"Unexpected stub responses {dict(server.behaviour.counts)}, expected {expected}.")
+
+        self.stdout.write(f"{'mode':<22} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+        for mode, latencies in results.items():
+            latencies = sorted(latencies)
+            p95 = latencies[int(len(latencies) * 0.95) - 1]
+            self.stdout.write(
+                f"{mode:<22} {statistics.mean(latencies):>9.2f} {statistics.median(latencies):>9.2f} {p95:>9.2f}"
+            )
+
+    def _run(self, get_client, options, close):
+        latencies = []
+        for _ in range(options['tasks']):
+            started = time.perf_counter()
+            client = get_client()
+            try:
+                for _ in range(options['calls_per_task']):
+                    completion = client.chat.completions.create(
+                        messages=[{"role": "user", "content": "ping"}],
+                        model="llama3-8b-8192",
+                    )
+                    if not completion.choices:
+                        raise CommandError(f"Groq stub returned a completion without choices: {completion}")
+            except APIError as e:
+                # Latencies of failed requests say nothing about connection reuse
+                raise CommandError(f"Groq request failed during the benchmark: {e}") from e
+            finally:
+                if close:
+                    client.close()
+            latencies.append((time.perf_counter() - started) * 1000)
+        return latencies
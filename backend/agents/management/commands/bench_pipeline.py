@@ -0,0 +1,215 @@
+# agents/management/commands/bench_pipeline.py
+import hashlib
+import json
+import os
+import statistics
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from agents.groq_client import init_groq_client
+from agents.groq_stub import StubBehaviour, start_stub_server
+from agents.metrics import record_stages
+from agents.models import CallRecording, TranscriptCache
+from agents.pipeline import recording_pipeline
+
+FIXTURES_DIR = os.path.join(settings.BASE_DIR.parent, 'test_audio')
+
+
+def _percentile(values, percent):
+    # Nearest-rank percentile of an already sorted list
+    index = max(0, min(len(values) - 1, round(percent / 100 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives N recordings made from the test_audio fixtures through the transcription and extraction "
+        "tasks against a local Groq stub with injected latency and errors, at several concurrency levels. "
+        "Reports recordings/min and p50/p95/p99 end-to-end latency of the recordings that reach READY_FOR_REVIEW, "
+        "and writes the results to a JSON file. Fails if any recording does not."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recordings', type=int, default=50, help="Recordings per concurrency level.")
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16],
+                            help="Numbers of recordings processed in parallel (simulated worker slots).")
+        parser.add_argument('--transcription-latency', type=float, default=1.0,
+                            help="Median stub latency of audio/transcriptions, in seconds.")
+        parser.add_argument('--completion-latency', type=float, default=0.5,
+                            help="Median stub latency of chat/completions, in seconds.")
+        parser.add_argument('--latency-sigma', type=float, default=0.3,
+                            help="Log-normal spread of stub latencies (0 = fixed).")
+        parser.add_argument('--rate-429', type=float, default=0.0, help="Fraction of stub requests answered with 429.")
+        parser.add_argument('--rate-5xx', type=float, default=0.0, help="Fraction of stub requests answered with 503.")
+        parser.add_argument('--transcription-rpm', type=int, default=0,
+                            help="Stub cap on transcription requests per minute (0 = uncapped).")
+        parser.add_argument('--completion-rpm', type=int, default=0,
+                            help="Stub cap on chat completion requests per minute (0 = uncapped).")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--base-url', default=settings.GROQ_BASE_URL,
+                            help="Use an already running stub (manage.py run_groq_stub) instead of starting one; "
+                                 "the stub options above are then ignored. Defaults to GROQ_BASE_URL.")
+        parser.add_argument('--rate-limit', action='store_true',
+                            help="Go through the shared Groq rate limiter (uses the real Redis budget keys).")
+        parser.add_argument('--fixtures', default=FIXTURES_DIR, help="Directory of audio fixtures.")
+        parser.add_argument('--label', default='', help="Free-form label stored in the results, e.g. a release.")
+        parser.add_argument('--output', default='bench_pipeline.json')
+
+    def handle(self, *args, **options):
+        fixtures = sorted(
+            os.path.join(options['fixtures'], name) for name in os.listdir(options['fixtures'])
+            if name.endswith(('.mp3', '.wav', '.m4a'))
+        ) if os.path.isdir(options['fixtures']) else []
+        if not fixtures:
+            raise CommandError(f"No audio fixtures found in {options['fixtures']} (run generate_audio.py).")
+
+        server = None
+        base_url = options['base_url']
+        if base_url:
+            def stub_counts():
+                return Counter(httpx.get(f"{base_url.rstrip('/')}/stub/stats").json())
+        else:
+            behaviour = StubBehaviour(
+                transcription_latency=options['transcription_latency'],
+                completion_latency=options['completion_latency'],
+                latency_sigma=options['latency_sigma'],
+                rate_429=options['rate_429'],
+                rate_5xx=options['rate_5xx'],
+                transcription_rpm=options['transcription_rpm'],
+                completion_rpm=options['completion_rpm'],
+                seed=options['seed'],
+            )
+            server, base_url = start_stub_server(behaviour=behaviour)
+
+            def stub_counts():
+                return behaviour.counts.copy()
+        init_groq_client(base_url=base_url, api_key=settings.GROQ_API_KEY or 'stub')
+
+        # Every recording must reach the stub: no shared budget unless asked for, no LLM result cache
+        # and no micro-batching (its flush task cannot be driven in-process)
+        overrides = override_settings(
+            GROQ_RATE_LIMIT_ENABLED=options['rate_limit'],
+            LLM_CACHE_ENABLED=False,
+            LLM_BATCHING_ENABLED=False,
+        )
+        stored = []
+        for path in fixtures:
+            with open(path, 'rb') as f:
+                stored.append(default_storage.save(f"call_recordings/bench_{os.path.basename(path)}", File(f)))
+        run_id = uuid.uuid4().hex
+        levels = []
+        try:
+            with overrides:
+                for concurrency in options['concurrency']:
+                    levels.append(self._run_level(concurrency, options['recordings'], stored, run_id, stub_counts))
+        finally:
+            if server is not None:
+                server.shutdown()
+            for name in stored:
+                default_storage.delete(name)
+
+        results = {
+            'label': options['label'],
+            'generated_at': timezone.now().isoformat(),
+            'recordings_per_level': options['recordings'],
+            'fixtures': [os.path.basename(path) for path in fixtures],
+            'stub': {'base_url': options['base_url']} if options['base_url'] else {
+                'transcription_latency': options['transcription_latency'],
+                'completion_latency': options['completion_latency'],
+                'latency_sigma': options['latency_sigma'],
+                'rate_429': options['rate_429'],
+                'rate_5xx': options['rate_5xx'],
+                'transcription_rpm': options['transcription_rpm'],
+                'completion_rpm': options['completion_rpm'],
+                'seed': options['seed'],
+            },
+            'rate_limit': options['rate_limit'],
+            'levels': levels,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+        self.stdout.write(
+            f"{'concurrency':>11} {'rec/min':>9} {'failed':>7} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8}  statuses"
+        )
+        for level in levels:
+            latency = level['latency_seconds'] or dict.fromkeys(('p50', 'p95', 'p99'), float('nan'))
+            statuses = ', '.join(f"{status} {count}" for status, count in sorted(level['statuses'].items()))
+            self.stdout.write(
+                f"{level['concurrency']:>11} {level['recordings_per_minute']:>9.1f} {level['failed']:>7} "
+                f"{latency['p50']:>8.2f} {latency['p95']:>8.2f} {latency['p99']:>8.2f}  {statuses}"
+            )
+        self.stdout.write(f"Results written to {options['output']}")
+
+        failed = [f"{level['failed']} at concurrency {level['concurrency']}" for level in levels if level['failed']]
+        if failed:
+            raise CommandError(f"Recordings not READY_FOR_REVIEW: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS("Every recording reached READY_FOR_REVIEW."))
+
+    def _run_level(self, concurrency, count, stored, run_id, stub_counts):
+        # A unique fake audio hash per recording, so the transcript cache never short-circuits the stub
+        recordings = CallRecording.objects.bulk_create([
+            CallRecording(
+                audio_file=stored[index % len(stored)],
+                audio_sha256=hashlib.sha256(f"bench:{run_id}:{concurrency}:{index}".encode()).hexdigest(),
+            )
+            for index in range(count)
+        ])
+        recording_ids = [recording.id for recording in recordings]
+        counts_before = stub_counts()
+
+        def run_one(recording_id):
+            try:
+                started = time.perf_counter()
+                record_stages([recording_id], 'queued')
+                recording_pipeline(recording_id).apply() # both tasks, in order, in this thread
+                return recording_id, time.perf_counter() - started
+            finally:
+                connection.close() # outside the timed part; each thread has its own connection
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                timings = dict(executor.map(run_one, recording_ids))
+            wall = time.perf_counter() - started
+
+            status_of = dict(CallRecording.objects.filter(id__in=recording_ids).values_list('id', 'status'))
+            statuses = Counter(status_of.values())
+        finally:
+            hashes = [recording.audio_sha256 for recording in recordings]
+            TranscriptCache.objects.filter(content_sha256__in=hashes).delete()
+            CallRecording.objects.filter(id__in=recording_ids).delete()
+
+        # A failed recording fails fast, so only the ones that reach review count as throughput
+        latencies = sorted(
+            seconds for recording_id, seconds in timings.items() if status_of[recording_id] == 'READY_FOR_REVIEW'
+        )
+        return {
+            'concurrency': concurrency,
+            'recordings': count,
+            'ready': len(latencies),
+            'failed': count - len(latencies),
+            'wall_seconds': round(wall, 3),
+            'recordings_per_minute': round(len(latencies) / wall * 60, 2),
+            'latency_seconds': {
+                'mean': round(statistics.mean(latencies), 3),
+                'p50': round(_percentile(latencies, 50), 3),
+                'p95': round(_percentile(latencies, 95), 3),
+                'p99': round(_percentile(latencies, 99), 3),
+                'max': round(latencies[-1], 3),
+            } if latencies else None,
+            'statuses': dict(statuses),
+            'stub_responses': dict(stub_counts() - counts_before),
+        }
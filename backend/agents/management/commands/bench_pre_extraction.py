@@ -0,0 +1,122 @@
+# agents/management/commands/bench_pre_extraction.py
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from agents.preextract import PRE_EXTRACTED_FIELDS, pre_extract
+
+# Call script templates in the style of generate_audio.py; {phone}/{email} are filled in either
+# written or spoken form, and some scripts (like script_5_irrelevant) have neither
+TEMPLATES = [
+    (
+        "Hello, this is Alex from Solv Solutions. I'm calling to follow up on your recent inquiry about our onboarding services. "
+        "Am I speaking with {name}? Hi Alex, yes, this is {first}. I'm the project manager over at {company}. "
+        "Your website mentioned a package that integrates with our existing CRM, and I'd like to get more information on that. "
+        "I can be reached at {phone}, and my email is {email}. That's great. I'll get you some details right away."
+    ),
+    (
+        "Good morning, this is Michael. I'm calling about the corporate training services you expressed interest in. "
+        "Who am I speaking with? Hello Michael, this is {name} from {company}. We're looking for a service that focuses on "
+        "leadership training and team building. If you could just email me the full brochure, that would be perfect. "
+        "My email is {email}. Okay, {first}, I'll send that brochure to you right away at that email address."
+    ),
+    (
+        "Hi, I'm calling about our digital marketing solutions. Is this {name}? Yes, hi. I'm a freelance consultant, "
+        "but I'm definitely interested in your social media advertising services. My email is {email}. "
+        "You can reach me on my personal phone at {phone}. Alright, {first}. Thank you for your time."
+    ),
+    (
+        "Hello, this is Chris from our support team. Can I get your name and the issue you're having? Hi, this is {first}. "
+        "I'm calling to inquire about your new web hosting plan. My phone number is {phone}. My email is {email}. "
+        "Okay, {first}, I can help you with that."
+    ),
+    (
+        "Hello, you've reached our support line. How can I help you today? Hi, I'm just calling to let you know that one of "
+        "your drivers, a guy named Tom, left his lights on. Could you tell me if he's working on a delivery downtown today? "
+        "Thank you for letting us know. I'll pass that message along."
+    ),
+    (
+        # Numbers that aren't contact details, which must not be taken for them
+        "Hi, I'm calling about an order I placed last week. My order number is {order}. Can you tell me where it is? "
+        "Sure, {first}, let me look that up for you. It's out for delivery and should be with you today."
+    ),
+]
+
+FIRST_NAMES = ['Jane', 'Robert', 'Sarah', 'Mark', 'Priya', 'Diego', 'Mei', 'Olu']
+LAST_NAMES = ['Foster', 'Downey', 'Connor', 'Shah', 'Garcia', 'Chen', 'Adeyemi']
+COMPANIES = ['Tech Innovators', 'Aero Corp', 'Blue Harbor', 'Northwind Traders']
+DOMAINS = ['gmail.com', 'techinnovators.com', 'aerocorp.com', 'email.com', 'mail.co.uk']
+DIGIT_WORDS = ['zero', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine']
+
+
+def _spoken_number(digits):
+    groups = (digits[:3], digits[3:6], digits[6:])
+    return ', '.join(' '.join(DIGIT_WORDS[int(d)] for d in group) for group in groups)
+
+
+def make_transcript(rng):
+    """
+    Returns (transcript, expected pre-extracted fields).
+    """
+    template = rng.choice(TEMPLATES)
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    digits = f"{rng.randint(200, 999)}{rng.randint(200, 999)}{rng.randint(0, 9999):04d}"
+    local = f"{first.lower()}.{last[0].lower()}"
+    domain = rng.choice(DOMAINS)
+
+    phone_style = rng.randrange(3)
+    if phone_style == 0:
+        phone, expected_phone = f"({digits[:3]}) {digits[3:6]}-{digits[6:]}", f"({digits[:3]}) {digits[3:6]}-{digits[6:]}"
+    elif phone_style == 1:
+        phone, expected_phone = f"{digits[:3]}-{digits[3:6]}-{digits[6:]}", f"{digits[:3]}-{digits[3:6]}-{digits[6:]}"
+    else:
+        phone, expected_phone = _spoken_number(digits), f"{digits[:3]}-{digits[3:6]}-{digits[6:]}"
+
+    if rng.random() < 0.5:
+        email = f"{local}@{domain}"
+    else:
+        email = f"{local.replace('.', ' dot ')} at {domain.replace('.', ' dot ')}"
+
+    expected = {}
+    if '{phone}' in template:
+        expected['contact_number'] = expected_phone
+    if '{email}' in template:
+        expected['email'] = f"{local}@{domain}"
+    transcript = template.format(
+        name=f"{first} {last}", first=first, company=rng.choice(COMPANIES), phone=phone, email=email,
+        order=f"{rng.randint(2, 9)}{rng.randint(0, 10 ** 9 - 1):09d}",
+    )
+    return transcript, expected
+
+
+class Command(BaseCommand):
+    help = "Measures local pre-extraction throughput (transcripts/second) and accuracy on a synthetic corpus."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transcripts', type=int, default=100_000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        corpus = [make_transcript(rng) for _ in range(options['transcripts'])]
+        total_chars = sum(len(transcript) for transcript, _ in corpus)
+
+        started = time.perf_counter()
+        results = [pre_extract(transcript) for transcript, _ in corpus]
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{len(corpus)} transcripts ({total_chars / 1_000_000:.1f} MB) in {elapsed:.2f}s: "
+            f"{len(corpus) / elapsed:,.0f} transcripts/s, {total_chars / elapsed / 1_000_000:.1f} MB/s"
+        )
+        for field in PRE_EXTRACTED_FIELDS:
+            expected = sum(1 for _, fields in corpus if field in fields)
+            found = sum(1 for result in results if field in result)
+            correct = sum(
+                1 for result, (_, fields) in zip(results, corpus)
+                if field in result and result[field] == fields.get(field)
+            )
+            self.stdout.write(
+                f"{field:<15} precision {correct / max(found, 1):.3f}  recall {correct / max(expected, 1):.3f}"
+            )
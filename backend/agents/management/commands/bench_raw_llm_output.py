@@ -0,0 +1,181 @@
+# agents/management/commands/bench_raw_llm_output.py
+import json
+import random
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from agents.compression import compress_json, decompress_bytes
+from agents.sample_scripts import EXPECTED_FIELDS
+from agents.tasks import EXTRACTION_MODEL, EXTRACTION_TOOL_NAME
+
+# The columns ExtractedClientInfoSerializer returns for each review queue row
+LIST_COLUMNS = (
+    'id', 'call_recording_id', 'client_name', 'company_name', 'contact_number', 'email', 'service_interest',
+    'is_approved', 'approved_by_id', 'approval_timestamp', 'review_notes', 'is_speculative', 'updated_at',
+)
+
+
+def _completion(rng, fields):
+    # Shaped like ChatCompletion.model_dump(mode='json') from the Groq SDK for one tool call
+    prompt_tokens = rng.randint(400, 1500)
+    completion_tokens = rng.randint(40, 120)
+    return {
+        'id': f"chatcmpl-{uuid.uuid4()}",
+        'object': 'chat.completion',
+        'created': int(time.time()) - rng.randint(0, 10 ** 6),
+        'model': EXTRACTION_MODEL,
+        'system_fingerprint': f"fp_{uuid.uuid4().hex[:10]}",
+        'choices': [{
+            'index': 0,
+            'finish_reason': 'tool_calls',
+            'logprobs': None,
+            'message': {
+                'role': 'assistant',
+                'content': None,
+                'function_call': None,
+                'reasoning': None,
+                'tool_calls': [{
+                    'id': f"call_{uuid.uuid4().hex[:8]}",
+                    'type': 'function',
+                    'function': {'name': EXTRACTION_TOOL_NAME, 'arguments': json.dumps(fields)},
+                }],
+            },
+        }],
+        'usage': {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+            'queue_time': round(rng.uniform(0.01, 0.2), 6),
+            'prompt_time': round(rng.uniform(0.01, 0.1), 6),
+            'completion_time': round(rng.uniform(0.05, 0.3), 6),
+            'total_time': round(rng.uniform(0.1, 0.5), 6),
+        },
+        'usage_breakdown': None,
+        'x_groq': {'id': f"req_{uuid.uuid4().hex[:26]}"},
+    }
+
+
+def _raw_llm_output(rng, index):
+    # Mostly single requests; every tenth a long call extracted with map-reduce over a few windows
+    fields = rng.choice(list(EXPECTED_FIELDS.values()))
+    if index % 10:
+        return fields, _completion(rng, fields)
+    windows = rng.randint(2, 6)
+    return fields, {
+        'map_reduce': {'windows': windows, 'provenance': {field: {'windows': [0], 'alternatives': []} for field in fields}},
+        'window_responses': [_completion(rng, fields) for _ in range(windows)],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares storing raw LLM output inline (the old jsonb raw_llm_output column on every extracted-info row) "
+        "with the compressed RawLLMOutput side table: table sizes, and the time to read and serialise the "
+        "review list. Builds both layouts as temporary tables with the same rows inside a transaction that is "
+        "rolled back. PostgreSQL only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help="Extracted-info rows (the review queue size).")
+        parser.add_argument('--repeats', type=int, default=20, help="Timed list reads per layout.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='bench_raw_llm_output.json')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("bench_raw_llm_output needs PostgreSQL (it reports relation sizes).")
+        rng = random.Random(options['seed'])
+        now = timezone.now()
+        rows = []
+        for index in range(options['rows']):
+            fields, raw = _raw_llm_output(rng, index)
+            rows.append(((index + 1, index + 1, *(fields.get(f) for f in LIST_COLUMNS[2:7]), False, None, None, None, False, now), raw))
+
+        columns = ', '.join(LIST_COLUMNS)
+        placeholders = ', '.join(['%s'] * len(LIST_COLUMNS))
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("CREATE TEMP TABLE bench_inline (LIKE agents_extractedclientinfo INCLUDING ALL)")
+            cursor.execute("ALTER TABLE bench_inline ADD COLUMN raw_llm_output jsonb")
+            cursor.execute("CREATE TEMP TABLE bench_hot (LIKE agents_extractedclientinfo INCLUDING ALL)")
+            cursor.execute("CREATE TEMP TABLE bench_raw (LIKE agents_rawllmoutput INCLUDING ALL)")
+
+            compressed = [compress_json(raw) for _, raw in rows]
+            cursor.executemany(
+                f"INSERT INTO bench_inline ({columns}, raw_llm_output) VALUES ({placeholders}, %s)",
+                [(*values, json.dumps(raw)) for values, raw in rows],
+            )
+            cursor.executemany(f"INSERT INTO bench_hot ({columns}) VALUES ({placeholders})", [values for values, _ in rows])
+            cursor.executemany(
+                "INSERT INTO bench_raw (extracted_info_id, data, raw_bytes) VALUES (%s, %s, %s)",
+                [(values[0], data, raw_bytes) for (values, _), (data, raw_bytes) in zip(rows, compressed)],
+            )
+            cursor.execute("ANALYZE bench_inline")
+            cursor.execute("ANALYZE bench_hot")
+            cursor.execute("ANALYZE bench_raw")
+
+            sizes = {}
+            for table in ('bench_inline', 'bench_hot', 'bench_raw'):
+                cursor.execute("SELECT pg_total_relation_size(%s), pg_relation_size(%s)", [table, table])
+                sizes[table] = dict(zip(('total_bytes', 'heap_bytes'), cursor.fetchone()))
+
+            before = self._time_list(cursor, f"SELECT {columns}, raw_llm_output FROM bench_inline ORDER BY id DESC", options['repeats'])
+            after = self._time_list(cursor, f"SELECT {columns} FROM bench_hot ORDER BY id DESC", options['repeats'])
+
+            # What the /raw/ route does per request: one primary key lookup and a decompress
+            started = time.perf_counter()
+            for values, _ in rows[:200]:
+                cursor.execute("SELECT data FROM bench_raw WHERE extracted_info_id = %s", [values[0]])
+                decompress_bytes(cursor.fetchone()[0])
+            raw_route_ms = (time.perf_counter() - started) / min(200, len(rows)) * 1000
+
+            transaction.set_rollback(True)
+
+        pretty_bytes = sum(len(json.dumps(raw, indent=2)) for _, raw in rows)
+        compact_bytes = sum(raw_bytes for _, raw_bytes in compressed)
+        zstd_bytes = sum(len(data) for data, _ in compressed)
+        results = {
+            'generated_at': timezone.now().isoformat(),
+            'rows': options['rows'],
+            'raw_llm_output_bytes': {'pretty_json': pretty_bytes, 'compact_json': compact_bytes, 'zstd': zstd_bytes},
+            'table_bytes': {
+                'before_extractedclientinfo': sizes['bench_inline']['total_bytes'],
+                'after_extractedclientinfo': sizes['bench_hot']['total_bytes'],
+                'after_rawllmoutput': sizes['bench_raw']['total_bytes'],
+            },
+            'review_list': {'before': before, 'after': after},
+            'raw_route_ms': round(raw_route_ms, 3),
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+        mb = 1024 * 1024
+        self.stdout.write(
+            f"raw_llm_output: {pretty_bytes / mb:.2f} MB pretty JSON, {compact_bytes / mb:.2f} MB compact, "
+            f"{zstd_bytes / mb:.2f} MB zstd ({compact_bytes / max(1, zstd_bytes):.1f}x)"
+        )
+        self.stdout.write(
+            f"extracted-info table: {sizes['bench_inline']['total_bytes'] / mb:.2f} MB before, "
+            f"{sizes['bench_hot']['total_bytes'] / mb:.2f} MB after (+ {sizes['bench_raw']['total_bytes'] / mb:.2f} MB side table)"
+        )
+        self.stdout.write(f"{'review list':<12} {'p50 ms':>8} {'p95 ms':>8} {'bytes':>10}")
+        for label, timing in (('before', before), ('after', after)):
+            self.stdout.write(f"{label:<12} {timing['p50_ms']:>8.1f} {timing['p95_ms']:>8.1f} {timing['response_bytes']:>10}")
+        self.stdout.write(f"/raw/ route: {raw_route_ms:.2f} ms per record")
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def _time_list(self, cursor, sql, repeats):
+        # Fetch every row and render the JSON body, as the list endpoint does
+        timings = []
+        for _ in range(max(2, repeats)):
+            started = time.perf_counter()
+            cursor.execute(sql)
+            names = [column.name for column in cursor.description]
+            body = json.dumps([dict(zip(names, row)) for row in cursor.fetchall()], default=str, separators=(',', ':'))
+            timings.append((time.perf_counter() - started) * 1000)
+        cuts = statistics.quantiles(timings, n=20)
+        return {'p50_ms': round(statistics.median(timings), 2), 'p95_ms': round(cuts[18], 2), 'response_bytes': len(body)}
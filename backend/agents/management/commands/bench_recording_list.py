@@ -0,0 +1,76 @@
+# agents/management/commands/bench_recording_list.py
+import json
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from agents.models import CallRecording
+from agents.pagination import KeysetPagination
+from agents.serializers import CallRecordingSerializer
+from agents.views import CallRecordingViewSet
+
+TRANSCRIPT = "Hello, this is Alex from Solv Solutions calling about your onboarding inquiry. " * 60
+
+
+class Command(BaseCommand):
+    help = "Seeds N recordings for one user (rolled back afterwards) and compares the old unpaginated list with the keyset-paginated slim list."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=10, help="Timed requests per mode.")
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['repeat'] < 1:
+            raise CommandError("--rows and --repeat must be at least 1.")
+
+        with transaction.atomic():
+            user = User.objects.create_user(username='bench_recording_list')
+            CallRecording.objects.bulk_create(
+                [CallRecording(uploaded_by=user, audio_file=f'call_recordings/bench_{i}.mp3',
+                               status='READY_FOR_REVIEW', transcript_text=TRANSCRIPT)
+                 for i in range(options['rows'])],
+                batch_size=1000,
+            )
+
+            factory = APIRequestFactory()
+
+            def old_list():
+                # What every dashboard poll used to cost: every row, every transcript
+                request = factory.get('/api/call-recordings/')
+                queryset = CallRecording.objects.with_transcripts().filter(uploaded_by=user).order_by('-upload_timestamp')
+                data = CallRecordingSerializer(queryset, many=True, context={'request': request}).data
+                return JSONRenderer().render(data), len(data)
+
+            list_view = CallRecordingViewSet.as_view({'get': 'list'})
+
+            def new_list():
+                request = factory.get('/api/call-recordings/')
+                force_authenticate(request, user=user)
+                response = list_view(request)
+                response.render()
+                if response.status_code != 200:
+                    raise CommandError(f"Recording list answered {response.status_code}: {response.content[:500]!r}")
+                return response.content, len(json.loads(response.content)['results'])
+
+            self.stdout.write(f"{options['rows']} recordings")
+            self.stdout.write(f"{'mode':<24} {'bytes':>12} {'p50 ms':>9} {'max ms':>9}")
+            for mode, fetch, expected_rows in (
+                ('unpaginated full rows', old_list, options['rows']),
+                ('keyset page, slim rows', new_list, min(options['rows'], KeysetPagination.page_size)),
+            ):
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    body, rows = fetch()
+                    timings.append((time.perf_counter() - started) * 1000)
+                    # An empty or short list would make either mode look cheaper than it is
+                    if rows != expected_rows:
+                        raise CommandError(f"{mode} returned {rows} recordings, expected {expected_rows}.")
+                self.stdout.write(f"{mode:<24} {len(body):>12} {statistics.median(timings):>9.1f} {max(timings):>9.1f}")
+
+            transaction.set_rollback(True)
@@ -0,0 +1,225 @@
+# agents/management/commands/bench_serving.py
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from agents.models import CallRecording, ExtractedClientInfo
+
+# What a dashboard session requests on every poll
+ENDPOINTS = [
+    ('user-status', '/api/user-status/'),
+    ('call-recordings', '/api/call-recordings/'),
+    ('extracted-info', '/api/extracted-info/'),
+]
+
+# How each mode is served: WSGI with the DRF views on sync workers, or ASGI with the async read views
+SERVERS = {
+    'sync': {'app': 'core.wsgi:application', 'worker_class': 'sync', 'async_views': False},
+    'async': {'app': 'core.asgi:application', 'worker_class': 'uvicorn_worker.UvicornWorker', 'async_views': True},
+}
+
+
+def _latency_summary(latencies):
+    if len(latencies) < 2:
+        return None
+    cuts = statistics.quantiles(latencies, n=100)
+    return {
+        'mean': round(statistics.mean(latencies), 4),
+        'p50': round(cuts[49], 4),
+        'p95': round(cuts[94], 4),
+        'p99': round(cuts[98], 4),
+        'max': round(max(latencies), 4),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests the dashboard read endpoints (user-status, call-recordings, extracted-info) with N concurrent "
+        "clients, served sync (gunicorn sync workers, WSGI, DRF views) and async (gunicorn with uvicorn workers, "
+        "ASGI, async views). Starts both servers on free ports against the configured database, seeds a user with "
+        "recordings to list, and reports requests/s and p50/p95/p99 latency per mode. Writes the results to a JSON file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=500, help="Concurrent dashboard clients.")
+        parser.add_argument('--duration', type=float, default=30.0, help="Seconds each mode is driven for.")
+        parser.add_argument('--think-time', type=float, default=1.0,
+                            help="Mean pause between a client's polls, in seconds (jittered +-50%%).")
+        parser.add_argument('--workers', type=int, default=4, help="gunicorn worker processes per server.")
+        parser.add_argument('--recordings', type=int, default=200, help="Recordings (with extracted info) to seed.")
+        parser.add_argument('--modes', nargs='+', choices=list(SERVERS), default=list(SERVERS))
+        parser.add_argument('--no-revalidate', action='store_true',
+                            help="Don't send If-None-Match, so every poll gets a full body instead of mostly 304s.")
+        parser.add_argument('--timeout', type=float, default=30.0, help="Per-request timeout, in seconds.")
+        parser.add_argument('--label', default='', help="Free-form label stored in the results, e.g. a release.")
+        parser.add_argument('--output', default='bench_serving.json')
+
+    def handle(self, *args, **options):
+        user, token = self._seed(options['recordings'])
+        modes = []
+        try:
+            for mode in options['modes']:
+                self.stdout.write(f"{mode}: {options['clients']} clients for {options['duration']:.0f}s ...")
+                with _GunicornServer(SERVERS[mode], options['workers']) as base_url:
+                    modes.append(asyncio.run(self._drive(mode, base_url, token.key, options)))
+        finally:
+            CallRecording.objects.filter(uploaded_by=user).delete()
+            user.delete()
+
+        results = {
+            'label': options['label'],
+            'generated_at': timezone.now().isoformat(),
+            'clients': options['clients'],
+            'duration_seconds': options['duration'],
+            'think_time_seconds': options['think_time'],
+            'workers': options['workers'],
+            'recordings': options['recordings'],
+            'revalidate': not options['no_revalidate'],
+            'modes': modes,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+        self.stdout.write(f"{'mode':<6} {'endpoint':<16} {'req/s':>8} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8}  statuses")
+        for result in modes:
+            for name, endpoint in result['endpoints'].items():
+                latency = endpoint['latency_seconds'] or {'p50': 0, 'p95': 0, 'p99': 0}
+                statuses = ', '.join(f"{status} {count}" for status, count in sorted(endpoint['statuses'].items()))
+                self.stdout.write(
+                    f"{result['mode']:<6} {name:<16} {endpoint['requests_per_second']:>8.1f} {latency['p50']:>8.3f} "
+                    f"{latency['p95']:>8.3f} {latency['p99']:>8.3f}  {statuses}"
+                )
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def _seed(self, count):
+        # Recordings awaiting review, so both list endpoints return full pages
+        user = User.objects.create_user(username=f"bench_serving_{uuid.uuid4().hex[:8]}")
+        token = Token.objects.create(user=user)
+        recordings = CallRecording.objects.bulk_create([
+            CallRecording(
+                uploaded_by=user,
+                audio_file=f"call_recordings/bench_serving_{index}.mp3",
+                status='READY_FOR_REVIEW',
+                transcript_text="Agent: Thanks for calling. " * 200,
+            )
+            for index in range(count)
+        ])
+        ExtractedClientInfo.objects.bulk_create([
+            ExtractedClientInfo(
+                call_recording=recording,
+                client_name=f"Client {recording.id}",
+                company_name="Bench Corp",
+                email=f"client{recording.id}@example.com",
+                service_interest="Onboarding",
+            )
+            for recording in recordings
+        ])
+        return user, token
+
+    async def _drive(self, mode, base_url, token, options):
+        latencies = {name: [] for name, _ in ENDPOINTS}
+        statuses = {name: Counter() for name, _ in ENDPOINTS}
+        deadline = time.monotonic() + options['duration']
+        limits = httpx.Limits(max_connections=options['clients'], max_keepalive_connections=options['clients'])
+
+        async def dashboard(http):
+            etags = {}
+            # Spread the first polls out like dashboards opened at different times
+            await asyncio.sleep(random.uniform(0, options['think_time']))
+            while time.monotonic() < deadline:
+                for name, path in ENDPOINTS:
+                    headers = {'Authorization': f"Token {token}"}
+                    if name in etags and not options['no_revalidate']:
+                        headers['If-None-Match'] = etags[name]
+                    started = time.perf_counter()
+                    try:
+                        response = await http.get(path, headers=headers)
+                        status = response.status_code
+                        if 'ETag' in response.headers:
+                            etags[name] = response.headers['ETag']
+                    except httpx.HTTPError as e:
+                        status = type(e).__name__
+                    latencies[name].append(time.perf_counter() - started)
+                    statuses[name][status] += 1
+                await asyncio.sleep(options['think_time'] * random.uniform(0.5, 1.5))
+
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=options['timeout']) as http:
+            started = time.perf_counter()
+            await asyncio.gather(*(dashboard(http) for _ in range(options['clients'])))
+            wall = time.perf_counter() - started
+
+        return {
+            'mode': mode,
+            'wall_seconds': round(wall, 3),
+            'endpoints': {
+                name: {
+                    'requests': len(latencies[name]),
+                    'requests_per_second': round(len(latencies[name]) / wall, 2),
+                    'latency_seconds': _latency_summary(latencies[name]),
+                    'statuses': {str(status): count for status, count in statuses[name].items()},
+                }
+                for name, _ in ENDPOINTS
+            },
+        }
+
+
+class _GunicornServer:
+    """
+    Runs gunicorn for one mode on a free local port for the duration of a with block, in the
+    same environment (settings, database) as this command. Yields the base URL once it answers.
+    """
+    def __init__(self, server, workers):
+        self.server = server
+        self.workers = workers
+
+    def __enter__(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        env = dict(os.environ, ASYNC_READ_VIEWS_ENABLED=str(self.server['async_views']))
+        env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+        self.log = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', self.server['app'], '-c', 'gunicorn.conf.py',
+             '-k', self.server['worker_class'], '-w', str(self.workers), '-b', f"127.0.0.1:{port}"],
+            cwd=settings.BASE_DIR, env=env, stdout=self.log, stderr=subprocess.STDOUT,
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        started = time.monotonic()
+        while time.monotonic() - started < 30:
+            if self.process.poll() is not None:
+                break
+            try:
+                httpx.get(f"{base_url}{ENDPOINTS[0][1]}", timeout=1) # any response (a 401) means it's up
+                return base_url
+            except httpx.HTTPError:
+                time.sleep(0.2)
+        self.__exit__(None, None, None)
+        raise CommandError(f"gunicorn ({self.server['app']}) did not start:\n{self.output[-2000:]}")
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.log.seek(0)
+        self.output = self.log.read().decode(errors='replace')
+        self.log.close()
@@ -0,0 +1,183 @@
+# agents/management/commands/bench_transcript_storage.py
+import json
+import random
+import statistics
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from agents.compaction import compact_transcript
+from agents.compression import compress_text, decompress_text
+from agents.models import TRANSCRIPT_FIELDS, CallRecording
+from agents.sample_scripts import SCRIPTS
+
+# Every CallRecording column except the transcripts: what the default manager loads now
+HOT_COLUMNS = [
+    field.column for field in CallRecording._meta.concrete_fields if field.name not in TRANSCRIPT_FIELDS
+]
+ALL_COLUMNS = HOT_COLUMNS + list(TRANSCRIPT_FIELDS)
+
+
+def _transcript(rng, chain, length):
+    # Word bigram walk over the sample call scripts: call vocabulary and phrasing without the
+    # verbatim repeats (which would flatter the compression ratio) of concatenating whole scripts
+    words = [rng.choice(chain[None])]
+    size = len(words[0])
+    while size < length:
+        followers = chain.get(words[-1]) or chain[None]
+        words.append(rng.choice(followers))
+        size += len(words[-1]) + 1
+    return ' '.join(words)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the old CallRecording layout (transcripts as plain text columns, loaded by every query) with "
+        "the new one (zstd-compressed columns, deferred by default): bytes per row, transcript column size, and "
+        "the time of the recording list queries, primary key lookups (the status-only saves in tasks.py) and "
+        "detail reads. Builds both layouts as temporary tables with the same rows inside a transaction that "
+        "is rolled back. PostgreSQL only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help="Recordings per layout.")
+        parser.add_argument('--users', type=int, default=20, help="Uploaders the recordings are spread over.")
+        parser.add_argument('--distinct', type=int, default=500, help="Distinct transcripts generated and reused across rows.")
+        parser.add_argument('--min-chars', type=int, default=2000)
+        parser.add_argument('--max-chars', type=int, default=25000)
+        parser.add_argument('--repeats', type=int, default=20, help="Timed runs of each query per layout.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='bench_transcript_storage.json')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("bench_transcript_storage needs PostgreSQL (it reports relation sizes).")
+        rng = random.Random(options['seed'])
+        chain = defaultdict(list)
+        for script in SCRIPTS.values():
+            words = script.split()
+            chain[None].extend(words)
+            for word, follower in zip(words, words[1:]):
+                chain[word].append(follower)
+
+        pool = []
+        for n in range(options['distinct']):
+            text = _transcript(rng, chain, rng.randint(options['min_chars'], options['max_chars']))
+            compacted = compact_transcript(text)
+            pool.append((n, text, compacted, compress_text(text), compress_text(compacted)))
+        self.stdout.write(f"{len(pool)} distinct transcripts, {statistics.mean(len(p[1]) for p in pool):.0f} chars on average")
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("CREATE TEMP TABLE bench_pool (n int PRIMARY KEY, transcript text, compacted text, transcript_z bytea, compacted_z bytea)")
+            cursor.executemany("INSERT INTO bench_pool VALUES (%s, %s, %s, %s, %s)", pool)
+            cursor.execute("CREATE TEMP TABLE bench_plain (LIKE agents_callrecording INCLUDING ALL)")
+            cursor.execute(
+                "ALTER TABLE bench_plain ALTER COLUMN transcript_text TYPE text, "
+                "ALTER COLUMN compacted_transcript_text TYPE text"
+            )
+            cursor.execute("CREATE TEMP TABLE bench_compressed (LIKE agents_callrecording INCLUDING ALL)")
+            for table, transcript, compacted in (
+                ('bench_plain', 'p.transcript', 'p.compacted'),
+                ('bench_compressed', 'p.transcript_z', 'p.compacted_z'),
+            ):
+                started = time.perf_counter()
+                cursor.execute(
+                    f"INSERT INTO {table} (id, uploaded_by_id, upload_timestamp, updated_at, audio_file, status, "
+                    "transcript_text, compacted_transcript_text, transcript_tokens, compacted_transcript_tokens, "
+                    "audio_seconds, transcribed_seconds) "
+                    f"SELECT g, 1 + g %% %s, now() - g * interval '1 minute', now(), 'call_recordings/bench_' || g || '.mp3', "
+                    f"'READY_FOR_REVIEW', {transcript}, {compacted}, length(p.transcript) / 4, length(p.compacted) / 4, "
+                    "length(p.transcript) / 15.0, length(p.transcript) / 15.0 "
+                    "FROM generate_series(1, %s) g JOIN bench_pool p ON p.n = g %% %s",
+                    [options['users'], options['rows'], len(pool)],
+                )
+                cursor.execute(f"ANALYZE {table}")
+                self.stdout.write(f"{table}: {options['rows']} rows written in {time.perf_counter() - started:.1f}s")
+
+            sizes = {}
+            for table in ('bench_plain', 'bench_compressed'):
+                cursor.execute(
+                    f"SELECT pg_total_relation_size(%s), pg_relation_size(%s), pg_indexes_size(%s), "
+                    f"avg(pg_column_size(transcript_text) + coalesce(pg_column_size(compacted_transcript_text), 0)) "
+                    f"FROM {table}",
+                    [table, table, table],
+                )
+                total, heap, indexes, transcript_bytes = cursor.fetchone()
+                sizes[table] = {
+                    'total_bytes': total,
+                    'heap_bytes': heap,
+                    'toast_bytes': total - heap - indexes,
+                    'bytes_per_row': round(total / options['rows']),
+                    'stored_transcript_bytes_per_row': round(float(transcript_bytes)),
+                }
+
+            user_ids = [rng.randint(1, options['users']) for _ in range(options['repeats'])]
+            ids = [rng.randint(1, options['rows']) for _ in range(options['repeats'] * 10)]
+            hot, every = ', '.join(HOT_COLUMNS), ', '.join(ALL_COLUMNS)
+            page = "FROM {table} WHERE uploaded_by_id = %s ORDER BY upload_timestamp DESC, id DESC"
+            queries = {
+                # The same queries before (every column) and after (transcripts deferred)
+                'list_page': [(f"SELECT {{columns}} {page} LIMIT 50", [user_id]) for user_id in user_ids],
+                'list_unpaginated': [(f"SELECT {{columns}} {page}", [user_id]) for user_id in user_ids],
+                'pk_lookup': [("SELECT {columns} FROM {table} WHERE id = %s", [i]) for i in ids],
+            }
+            timings = {}
+            for name, statements in queries.items():
+                timings[name] = {
+                    'before': self._time(cursor, statements, table='bench_plain', columns=every),
+                    'after': self._time(cursor, statements, table='bench_compressed', columns=hot),
+                }
+            # Detail reads load the transcripts in both layouts; after also pays for decompressing them
+            detail = [("SELECT {columns} FROM {table} WHERE id = %s", [i]) for i in ids]
+            timings['detail'] = {
+                'before': self._time(cursor, detail, table='bench_plain', columns=every),
+                'after': self._time(cursor, detail, table='bench_compressed', columns=every, decompress=True),
+            }
+
+            transaction.set_rollback(True)
+
+        results = {
+            'generated_at': timezone.now().isoformat(),
+            'rows': options['rows'],
+            'users': options['users'],
+            'transcript_chars_mean': round(statistics.mean(len(p[1]) for p in pool)),
+            'table_bytes': {'before': sizes['bench_plain'], 'after': sizes['bench_compressed']},
+            'query_ms': timings,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+        mb = 1024 * 1024
+        self.stdout.write(f"{'layout':<8} {'total MB':>9} {'heap MB':>8} {'toast MB':>9} {'bytes/row':>10} {'transcript bytes/row':>21}")
+        for label, table in (('before', 'bench_plain'), ('after', 'bench_compressed')):
+            size = sizes[table]
+            self.stdout.write(
+                f"{label:<8} {size['total_bytes'] / mb:>9.1f} {size['heap_bytes'] / mb:>8.1f} {size['toast_bytes'] / mb:>9.1f} "
+                f"{size['bytes_per_row']:>10} {size['stored_transcript_bytes_per_row']:>21}"
+            )
+        self.stdout.write(f"{'query':<18} {'before p50':>11} {'p95':>8} {'after p50':>10} {'p95':>8}  (ms)")
+        for name, timing in timings.items():
+            self.stdout.write(
+                f"{name:<18} {timing['before']['p50_ms']:>11.2f} {timing['before']['p95_ms']:>8.2f} "
+                f"{timing['after']['p50_ms']:>10.2f} {timing['after']['p95_ms']:>8.2f}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def _time(self, cursor, statements, table, columns, decompress=False):
+        # Run and fetch each statement in full, as the ORM would
+        timings = []
+        for sql, params in statements:
+            started = time.perf_counter()
+            cursor.execute(sql.format(table=table, columns=columns), params)
+            rows = cursor.fetchall()
+            if decompress:
+                for row in rows:
+                    for value in row[-len(TRANSCRIPT_FIELDS):]:
+                        if value is not None:
+                            decompress_text(value)
+            timings.append((time.perf_counter() - started) * 1000)
+        cuts = statistics.quantiles(timings, n=20)
+        return {'p50_ms': round(statistics.median(timings), 3), 'p95_ms': round(cuts[18], 3)}
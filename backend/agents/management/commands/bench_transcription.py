@@ -0,0 +1,105 @@
+# agents/management/commands/bench_transcription.py
+import itertools
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+
+from agents.transcription import get_audio_duration, plan_chunks, transcribe_chunked, transcribe_file
+
+
+class SimulatedSTTClient:
+    """
+    Stand-in for the Groq client whose transcription latency grows with the audio length,
+    so single-shot and chunked transcription can be compared without API calls. Each request
+    gets a numbered text, so the stitched transcript shows which segments made it in.
+    """
+    def __init__(self, base_latency, realtime_factor):
+        self.base_latency = base_latency
+        self.realtime_factor = realtime_factor
+        self.audio = SimpleNamespace(transcriptions=self)
+        self.requests = itertools.count(1)
+
+    def create(self, file, model):
+        name, data = file
+        if hasattr(data, 'read'):
+            data = data.read()
+        suffix = os.path.splitext(name)[1]
+        with tempfile.NamedTemporaryFile(suffix=suffix) as tmp:
+            tmp.write(data)
+            tmp.flush()
+            duration = get_audio_duration(tmp.name)
+        time.sleep(self.base_latency + duration * self.realtime_factor)
+        return SimpleNamespace(text=f"segment {next(self.requests)} of {duration:.0f} seconds.")
+
+
+class Command(BaseCommand):
+    help = "Benchmarks single-shot vs. chunked transcription wall-clock time against recording length."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=int, nargs='+', default=[5, 15, 30, 45, 60],
+                            help="Recording lengths to benchmark, in minutes.")
+        parser.add_argument('--chunk-seconds', type=int, default=600)
+        parser.add_argument('--overlap-seconds', type=int, default=5)
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--base-latency', type=float, default=0.5,
+                            help="Fixed per-request latency of the simulated STT endpoint, in seconds.")
+        parser.add_argument('--realtime-factor', type=float, default=0.01,
+                            help="Simulated processing seconds per second of audio.")
+
+    def handle(self, *args, **options):
+        if any(minutes <= 0 for minutes in options['minutes']):
+            raise CommandError("--minutes must all be positive.")
+        if options['concurrency'] < 1:
+            raise CommandError("--concurrency must be at least 1.")
+        if not 0 <= options['overlap_seconds'] < options['chunk_seconds']:
+            raise CommandError("--overlap-seconds must be at least 0 and less than --chunk-seconds.")
+
+        client = SimulatedSTTClient(options['base_latency'], options['realtime_factor'])
+        work_dir = tempfile.mkdtemp(prefix='bench_transcription_')
+        try:
+            self.stdout.write(f"{'minutes':>8} {'single (s)':>12} {'chunked (s)':>12} {'speedup':>8}")
+            for minutes in options['minutes']:
+                audio_path = os.path.join(work_dir, f"silence_{minutes}m.mp3")
+                try:
+                    subprocess.run(
+                        ['ffmpeg', '-v', 'error', '-y', '-f', 'lavfi', '-i', 'anullsrc=r=16000:cl=mono',
+                         '-t', str(minutes * 60), '-q:a', '9', audio_path],
+                        check=True,
+                    )
+                    chunks = plan_chunks(get_audio_duration(audio_path), options['chunk_seconds'], options['overlap_seconds'])
+
+                    started = time.perf_counter()
+                    single_transcript = transcribe_file(client, audio_path)
+                    single = time.perf_counter() - started
+
+                    started = time.perf_counter()
+                    chunked_transcript = transcribe_chunked(
+                        client,
+                        audio_path,
+                        chunk_seconds=options['chunk_seconds'],
+                        overlap_seconds=options['overlap_seconds'],
+                        max_concurrency=options['concurrency'],
+                    )
+                    chunked = time.perf_counter() - started
+                except (OSError, subprocess.CalledProcessError, ValueError, KeyError) as e:
+                    raise CommandError(f"Benchmark of a {minutes} minute recording failed: {e}") from e
+
+                # One segment for the whole file, then one per planned chunk, none lost in stitching
+                self.check_transcript(minutes, 'single', single_transcript, 1)
+                self.check_transcript(minutes, 'chunked', chunked_transcript, len(chunks))
+                self.stdout.write(f"{minutes:>8} {single:>12.2f} {chunked:>12.2f} {single / chunked:>7.2f}x")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def check_transcript(self, minutes, mode, transcript, expected_segments):
+        segments = (transcript or '').count('segment ')
+        if segments != expected_segments:
+            raise CommandError(
+                f"{mode} transcript of the {minutes} minute recording has {segments} segments, "
+                f"expected {expected_segments}: {transcript!r}"
+            )
@@ -0,0 +1,121 @@
+# agents/management/commands/eval_compaction.py
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from agents.compaction import compact_transcript, compaction_report
+from agents.preextract import pre_extract
+from agents.sample_scripts import EXPECTED_FIELDS, SCRIPTS
+
+FILLERS = ['um,', 'uh,', 'you know,', 'like,', 'I mean,']
+
+
+def make_disfluent(text):
+    """
+    Deterministically roughens a clean script the way real calls come out of Whisper:
+    fillers, stuttered words and small talk around the actual content.
+    """
+    words = text.split()
+    noisy = []
+    for index, word in enumerate(words):
+        if index % 6 == 3:
+            filler = FILLERS[index % len(FILLERS)]
+            if filler in ('um,', 'uh,') or not noisy or noisy[-1][-1] in ',.?!':
+                noisy.append(filler)
+            else:
+                noisy[-1] += ',' # "leadership, like, training"
+                noisy.append(filler)
+        noisy.append(word)
+        if index % 9 == 4 and word.isalpha():
+            noisy.append(word)
+    return (
+        "Hi there. How are you today? I'm good, thanks, and you? "
+        + ' '.join(noisy)
+        + " Thank you for your time. Thank you for your time. Have a great day. Bye."
+    )
+
+
+def _found_in(value, text):
+    if re.fullmatch(r'[\d\s()+.-]+', value):
+        return re.sub(r'\D', '', value) in re.sub(r'\D', '', text)
+    return value.lower() in text.lower()
+
+
+def _score(extracted, expected):
+    # Fields matching the expected value, out of the expected ones; phone numbers compare by digits
+    correct = 0
+    for field, value in expected.items():
+        got = extracted.get(field) or ''
+        if field == 'contact_number':
+            correct += re.sub(r'\D', '', got) == re.sub(r'\D', '', value)
+        elif field == 'service_interest':
+            correct += value.lower() in got.lower()
+        else:
+            correct += got.strip().lower() == value.lower()
+    return correct
+
+
+class Command(BaseCommand):
+    help = (
+        "Checks transcript compaction against the test_audio scripts (clean and with added disfluencies): "
+        "token savings, and that no expected client detail is lost. --live also runs the LLM extraction "
+        "on the full and compacted transcripts and fails if the compacted one scores lower."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entity-context', type=int,
+                            default=settings.TRANSCRIPT_COMPACTION_ENTITY_CONTEXT_SENTENCES,
+                            help="Keep only entity-bearing sentences plus this many neighbours (default: setting).")
+        parser.add_argument('--live', action='store_true', help="Call the extraction LLM (needs GROQ_API_KEY).")
+
+    def handle(self, *args, **options):
+        context = options['entity_context']
+        failures = []
+        totals = {'input_tokens': 0, 'output_tokens': 0}
+        live_scores = {'full': 0, 'compacted': 0}
+
+        self.stdout.write(f"entity context: {context if context is not None else 'off'}")
+        self.stdout.write(f"{'script':<44} {'tokens':>7} {'compact':>8} {'saved':>6}  details kept")
+        for name, script in SCRIPTS.items():
+            expected = EXPECTED_FIELDS[name]
+            for variant, text in (('clean', script), ('disfluent', make_disfluent(script))):
+                compacted = compact_transcript(text, context)
+                report = compaction_report(text, compacted)
+                totals['input_tokens'] += report['input_tokens']
+                totals['output_tokens'] += report['output_tokens']
+
+                lost = [field for field, value in expected.items() if not _found_in(value, compacted)]
+                if pre_extract(compacted) != pre_extract(text):
+                    lost.append('pre_extraction')
+                if lost:
+                    failures.append(f"{name} ({variant}): lost {', '.join(lost)}")
+
+                self.stdout.write(
+                    f"{name + ' (' + variant + ')':<44} {report['input_tokens']:>7} {report['output_tokens']:>8} "
+                    f"{report['saved_ratio']:>6.0%}  {'all' if not lost else 'LOST ' + ', '.join(lost)}"
+                )
+                if options['live']:
+                    self._live(name, variant, text, compacted, expected, live_scores, failures)
+
+        saved = 1 - totals['output_tokens'] / totals['input_tokens']
+        self.stdout.write(f"total: {totals['input_tokens']} -> {totals['output_tokens']} tokens ({saved:.0%} saved)")
+        if options['live']:
+            self.stdout.write(f"LLM fields correct: full {live_scores['full']}, compacted {live_scores['compacted']}")
+
+        if failures:
+            raise CommandError("Compaction regressions:\n" + "\n".join(failures))
+        self.stdout.write(self.style.SUCCESS("No extraction-relevant detail lost."))
+
+    def _live(self, name, variant, text, compacted, expected, live_scores, failures):
+        from agents.groq_client import get_groq_client
+        from agents.tasks import _extract_single
+
+        client = get_groq_client()
+        full_score = _score(_extract_single(client, text)[0], expected)
+        compacted_score = _score(_extract_single(client, compacted)[0], expected)
+        live_scores['full'] += full_score
+        live_scores['compacted'] += compacted_score
+        self.stdout.write(f"    LLM fields correct: full {full_score}/{len(expected)}, compacted {compacted_score}/{len(expected)}")
+        if compacted_score < full_score:
+            failures.append(f"{name} ({variant}): LLM extraction regressed {full_score} -> {compacted_score}")
@@ -0,0 +1,107 @@
+# agents/management/commands/explain_hot_queries.py
+import random
+from types import SimpleNamespace
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from agents.models import CallRecording, ExtractedClientInfo
+from agents.views import CallRecordingViewSet, ExtractedClientInfoViewSet
+
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a large dataset (rolled back afterwards), runs EXPLAIN on the hot list queries and "
+        "fails if a plan does not use the index it is supposed to."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help="Recordings to seed.")
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--review-ratio', type=float, default=0.01,
+                            help="Fraction of recordings in READY_FOR_REVIEW.")
+        parser.add_argument('--show-plans', action='store_true')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Query plans are only meaningful on PostgreSQL.")
+
+        with transaction.atomic():
+            users = self._seed(options)
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {CallRecording._meta.db_table}")
+                cursor.execute(f"ANALYZE {ExtractedClientInfo._meta.db_table}")
+
+            uploader, reviewer = users[0], users[1]
+            failures = []
+            for name, queryset, expected_index in self._hot_queries(uploader, reviewer):
+                plan = queryset.explain()
+                used = expected_index in plan
+                self.stdout.write(f"{'OK ' if used else 'FAIL'} {name}: expects {expected_index}")
+                if options['show_plans'] or not used:
+                    self.stdout.write(plan + "\n")
+                if not used:
+                    failures.append(name)
+
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"Plans not using their index: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("All hot queries use their indexes."))
+
+    def _hot_queries(self, uploader, reviewer):
+        page = CallRecordingViewSet.pagination_class.page_size + 1 # keyset pagination fetches one extra row
+
+        def view_queryset(viewset_class, user):
+            view = viewset_class()
+            view.request = SimpleNamespace(user=user)
+            view.action = 'list'
+            return view.get_queryset()
+
+        superuser = SimpleNamespace(is_superuser=True)
+        return [
+            ("recordings list (uploader)", view_queryset(CallRecordingViewSet, uploader)[:page], 'rec_user_uploaded_idx'),
+            ("recordings list (superuser)", view_queryset(CallRecordingViewSet, superuser)[:page], 'rec_uploaded_idx'),
+            ("review queue (extracted info)", view_queryset(ExtractedClientInfoViewSet, reviewer), 'rec_review_ready_idx'),
+        ]
+
+    def _seed(self, options):
+        rows, user_count = options['rows'], options['users']
+        self.stdout.write(f"Seeding {rows} recordings for {user_count} users...")
+        users = User.objects.bulk_create(
+            [User(username=f"explain_hot_queries_{i}") for i in range(user_count)],
+            batch_size=BATCH_SIZE,
+        )
+        rng = random.Random(42)
+        now = timezone.now()
+        for start in range(0, rows, BATCH_SIZE):
+            recordings = []
+            for i in range(start, min(start + BATCH_SIZE, rows)):
+                recordings.append(CallRecording(
+                    uploaded_by=users[i % user_count],
+                    audio_file=f'call_recordings/seed_{i}.mp3',
+                    status='READY_FOR_REVIEW' if rng.random() < options['review_ratio'] else 'APPROVED',
+                ))
+            recordings = CallRecording.objects.bulk_create(recordings)
+            ExtractedClientInfo.objects.bulk_create([
+                ExtractedClientInfo(
+                    call_recording=recording,
+                    client_name=f"Client {recording.id}",
+                    approved_by=None if recording.status == 'READY_FOR_REVIEW' else users[rng.randrange(user_count)],
+                    is_approved=recording.status == 'APPROVED',
+                )
+                for recording in recordings
+            ])
+
+        # auto_now_add stamps every row with ~now; spread them out so ordering is realistic
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {CallRecording._meta.db_table} SET upload_timestamp = %s - (id * interval '1 second') "
+                f"WHERE uploaded_by_id = ANY(%s)",
+                [now, [user.id for user in users]],
+            )
+        return users
@@ -0,0 +1,17 @@
+# agents/management/commands/invalidate_llm_cache.py
+from django.core.management.base import BaseCommand
+
+from agents.llm_cache import cache_stats, invalidate_prompt_version
+from agents.tasks import PROMPT_VERSION
+
+
+class Command(BaseCommand):
+    help = "Deletes cached LLM extraction results for a prompt version (default: the current PROMPT_VERSION)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('prompt_version', nargs='?', default=PROMPT_VERSION)
+
+    def handle(self, *args, **options):
+        deleted = invalidate_prompt_version(options['prompt_version'])
+        self.stdout.write(f"Deleted {deleted} LLM cache entries for prompt version {options['prompt_version']}.")
+        self.stdout.write(f"Cache now: {cache_stats()}")
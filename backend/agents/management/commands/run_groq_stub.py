@@ -0,0 +1,52 @@
+# agents/management/commands/run_groq_stub.py
+from django.core.management.base import BaseCommand
+
+from agents.groq_stub import StubBehaviour, make_stub_server
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the local Groq-compatible stub (audio/transcriptions and tool-calling chat/completions) with "
+        "canned responses from the test_audio scripts and injectable latency, caps and errors. Point "
+        "GROQ_BASE_URL at it for load and soak tests; response counts are served at /stub/stats."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8090)
+        parser.add_argument('--transcription-latency', type=float, default=1.0,
+                            help="Median latency of audio/transcriptions, in seconds.")
+        parser.add_argument('--completion-latency', type=float, default=0.5,
+                            help="Median latency of chat/completions, in seconds.")
+        parser.add_argument('--latency-sigma', type=float, default=0.3, help="Log-normal spread of latencies (0 = fixed).")
+        parser.add_argument('--rate-429', type=float, default=0.0, help="Fraction of requests answered with 429.")
+        parser.add_argument('--rate-5xx', type=float, default=0.0, help="Fraction of requests answered with 503.")
+        parser.add_argument('--transcription-rpm', type=int, default=0,
+                            help="Transcription requests per minute before 429s (0 = uncapped).")
+        parser.add_argument('--completion-rpm', type=int, default=0,
+                            help="Chat completion requests per minute before 429s (0 = uncapped).")
+        parser.add_argument('--max-concurrency', type=int, default=0,
+                            help="Requests in flight before 429s (0 = uncapped).")
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        behaviour = StubBehaviour(
+            transcription_latency=options['transcription_latency'],
+            completion_latency=options['completion_latency'],
+            latency_sigma=options['latency_sigma'],
+            rate_429=options['rate_429'],
+            rate_5xx=options['rate_5xx'],
+            transcription_rpm=options['transcription_rpm'],
+            completion_rpm=options['completion_rpm'],
+            max_concurrency=options['max_concurrency'],
+            seed=options['seed'],
+        )
+        server = make_stub_server(options['host'], options['port'], behaviour=behaviour)
+        self.stdout.write(f"Groq stub listening on http://{options['host']}:{server.server_address[1]} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Responses: {dict(behaviour.counts)}")
@@ -0,0 +1,132 @@
+# agents/metrics.py
+import glob
+import logging
+import os
+from django.db.models import Max
+from django.utils import timezone
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, multiprocess, start_http_server
+from .models import RecordingStageTransition
+
+logger = logging.getLogger(__name__)
+
+# Prefork Celery workers (and multi-process web servers) write metrics to files in this directory,
+# which is aggregated at scrape time. Must be set in the environment before prometheus_client is imported.
+MULTIPROCESS_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+if MULTIPROCESS_DIR:
+    os.makedirs(MULTIPROCESS_DIR, exist_ok=True)
+
+_STAGE_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200, 21600, 86400)
+
+STAGE_SECONDS = Histogram(
+    'pipeline_stage_seconds',
+    "Time recordings spend in each pipeline stage: waiting in the queue (queue_wait) or being processed (service).",
+    ['stage', 'phase'],
+    buckets=_STAGE_BUCKETS,
+)
+UPLOAD_TO_READY_SECONDS = Histogram(
+    'pipeline_upload_to_ready_seconds',
+    "Time from upload until the extracted information is ready for review.",
+    buckets=_STAGE_BUCKETS,
+)
+GROQ_REQUEST_SECONDS = Histogram(
+    'groq_request_seconds',
+    "Latency of Groq API calls by kind (audio, llm) and outcome (ok, throttled, error).",
+    ['kind', 'outcome'],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+)
+GROQ_AUDIO_SECONDS = Counter('groq_audio_seconds', "Audio seconds billed for successful transcription calls.")
+GROQ_LLM_TOKENS = Counter('groq_llm_tokens', "LLM tokens reported by Groq, by type (prompt, completion).", ['type'])
+AUDIO_BYTES_SAVED = Counter('audio_normalisation_bytes_saved', "Upload bytes not sent to STT thanks to audio normalisation.")
+AUDIO_SECONDS_SAVED = Counter('audio_normalisation_seconds_saved', "Audio seconds trimmed as silence before STT.")
+
+# stage transition -> (stage label, phase, the transitions it is measured from)
+_TIMINGS = {
+    'transcribe_started': ('transcribe', 'queue_wait', ('queued',)),
+    'transcribe_finished': ('transcribe', 'service', ('transcribe_started',)),
+    'transcribe_failed': ('transcribe', 'service', ('transcribe_started',)),
+    'extract_started': ('extract', 'queue_wait', ('transcribe_finished',)),
+    'extract_finished': ('extract', 'service', ('extract_started',)),
+    'extract_failed': ('extract', 'service', ('extract_started',)),
+    'approved': ('review', 'queue_wait', ('ready_for_review',)),
+    'rejected': ('review', 'queue_wait', ('ready_for_review',)),
+}
+
+
+def record_stage(recording, stage):
+    """
+    Records a stage transition for a recording and observes how long the stage it ends took.
+    """
+    record_stages([recording.id], stage)
+    if stage == 'ready_for_review':
+        UPLOAD_TO_READY_SECONDS.observe((timezone.now() - recording.upload_timestamp).total_seconds())
+
+
+def record_stages(recording_ids, stage):
+    """
+    Records the same stage transition for several recordings (e.g. bulk review) in two queries.
+    """
+    now = timezone.now()
+    RecordingStageTransition.objects.bulk_create(
+        [RecordingStageTransition(call_recording_id=rid, stage=stage, timestamp=now) for rid in recording_ids]
+    )
+
+    timing = _TIMINGS.get(stage)
+    if timing is None:
+        return
+    label, phase, since_stages = timing
+    latest = (RecordingStageTransition.objects
+              .filter(call_recording_id__in=recording_ids, stage__in=since_stages, timestamp__lte=now)
+              .values('call_recording_id').annotate(since=Max('timestamp')))
+    histogram = STAGE_SECONDS.labels(label, phase)
+    for row in latest:
+        histogram.observe((now - row['since']).total_seconds())
+
+
+def observe_groq_request(kind, outcome, seconds, audio_seconds=None):
+    GROQ_REQUEST_SECONDS.labels(kind, outcome).observe(seconds)
+    if audio_seconds:
+        GROQ_AUDIO_SECONDS.inc(audio_seconds)
+
+
+def observe_llm_usage(usage):
+    """
+    Counts the tokens from a chat completion's usage block (if the response had one).
+    """
+    if usage is None:
+        return
+    GROQ_LLM_TOKENS.labels('prompt').inc(usage.prompt_tokens or 0)
+    GROQ_LLM_TOKENS.labels('completion').inc(usage.completion_tokens or 0)
+
+
+def observe_audio_normalisation(report):
+    # Counters can't go down; a re-encode bigger than the upload just counts as no saving
+    AUDIO_BYTES_SAVED.inc(max(0, report['bytes_saved']))
+    AUDIO_SECONDS_SAVED.inc(max(0, report['seconds_saved']))
+
+
+def metrics_registry():
+    """
+    The registry to expose: this process's metrics, or all processes' in multiprocess mode.
+    """
+    if MULTIPROCESS_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def start_metrics_server(port):
+    """
+    Serves /metrics for a Celery worker from its main process. Stale files from earlier runs
+    are cleared first, since the children that wrote them are gone.
+    """
+    if MULTIPROCESS_DIR:
+        for path in glob.glob(os.path.join(MULTIPROCESS_DIR, '*.db')):
+            os.remove(path)
+    start_http_server(port, registry=metrics_registry())
+    logger.info(f"Serving worker metrics on port {port}.")
+
+
+def mark_process_dead(pid):
+    if MULTIPROCESS_DIR:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,34 @@
+# agents/middleware.py
+from urllib.parse import parse_qs
+from channels.auth import AuthMiddlewareStack
+from channels.db import database_sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.authtoken.models import Token
+
+
+@database_sync_to_async
+def get_user_for_token(key):
+    try:
+        return Token.objects.select_related('user').get(key=key).user
+    except Token.DoesNotExist:
+        return AnonymousUser()
+
+
+class TokenAuthMiddleware:
+    """
+    Authenticates WebSocket connections with the same DRF token the REST API uses.
+    Browsers can't set headers on WebSockets, so the token comes in the query string (?token=...).
+    """
+    def __init__(self, inner):
+        self.inner = inner
+
+    async def __call__(self, scope, receive, send):
+        token = parse_qs(scope.get('query_string', b'').decode()).get('token')
+        if token:
+            scope = dict(scope, user=await get_user_for_token(token[0]))
+        return await self.inner(scope, receive, send)
+
+
+def TokenAuthMiddlewareStack(inner):
+    # Session auth first (browsable API, admin), token auth overrides it when a token is given
+    return AuthMiddlewareStack(TokenAuthMiddleware(inner))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callrecording',
+            name='audio_sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.CreateModel(
+            name='TranscriptCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_sha256', models.CharField(max_length=64)),
+                ('stt_model', models.CharField(max_length=100)),
+                ('transcript_text', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now=True, db_index=True)),
+                ('hits', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('content_sha256', 'stt_model')},
+            },
+        ),
+    ]
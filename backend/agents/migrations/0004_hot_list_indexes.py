@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:26
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking writes on large tables
+    atomic = False
+
+    dependencies = [
+        ('agents', '0003_upload_session'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='callrecording',
+            index=models.Index(fields=['uploaded_by', '-upload_timestamp', '-id'], name='rec_user_uploaded_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='callrecording',
+            index=models.Index(fields=['-upload_timestamp', '-id'], name='rec_uploaded_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='callrecording',
+            index=models.Index(condition=models.Q(('status', 'READY_FOR_REVIEW')), fields=['-upload_timestamp'], name='rec_review_ready_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0005_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callrecording',
+            name='compacted_transcript_text',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='callrecording',
+            name='compacted_transcript_tokens',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='callrecording',
+            name='transcript_tokens',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
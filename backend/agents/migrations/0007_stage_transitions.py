@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:56
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0006_transcript_compaction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecordingStageTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(choices=[('queued', 'Queued'), ('transcribe_started', 'Transcription Started'), ('transcribe_finished', 'Transcription Finished'), ('transcribe_failed', 'Transcription Failed'), ('extract_started', 'Extraction Started'), ('extract_finished', 'Extraction Finished'), ('extract_failed', 'Extraction Failed'), ('ready_for_review', 'Ready for Review'), ('approved', 'Approved'), ('rejected', 'Rejected')], max_length=32)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('call_recording', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stage_transitions', to='agents.callrecording')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['call_recording', 'stage', '-timestamp'], name='stage_rec_stage_ts_idx')],
+            },
+        ),
+    ]
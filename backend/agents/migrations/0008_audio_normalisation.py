@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0007_stage_transitions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callrecording',
+            name='audio_bytes',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='callrecording',
+            name='audio_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='callrecording',
+            name='normalised_audio_bytes',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='callrecording',
+            name='normalised_audio_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
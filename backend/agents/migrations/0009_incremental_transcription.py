@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0008_audio_normalisation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callrecording',
+            name='transcribed_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='extractedclientinfo',
+            name='is_speculative',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='extractedclientinfo',
+            index=models.Index(condition=models.Q(('is_speculative', True)), fields=['is_speculative'], name='info_speculative_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from agents.compression import compress_json, decompress_json
+
+BATCH_SIZE = 500
+
+
+def move_raw_llm_output(apps, schema_editor):
+    # Copies raw_llm_output into compressed side rows, BATCH_SIZE rows at a time in id order,
+    # so memory stays flat however large the table is
+    ExtractedClientInfo = apps.get_model('agents', 'ExtractedClientInfo')
+    RawLLMOutput = apps.get_model('agents', 'RawLLMOutput')
+    last_id = 0
+    while True:
+        batch = list(
+            ExtractedClientInfo.objects.filter(id__gt=last_id, raw_llm_output__isnull=False)
+            .order_by('id').values_list('id', 'raw_llm_output')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        rows = []
+        for extracted_info_id, value in batch:
+            data, raw_bytes = compress_json(value)
+            rows.append(RawLLMOutput(extracted_info_id=extracted_info_id, data=data, raw_bytes=raw_bytes))
+        RawLLMOutput.objects.bulk_create(rows, ignore_conflicts=True)
+        last_id = batch[-1][0]
+
+
+def restore_raw_llm_output(apps, schema_editor):
+    ExtractedClientInfo = apps.get_model('agents', 'ExtractedClientInfo')
+    RawLLMOutput = apps.get_model('agents', 'RawLLMOutput')
+    last_id = 0
+    while True:
+        batch = list(RawLLMOutput.objects.filter(extracted_info_id__gt=last_id).order_by('extracted_info_id')[:BATCH_SIZE])
+        if not batch:
+            break
+        infos = [ExtractedClientInfo(id=row.extracted_info_id, raw_llm_output=decompress_json(row.data)) for row in batch]
+        ExtractedClientInfo.objects.bulk_update(infos, ['raw_llm_output'])
+        last_id = batch[-1].extracted_info_id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0009_incremental_transcription'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RawLLMOutput',
+            fields=[
+                ('extracted_info', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='raw_output', serialize=False, to='agents.extractedclientinfo')),
+                ('data', models.BinaryField()),
+                ('raw_bytes', models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.RunPython(move_raw_llm_output, restore_raw_llm_output),
+        migrations.RemoveField(
+            model_name='extractedclientinfo',
+            name='raw_llm_output',
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:02
+
+from django.db import migrations
+
+import agents.models
+
+BATCH_SIZE = 500
+
+# Old plain-text column -> compressed column it is copied into
+COLUMNS = {
+    'transcript_text': 'transcript_data',
+    'compacted_transcript_text': 'compacted_transcript_data',
+}
+
+
+def _copy(apps, sources, targets):
+    # BATCH_SIZE recordings at a time in id order, so memory stays flat however large the table is.
+    # The compressed columns are CompressedTextField, so both sides read and write str.
+    CallRecording = apps.get_model('agents', 'CallRecording')
+    last_id = 0
+    while True:
+        batch = list(CallRecording.objects.filter(id__gt=last_id).order_by('id').values_list('id', *sources)[:BATCH_SIZE])
+        if not batch:
+            break
+        recordings = [CallRecording(id=row[0], **dict(zip(targets, row[1:]))) for row in batch]
+        CallRecording.objects.bulk_update(recordings, targets)
+        last_id = batch[-1][0]
+
+
+def compress_transcripts(apps, schema_editor):
+    _copy(apps, list(COLUMNS), list(COLUMNS.values()))
+
+
+def decompress_transcripts(apps, schema_editor):
+    _copy(apps, list(COLUMNS.values()), list(COLUMNS))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0010_raw_llm_output_side_table'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callrecording',
+            name='transcript_data',
+            field=agents.models.CompressedTextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='callrecording',
+            name='compacted_transcript_data',
+            field=agents.models.CompressedTextField(blank=True, null=True),
+        ),
+        migrations.RunPython(compress_transcripts, decompress_transcripts),
+        migrations.RemoveField(
+            model_name='callrecording',
+            name='transcript_text',
+        ),
+        migrations.RemoveField(
+            model_name='callrecording',
+            name='compacted_transcript_text',
+        ),
+        migrations.RenameField(
+            model_name='callrecording',
+            old_name='transcript_data',
+            new_name='transcript_text',
+        ),
+        migrations.RenameField(
+            model_name='callrecording',
+            old_name='compacted_transcript_data',
+            new_name='compacted_transcript_text',
+        ),
+    ]
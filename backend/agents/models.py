@@ -1,7 +1,60 @@
+import uuid
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+from .compression import compress_json, compress_text, decompress_json, decompress_text
 
-class CallRecording(models.Model):
+class CompressedTextField(models.BinaryField):
+    """
+    Text stored zstd-compressed (agents/compression.py) in a bytea/blob column. Reads and writes
+    str like a TextField; only the column holds bytes.
+    """
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return decompress_text(value)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if isinstance(value, str):
+            value = compress_text(value)
+        return super().get_db_prep_value(value, connection, prepared)
+
+    def to_python(self, value):
+        return value
+
+    def value_to_string(self, obj):
+        # Fixtures and dumpdata hold the text, not base64 of the compressed bytes
+        return self.value_from_object(obj)
+
+class UpdatedAtModel(models.Model):
+    # Last change time, used for conditional GETs (ETag/Last-Modified) and ?since= delta sync
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        # auto_now only fires for fields being saved, so partial saves must include updated_at
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'updated_at' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'updated_at']
+        super().save(*args, **kwargs)
+
+# Loaded only where the transcript is used: detail views, transcription and extraction
+TRANSCRIPT_FIELDS = ('transcript_text', 'compacted_transcript_text')
+
+class CallRecordingQuerySet(models.QuerySet):
+    def with_transcripts(self):
+        return self.defer(None)
+
+class CallRecordingManager(models.Manager.from_queryset(CallRecordingQuerySet)):
+    # Status updates, lists and ownership checks never need the transcripts, so they are deferred by
+    # default. Related lookups (extracted_info.call_recording, select_related) don't go through this
+    # manager and still load them unless deferred there.
+    def get_queryset(self):
+        return super().get_queryset().defer(*TRANSCRIPT_FIELDS)
+
+class CallRecording(UpdatedAtModel):
     uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     upload_timestamp = models.DateTimeField(auto_now_add=True)
     audio_file = models.FileField(upload_to='call_recordings/') # Will store files in MEDIA_ROOT/call_recordings/
@@ -20,12 +73,100 @@ class CallRecording(models.Model):
             ('EXTRACTION_FAILED', 'Information Extraction Failed'), # New status
         ]
     )
-    transcript_text = models.TextField(blank=True, null=True) # To store the STT output
+    transcript_text = CompressedTextField(blank=True, null=True) # To store the STT output
+    audio_sha256 = models.CharField(max_length=64, blank=True, null=True, db_index=True) # Content hash of the uploaded audio
+    # Transcript with fillers, repeats and boilerplate removed; this is what the extraction prompt uses
+    compacted_transcript_text = CompressedTextField(blank=True, null=True)
+    transcript_tokens = models.PositiveIntegerField(blank=True, null=True) # Estimated tokens before compaction
+    compacted_transcript_tokens = models.PositiveIntegerField(blank=True, null=True) # ... and after
+    # Audio sent to the STT endpoint after downmixing, resampling and silence trimming, vs. the upload
+    audio_bytes = models.PositiveBigIntegerField(blank=True, null=True)
+    normalised_audio_bytes = models.PositiveBigIntegerField(blank=True, null=True)
+    audio_seconds = models.FloatField(blank=True, null=True)
+    normalised_audio_seconds = models.FloatField(blank=True, null=True)
+    # Incremental transcription progress: seconds of (normalised) audio transcript_text covers so far
+    transcribed_seconds = models.FloatField(blank=True, null=True)
+
+    objects = CallRecordingManager()
+
+    class Meta:
+        indexes = [
+            # Per-user recording list, newest first (CallRecordingViewSet, keyset pagination)
+            models.Index(fields=['uploaded_by', '-upload_timestamp', '-id'], name='rec_user_uploaded_idx'),
+            # Superuser list of all recordings
+            models.Index(fields=['-upload_timestamp', '-id'], name='rec_uploaded_idx'),
+            # Review queue: only the small set of recordings waiting for review
+            models.Index(
+                fields=['-upload_timestamp'],
+                condition=models.Q(status='READY_FOR_REVIEW'),
+                name='rec_review_ready_idx',
+            ),
+            # Per-user ETag state (max updated_at) and ?since= delta sync
+            models.Index(fields=['uploaded_by', 'updated_at', 'id'], name='rec_user_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Call {self.id} by {self.uploaded_by.username if self.uploaded_by else 'Unknown'} - {self.status}"
     
-class ExtractedClientInfo(models.Model):
+class RecordingStageTransition(models.Model):
+    # One row per pipeline stage transition; status is overwritten, these are kept, so the time a
+    # recording spent waiting and being worked on in each stage can be reconstructed
+    STAGES = [
+        ('queued', 'Queued'),
+        ('transcribe_started', 'Transcription Started'),
+        ('transcribe_finished', 'Transcription Finished'),
+        ('transcribe_failed', 'Transcription Failed'),
+        ('extract_started', 'Extraction Started'),
+        ('extract_finished', 'Extraction Finished'),
+        ('extract_failed', 'Extraction Failed'),
+        ('ready_for_review', 'Ready for Review'),
+        ('approved', 'Approved'),
+        ('rejected', 'Rejected'),
+    ]
+    call_recording = models.ForeignKey(CallRecording, on_delete=models.CASCADE, related_name='stage_transitions')
+    stage = models.CharField(max_length=32, choices=STAGES)
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Latest transition of a given stage for a recording (queue wait / service time lookups)
+            models.Index(fields=['call_recording', 'stage', '-timestamp'], name='stage_rec_stage_ts_idx'),
+        ]
+
+    def __str__(self):
+        return f"Call {self.call_recording_id} {self.stage} at {self.timestamp:%Y-%m-%d %H:%M:%S}"
+
+class TranscriptCache(models.Model):
+    # Transcripts keyed by audio content hash, so re-uploaded recordings skip the STT call
+    content_sha256 = models.CharField(max_length=64)
+    stt_model = models.CharField(max_length=100)
+    transcript_text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now=True, db_index=True) # Used for least-recently-used eviction
+    hits = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('content_sha256', 'stt_model')
+
+    def __str__(self):
+        return f"Transcript cache {self.content_sha256[:12]} ({self.stt_model})"
+
+class UploadSession(models.Model):
+    # Resumable chunked upload; chunks are appended to partial_file until the upload is finalized
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    sha256 = models.CharField(max_length=64) # Expected checksum, verified at finalize
+    received_bytes = models.BigIntegerField(default=0)
+    partial_file = models.CharField(max_length=255) # Path relative to MEDIA_ROOT
+    created_at = models.DateTimeField(auto_now_add=True)
+    call_recording = models.OneToOneField(CallRecording, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_session')
+
+    def __str__(self):
+        return f"Upload {self.id} ({self.received_bytes}/{self.total_size} bytes) by {self.user_id}"
+
+class ExtractedClientInfo(UpdatedAtModel):
     call_recording = models.OneToOneField(CallRecording, on_delete=models.CASCADE, related_name='extracted_info')
     client_name = models.CharField(max_length=255, blank=True, null=True)
     company_name = models.CharField(max_length=255, blank=True, null=True)
@@ -37,10 +178,37 @@ class ExtractedClientInfo(models.Model):
     approved_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='approved_extractions')
     approval_timestamp = models.DateTimeField(null=True, blank=True)
     review_notes = models.TextField(blank=True, null=True)
-    raw_llm_output = models.JSONField(blank=True, null=True)
+    # The full LLM response behind the extraction is in RawLLMOutput, served at /extracted-info/{id}/raw/
+    # Extracted from a partial transcript while the recording is still being transcribed; not reviewable yet
+    is_speculative = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # Reviewer list: the few speculative results in flight (see ExtractedClientInfoViewSet.get_queryset)
+            models.Index(fields=['is_speculative'], condition=models.Q(is_speculative=True), name='info_speculative_idx'),
+        ]
+
+    def __str__(self):
+        return f"Extracted Info for Call {self.call_recording_id} - Approved: {self.is_approved}"
+
+class RawLLMOutput(models.Model):
+    # The full LLM response(s) an extraction came from, kept for debugging. Stored zstd-compressed
+    # (agents/compression.py) in its own table so review queue reads never load or return it.
+    extracted_info = models.OneToOneField(ExtractedClientInfo, on_delete=models.CASCADE, primary_key=True, related_name='raw_output')
+    data = models.BinaryField()
+    raw_bytes = models.PositiveIntegerField() # size of the uncompressed JSON
 
     def __str__(self):
-        return f"Extracted Info for Call {self.call_recording.id} - Approved: {self.is_approved}"
+        return f"Raw LLM output for Extracted Info {self.extracted_info_id} ({len(self.data)}/{self.raw_bytes} bytes)"
+
+    @property
+    def value(self):
+        return decompress_json(self.data)
+
+    @classmethod
+    def store(cls, extracted_info_id, value):
+        data, raw_bytes = compress_json(value)
+        cls.objects.update_or_create(extracted_info_id=extracted_info_id, defaults={'data': data, 'raw_bytes': raw_bytes})
 
 class Client(models.Model):
     name = models.CharField(max_length=255)
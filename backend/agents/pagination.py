@@ -0,0 +1,107 @@
+# agents/pagination.py
+import base64
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(timestamp, pk):
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{pk}".encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Returns (timestamp, pk) for a cursor produced by encode_cursor. Raises NotFound if it is invalid.
+    """
+    try:
+        timestamp, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        timestamp = parse_datetime(timestamp)
+        if timestamp is None:
+            raise ValueError
+        return timestamp, int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise NotFound("Invalid cursor.")
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination, newest first, on (timestamp_field, id). Each page is one indexed
+    range scan no matter how deep the client has paged, and rows inserted while paging
+    don't shift later pages.
+    """
+    timestamp_field = 'upload_timestamp'
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def filter_after(self, queryset, cursor):
+        timestamp, pk = decode_cursor(cursor)
+        return queryset.filter(
+            Q(**{f"{self.timestamp_field}__lt": timestamp}) |
+            Q(**{self.timestamp_field: timestamp, 'id__lt': pk})
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.take_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request):
+        # The same page through the async ORM, for the async list views
+        return self.take_page([row async for row in self.page_queryset(queryset, request)])
+
+    def page_queryset(self, queryset, request):
+        self.request = request
+        self.current_page_size = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = self.filter_after(queryset, cursor)
+        queryset = queryset.order_by(f"-{self.timestamp_field}", '-id')
+
+        # Fetch one extra row to learn whether there is a next page without a COUNT(*)
+        return queryset[:self.current_page_size + 1]
+
+    def take_page(self, page):
+        self.next_cursor = None
+        if len(page) > self.current_page_size:
+            page = page[:self.current_page_size]
+            last = page[-1]
+            self.next_cursor = encode_cursor(getattr(last, self.timestamp_field), last.id)
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'next_cursor': self.next_cursor,
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'next_cursor': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
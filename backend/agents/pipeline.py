@@ -0,0 +1,20 @@
+# agents/pipeline.py
+from celery import chain
+from .metrics import record_stages
+from .tasks import process_call_recording_for_transcription, process_transcript_with_llm_agent
+
+
+def recording_pipeline(recording_id):
+    """
+    Canvas for processing one recording: transcription (transcribe queue), then extraction
+    (extract queue). Each stage receives the recording id returned by the previous one.
+    """
+    return chain(
+        process_call_recording_for_transcription.si(recording_id),
+        process_transcript_with_llm_agent.s(),
+    )
+
+
+def start_recording_pipeline(recording_id):
+    record_stages([recording_id], 'queued')
+    return recording_pipeline(recording_id).apply_async()
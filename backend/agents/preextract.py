@@ -0,0 +1,162 @@
+# agents/preextract.py
+import re
+
+# Fields the local extractor can fill without the LLM
+PRE_EXTRACTED_FIELDS = ('contact_number', 'email')
+
+_DIGIT_WORDS = {
+    'zero': '0', 'oh': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4',
+    'five': '5', 'six': '6', 'seven': '7', 'eight': '8', 'nine': '9',
+}
+_REPEAT_WORDS = {'double': 2, 'triple': 3}
+_DIGIT_TOKEN = rf"(?:{'|'.join(_DIGIT_WORDS)}|\d)"
+_NUMBER_WORD = rf"(?:{'|'.join([*_DIGIT_WORDS, *_REPEAT_WORDS])})"
+
+# All patterns run on the lowercased transcript; IGNORECASE roughly doubles their cost.
+# Each spoken/written form is found in two steps: a cheap scan for candidates, then the exact pattern.
+
+# "nine nine nine, eight eight eight ..." / "double five one two ..." - at least 7 digits worth of words
+_NUMBER_WORD_PAIR = re.compile(rf"{_NUMBER_WORD}[\s,.-]+{_NUMBER_WORD}\b")
+_SPOKEN_NUMBER = re.compile(
+    rf"\b(?:(?:double|triple)\s+)?{_DIGIT_TOKEN}(?:[\s,.-]+(?:(?:double|triple)\s+)?{_DIGIT_TOKEN}){{6,}}\b"
+)
+
+_TLDS = r"(?:com|net|org|io|co|edu|gov|info|biz|me|us|uk|ca|in|de|au)"
+_DOT = r"(?:\s+dot\s+|\.)"
+# "sarah dot c at gmail dot com" / "jane.foster at techinnovators dot com". The domain is matched
+# forwards from " at "; the local part backwards from there, on the reversed text, so neither
+# pattern has to be tried at every position of the transcript.
+_SPOKEN_EMAIL_DOMAIN = re.compile(rf"\s+at\s+([a-z0-9-]+(?:{_DOT}[a-z0-9-]+)*{_DOT}{_TLDS})\b")
+_SPOKEN_EMAIL_LOCAL_REVERSED = re.compile(r"[a-z0-9_%+-]+(?:(?:\s+tod\s+|\.)[a-z0-9_%+-]+)*")
+_SPOKEN_EMAIL_MAX_LOCAL = 80
+_SPOKEN_DOT = re.compile(_DOT)
+
+_EMAIL = re.compile(r"\b[a-z0-9._%+-]+@[a-z0-9-]+(?:\.[a-z0-9-]+)*\.[a-z]{2,}\b")
+_DIGIT_RUN = re.compile(r"[\d(+][\d\s().+-]{8,}\d")
+# North American numbers as Whisper writes them: (987) 654-3210, 999-888-7777, +1 555.123.4567
+_PHONE = re.compile(r"(?<![\d+])(?:\+?1[\s.-]?)?(?:\(\d{3}\)|\d{3})[\s.-]?\d{3}[\s.-]?\d{4}(?!\d)")
+# Anything else written with a country code: +44 20 7946 0958
+_INTERNATIONAL_PHONE = re.compile(r"(?<![\d+])\+\d{1,3}(?:[\s.-]?\d){7,12}(?!\d)")
+
+# Candidates only count with a cue in the CUE_WINDOW characters before them ("my number is",
+# "reach me at", "my email is"), and not when the sentence they are in is about some other
+# number: "my order number is 4155550199", "account id is one two three ...".
+CUE_WINDOW = 80
+_PHONE_CUE = re.compile(
+    r"\b(?:phone|cell|mobile|telephone|number|call me|call you|call us|reach(?:ed)?|text me|contact)\b"
+)
+_EMAIL_CUE = re.compile(r"\b(?:e-?mail(?:ed)?|mail|reach(?:ed)?|contact|send|write to)\b")
+_NOT_CONTACT_CUE = re.compile(
+    r"\b(?:order|account|invoice|id|reference|ref|confirmation|policy|ticket|case|tracking|serial|"
+    r"customer|member|booking|reservation|transaction|card)\b"
+)
+_SENTENCE_END = re.compile(r"[.!;]\s")
+
+
+def _cued(text, start, cue):
+    """
+    True when the text before position start mentions cue, and the sentence up to start
+    mentions none of _NOT_CONTACT_CUE.
+    """
+    context = text[max(0, start - CUE_WINDOW):start]
+    if not cue.search(context):
+        return False
+    sentence_starts = [match.end() for match in _SENTENCE_END.finditer(context)]
+    return not _NOT_CONTACT_CUE.search(context[sentence_starts[-1] if sentence_starts else 0:])
+
+
+def _spoken_digits(match):
+    digits, repeat = [], 1
+    for token in re.split(r"[\s,.-]+", match.group(0)):
+        if token in _REPEAT_WORDS:
+            repeat = _REPEAT_WORDS[token]
+        elif token:
+            digits.append((_DIGIT_WORDS.get(token) or token) * repeat)
+            repeat = 1
+    return ''.join(digits)
+
+
+def _normalise_spoken_emails(text):
+    pieces, last = [], 0
+    for domain in _SPOKEN_EMAIL_DOMAIN.finditer(text):
+        before = text[max(last, domain.start() - _SPOKEN_EMAIL_MAX_LOCAL):domain.start()]
+        local = _SPOKEN_EMAIL_LOCAL_REVERSED.match(before[::-1])
+        if local is None:
+            continue
+        start = domain.start() - local.end()
+        pieces.append(text[last:start])
+        pieces.append(f"{_SPOKEN_DOT.sub('.', local.group(0)[::-1])}@{_SPOKEN_DOT.sub('.', domain.group(1))}")
+        last = domain.end()
+    pieces.append(text[last:])
+    return ''.join(pieces)
+
+
+def normalise_spoken_forms(text):
+    """
+    Rewrites spelled-out phone numbers and emails in a lowercased transcript into their
+    written form, so the written-form patterns below pick them up.
+    """
+    if _NUMBER_WORD_PAIR.search(text):
+        text = _SPOKEN_NUMBER.sub(_spoken_digits, text)
+    if ' at ' in text:
+        text = _normalise_spoken_emails(text)
+    return text
+
+
+def _phone_key(number):
+    digits = re.sub(r'\D', '', number)
+    return digits[1:] if len(digits) == 11 and digits.startswith('1') else digits
+
+
+def _format_phone(number):
+    # Spoken numbers come out as bare digits; give 10 digit ones the usual layout
+    if re.fullmatch(r'\d{10}', number):
+        return f"{number[:3]}-{number[3:6]}-{number[6:]}"
+    return number
+
+
+def pre_extract(transcript_text):
+    """
+    Deterministically extracts contact_number and email from a transcript.
+    A field is only returned when the transcript contains exactly one distinct cued candidate
+    (see _cued); anything ambiguous (say, the agent also reading out their own number) is left to the LLM.
+    """
+    text = normalise_spoken_forms((transcript_text or '').lower())
+    found = {}
+
+    emails = {
+        match.group(0) for match in _EMAIL.finditer(text) if _cued(text, match.start(), _EMAIL_CUE)
+    } if '@' in text else ()
+    if len(emails) == 1:
+        found['email'] = emails.pop()
+
+    phones = {}
+    for run in _DIGIT_RUN.finditer(text):
+        for pattern in (_PHONE, _INTERNATIONAL_PHONE):
+            for match in pattern.finditer(run.group(0)):
+                if _cued(text, run.start() + match.start(), _PHONE_CUE):
+                    phones.setdefault(_phone_key(match.group(0)), match.group(0).strip())
+    if len(phones) == 1:
+        found['contact_number'] = _format_phone(next(iter(phones.values())))
+
+    return found
+
+
+def parse_skip_llm_rules(value):
+    """
+    Parses PRE_EXTRACTION_SKIP_LLM_RULES: rules separated by ';', each a comma separated
+    list of fields. 'contact_number,email;email' has two rules.
+    """
+    rules = []
+    for rule in (value or '').split(';'):
+        fields = frozenset(field.strip() for field in rule.split(',') if field.strip())
+        if fields:
+            rules.append(fields)
+    return rules
+
+
+def satisfies_skip_rule(found, rules):
+    """
+    True when every field of at least one rule was extracted locally, so the LLM call can be skipped.
+    """
+    return any(rule <= found.keys() for rule in rules)
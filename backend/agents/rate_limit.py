@@ -0,0 +1,261 @@
+# agents/rate_limit.py
+import logging
+import random
+import time
+import uuid
+from contextlib import contextmanager
+
+import groq
+from django.conf import settings
+from .metrics import observe_groq_request
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+AUDIO = 'audio' # transcription, cost in audio seconds
+LLM = 'llm' # chat completions, cost in (estimated) tokens
+
+
+class RateLimitTimeout(Exception):
+    """
+    Raised when a Groq call could not get budget or a concurrency slot within its maximum wait
+    (GROQ_RATE_LIMIT_MAX_WAIT unless the caller sets one).
+    """
+
+
+# Errors worth retrying later: provider throttling, overload and network trouble.
+# APIConnectionError includes APITimeoutError.
+TRANSIENT_GROQ_ERRORS = (
+    groq.RateLimitError,
+    groq.InternalServerError,
+    groq.APIConnectionError,
+    RateLimitTimeout,
+)
+
+# Reservation-style token bucket: the cost is always deducted (the balance may go negative) and the
+# caller is told how long to wait for its turn. Callers are paced evenly instead of all retrying
+# as soon as the bucket refills, which is what makes throughput oscillate around the cap.
+# A call costing more than the whole bucket (a long audio chunk) waits for a full bucket only and
+# is then charged in full; the deficit it leaves is what the calls after it wait out.
+_RESERVE = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local max_wait = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = math.max(0, math.min(cost, capacity) - tokens) / rate
+if wait > max_wait then
+    return {0, tostring(wait)}
+end
+tokens = tokens - cost
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+-- Kept until the bucket is full again, however deep the deficit
+redis.call('EXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate) + 60)
+return {1, tostring(wait)}
+"""
+
+# Gives back a reservation that was not used (the call never got a concurrency slot), so callers
+# timing out under contention don't burn budget that no request consumed.
+_REFUND = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+if not state[1] then
+    return 0
+end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tokens = tonumber(state[1]) + math.max(0, now - tonumber(state[2])) * rate + tonumber(ARGV[3])
+redis.call('HSET', KEYS[1], 'tokens', tostring(math.min(capacity, tokens)), 'ts', tostring(now))
+return 1
+"""
+
+# Cluster-wide concurrency slots. Leases carry their start time, so slots held by a worker
+# that died mid-call expire after lease_ttl.
+_ACQUIRE_SLOT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - tonumber(ARGV[2]))
+local limit = tonumber(redis.call('HGET', KEYS[2], 'limit')) or tonumber(ARGV[3])
+if redis.call('ZCARD', KEYS[1]) < math.floor(limit) then
+    redis.call('ZADD', KEYS[1], now, ARGV[1])
+    return 1
+end
+return 0
+"""
+
+# AIMD: the limit grows by 1 at most once per increase interval while every slot is in use, and
+# a 429 or a slow call multiplies it by the decrease factor, at most once per cooldown so one burst of 429s counts as a single
+# signal. Time-based growth keeps the probing rate (and the 429s it causes) independent of call rate.
+_ADJUST = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local minimum, maximum = tonumber(ARGV[2]), tonumber(ARGV[3])
+local limit = tonumber(redis.call('HGET', KEYS[1], 'limit')) or tonumber(ARGV[4])
+local field, interval
+if ARGV[1] == 'increase' then
+    -- Only grow while the limit is what holds callers back; otherwise it creeps up whenever
+    -- the token bucket is the bottleneck
+    if redis.call('ZCARD', KEYS[2]) < math.floor(limit) then
+        return {0, tostring(limit)}
+    end
+    -- and not while the last decrease is still settling
+    local last_decrease = tonumber(redis.call('HGET', KEYS[1], 'last_decrease')) or 0
+    if now - last_decrease < tonumber(ARGV[5]) then
+        return {0, tostring(limit)}
+    end
+    field, interval = 'last_increase', tonumber(ARGV[7])
+else
+    field, interval = 'last_decrease', tonumber(ARGV[5])
+end
+local last = tonumber(redis.call('HGET', KEYS[1], field)) or 0
+if now - last < interval then
+    return {0, tostring(limit)}
+end
+if ARGV[1] == 'increase' then
+    limit = math.min(maximum, limit + 1)
+else
+    limit = math.max(minimum, limit * tonumber(ARGV[6]))
+end
+redis.call('HSET', KEYS[1], 'limit', tostring(limit), field, tostring(now))
+return {1, tostring(limit)}
+"""
+
+_scripts = {}
+
+
+def _script(source):
+    if source not in _scripts:
+        _scripts[source] = get_redis().register_script(source)
+    return _scripts[source]
+
+
+def _bucket(kind):
+    # (refill rate per second, capacity)
+    if kind == AUDIO:
+        rate = settings.GROQ_AUDIO_SECONDS_PER_HOUR / 3600
+    else:
+        rate = settings.GROQ_LLM_TOKENS_PER_MINUTE / 60
+    return rate, rate * settings.GROQ_RATE_LIMIT_BURST_SECONDS
+
+
+def budget_seconds(kind, cost):
+    """
+    How long the shared budget takes to refill cost units.
+    """
+    rate, _ = _bucket(kind)
+    return cost / rate
+
+
+def _too_slow(kind, latency, cost):
+    if kind == AUDIO: # long audio takes longer, so compare processing time per audio second
+        return latency / max(cost, 1) > settings.GROQ_AUDIO_LATENCY_TARGET_RATIO
+    return latency > settings.GROQ_LLM_LATENCY_TARGET_SECONDS
+
+
+def _reserve(kind, cost, deadline):
+    rate, capacity = _bucket(kind)
+    granted, wait = _script(_RESERVE)(
+        keys=[f"groq_limiter:{kind}:bucket"],
+        args=[rate, capacity, cost, max(0, deadline - time.monotonic())],
+    )
+    if not granted:
+        raise RateLimitTimeout(f"Groq {kind} budget exhausted, {cost:.0f} available in {float(wait):.1f}s")
+    if float(wait) > 0:
+        time.sleep(float(wait))
+    return cost
+
+
+def _refund(kind, cost):
+    try:
+        rate, capacity = _bucket(kind)
+        _script(_REFUND)(keys=[f"groq_limiter:{kind}:bucket"], args=[rate, capacity, cost])
+    except Exception as e:
+        logger.warning(f"Could not refund Groq {kind} budget: {e}")
+
+
+def _acquire_slot(kind, deadline):
+    lease = uuid.uuid4().hex
+    acquire = _script(_ACQUIRE_SLOT)
+    while True:
+        if acquire(
+            keys=[f"groq_limiter:{kind}:leases", f"groq_limiter:{kind}:aimd"],
+            args=[lease, settings.GROQ_TIMEOUT * 2, settings.GROQ_CONCURRENCY_START],
+        ):
+            return lease
+        if time.monotonic() >= deadline:
+            raise RateLimitTimeout(f"No free Groq {kind} concurrency slot")
+        time.sleep(random.uniform(0.05, 0.25)) # jittered, so waiting workers don't poll in lockstep
+
+
+def _adjust(kind, direction):
+    changed, limit = _script(_ADJUST)(
+        keys=[f"groq_limiter:{kind}:aimd", f"groq_limiter:{kind}:leases"],
+        args=[
+            direction, settings.GROQ_CONCURRENCY_MIN, settings.GROQ_CONCURRENCY_MAX, settings.GROQ_CONCURRENCY_START,
+            settings.GROQ_CONCURRENCY_DECREASE_COOLDOWN, settings.GROQ_CONCURRENCY_DECREASE_FACTOR,
+            settings.GROQ_CONCURRENCY_INCREASE_INTERVAL,
+        ],
+    )
+    if changed and direction == 'decrease':
+        logger.warning(f"Groq {kind} concurrency limit lowered to {float(limit):.1f}.")
+
+
+def _adjust_safely(kind, direction):
+    try:
+        _adjust(kind, direction)
+    except Exception as e:
+        logger.warning(f"Could not adjust Groq {kind} concurrency limit: {e}")
+
+
+@contextmanager
+def groq_rate_limited(kind, cost, max_wait=None):
+    """
+    Wraps one Groq API call: waits up to max_wait seconds (GROQ_RATE_LIMIT_MAX_WAIT by default)
+    for cost units of the shared budget and a cluster-wide concurrency slot, then feeds the
+    outcome (429s, latency) back into the concurrency limit and the Prometheus metrics. If Redis
+    is unavailable the call goes ahead unthrottled.
+    """
+    limited = settings.GROQ_RATE_LIMIT_ENABLED
+    lease = None
+    if limited:
+        deadline = time.monotonic() + (settings.GROQ_RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait)
+        try:
+            reserved = _reserve(kind, cost, deadline)
+            try:
+                lease = _acquire_slot(kind, deadline)
+            except Exception:
+                _refund(kind, reserved) # the call isn't made (or goes ahead unmetered)
+                raise
+        except RateLimitTimeout:
+            raise
+        except Exception as e:
+            logger.warning(f"Groq rate limiter unavailable, calling unthrottled: {e}")
+
+    started = time.monotonic()
+    try:
+        yield
+    except groq.RateLimitError:
+        observe_groq_request(kind, 'throttled', time.monotonic() - started)
+        if limited:
+            _adjust_safely(kind, 'decrease')
+        raise
+    except Exception:
+        observe_groq_request(kind, 'error', time.monotonic() - started)
+        raise
+    else:
+        latency = time.monotonic() - started
+        observe_groq_request(kind, 'ok', latency, audio_seconds=cost if kind == AUDIO else None)
+        if limited:
+            _adjust_safely(kind, 'decrease' if _too_slow(kind, latency, cost) else 'increase')
+    finally:
+        if lease is not None:
+            try:
+                get_redis().zrem(f"groq_limiter:{kind}:leases", lease)
+            except Exception as e:
+                logger.warning(f"Could not release Groq {kind} concurrency slot: {e}")
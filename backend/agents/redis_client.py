@@ -0,0 +1,15 @@
+# agents/redis_client.py
+import redis
+from django.conf import settings
+
+_redis = None
+
+
+def get_redis():
+    """
+    Returns a process-wide Redis connection for application state (counters, caches).
+    """
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(settings.REDIS_URL)
+    return _redis
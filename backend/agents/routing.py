@@ -0,0 +1,7 @@
+# agents/routing.py
+from django.urls import path
+from .consumers import CallStatusConsumer
+
+websocket_urlpatterns = [
+    path('ws/call-status/', CallStatusConsumer.as_asgi()),
+]
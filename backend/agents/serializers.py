@@ -1,32 +1,86 @@
 # agents/serializers.py
 from rest_framework import serializers
-from .models import CallRecording, ExtractedClientInfo, Client
+from .models import CallRecording, ExtractedClientInfo, Client, UploadSession
 
 class CallRecordingSerializer(serializers.ModelSerializer):
+    # Stored compressed (CompressedTextField); served as plain text
+    transcript_text = serializers.CharField(read_only=True)
+    compacted_transcript_text = serializers.CharField(read_only=True)
+
     class Meta:
         model = CallRecording
-        fields = ['id', 'uploaded_by', 'upload_timestamp', 'audio_file', 'status', 'transcript_text']
-        read_only_fields = ['uploaded_by', 'upload_timestamp', 'status', 'transcript_text'] # These are set by backend
+        fields = [
+            'id', 'uploaded_by', 'upload_timestamp', 'updated_at', 'audio_file', 'status', 'transcript_text',
+            'compacted_transcript_text', 'transcript_tokens', 'compacted_transcript_tokens',
+            'audio_bytes', 'normalised_audio_bytes', 'audio_seconds', 'normalised_audio_seconds',
+            'transcribed_seconds',
+        ]
+        read_only_fields = [
+            'uploaded_by', 'upload_timestamp', 'updated_at', 'status', 'transcript_text',
+            'compacted_transcript_text', 'transcript_tokens', 'compacted_transcript_tokens',
+            'audio_bytes', 'normalised_audio_bytes', 'audio_seconds', 'normalised_audio_seconds',
+            'transcribed_seconds',
+        ] # These are set by backend
 
     def create(self, validated_data):
         # Automatically set uploaded_by to the current user
         validated_data['uploaded_by'] = self.context['request'].user
         return super().create(validated_data)
     
+class CallRecordingListSerializer(serializers.ModelSerializer):
+    # Slim row for list views and dashboard polling; the transcript is only served on the detail route
+    class Meta:
+        model = CallRecording
+        fields = ['id', 'uploaded_by', 'upload_timestamp', 'updated_at', 'audio_file', 'status', 'transcribed_seconds']
+        read_only_fields = fields
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'total_size', 'sha256', 'received_bytes', 'created_at', 'call_recording']
+        read_only_fields = ['received_bytes', 'created_at', 'call_recording']
+
+    def validate_total_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("total_size must be positive.")
+        return value
+
+    def validate_sha256(self, value):
+        value = value.lower()
+        if len(value) != 64 or any(c not in '0123456789abcdef' for c in value):
+            raise serializers.ValidationError("sha256 must be a 64 character hex digest.")
+        return value
+
 class ExtractedClientInfoSerializer(serializers.ModelSerializer):
     # Optional: Read-only field for related call_recording_id if needed in frontend
-    call_recording_id = serializers.ReadOnlyField(source='call_recording.id')
+    call_recording_id = serializers.ReadOnlyField() # the FK column itself, so rows don't each load their recording
 
     class Meta:
         model = ExtractedClientInfo
+        # The raw LLM response is not part of this; it's served on its own at /extracted-info/{id}/raw/
         fields = [
             'id', 'call_recording_id', 'client_name', 'company_name',
             'contact_number', 'email', 'service_interest',
             'is_approved', 'approved_by', 'approval_timestamp', 'review_notes',
-            'raw_llm_output'
+            'is_speculative', 'updated_at'
         ]
-        read_only_fields = ['is_approved', 'approved_by', 'approval_timestamp'] # Onboarder updates these via custom action
+        read_only_fields = ['is_approved', 'approved_by', 'approval_timestamp', 'is_speculative', 'updated_at'] # Onboarder updates these via custom action
         
+class BulkReviewSerializer(serializers.Serializer):
+    # Each item is {"id": <extracted info id>, ...optional corrections/review_notes}
+    items = serializers.ListField(child=serializers.DictField(), allow_empty=False, max_length=1000)
+    review_notes = serializers.CharField(required=False, allow_blank=True) # default for items without their own
+
+    def validate_items(self, items):
+        ids = []
+        for item in items:
+            if not isinstance(item.get('id'), int):
+                raise serializers.ValidationError("Every item needs an integer 'id'.")
+            ids.append(item['id'])
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Duplicate ids in items.")
+        return items
+
 class ClientSerializer(serializers.ModelSerializer):
     class Meta:
         model = Client
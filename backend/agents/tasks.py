@@ -1,15 +1,439 @@
 # agents/tasks.py
-import os
 from celery import shared_task
 from django.conf import settings
-from groq import Groq
-from .models import CallRecording, ExtractedClientInfo
+from django.db import transaction
+from .audio_normalisation import normalise_audio
+from .compaction import compact_transcript, compaction_report
+from .events import send_status_update
+from .extraction import estimate_tokens, merge_window_results, split_transcript
+from .groq_client import get_groq_client
+from .llm_cache import cache_key, get_cached_extraction, store_extraction, transcript_hash
+from .metrics import observe_audio_normalisation, observe_llm_usage, record_stage
+from .models import CallRecording, ExtractedClientInfo, RawLLMOutput
+from .preextract import parse_skip_llm_rules, pre_extract, satisfies_skip_rule
+from .rate_limit import LLM, TRANSIENT_GROQ_ERRORS, groq_rate_limited
+from .redis_client import get_redis
+from .transcription import STT_MODEL, transcribe_incrementally, transcribe_recording
+from .transcript_cache import get_cached_transcript, store_transcript
+from .uploadhandlers import compute_sha256
+from concurrent.futures import ThreadPoolExecutor
 import json
 import logging
+import tempfile
 
 logger = logging.getLogger(__name__)
 
-@shared_task(bind=True)
+EXTRACTION_MODEL = "llama3-8b-8192" # Or "llama3-70b-8192" if you prefer, or Groq's tool-use preview models
+EXTRACTION_TOOL_NAME = "extract_client_info_tool"
+
+# Identifies the extraction prompt and tool schema below. Bump it whenever either changes, so
+# cached LLM results from the old prompt stop being served (manage.py invalidate_llm_cache can drop them).
+PROMPT_VERSION = "2026-10-extract-v3"
+
+# Fields the tool returns; all of type ['string', 'null']
+EXTRACTION_FIELDS = {
+    "client_name": {"type": ["string", "null"], "description": "The full name of the potential client."},
+    "company_name": {"type": ["string", "null"], "description": "The company name of the potential client."},
+    "contact_number": {"type": ["string", "null"], "description": "The primary contact phone number of the client."},
+    "email": {"type": ["string", "null"], "description": "The primary email address of the client."},
+    "service_interest": {"type": ["string", "null"], "description": "A brief description of the services the client is interested in, derived from the conversation."},
+}
+
+# The tool for Groq (matching the MCP server's exposed tool)
+EXTRACTION_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": EXTRACTION_TOOL_NAME,
+            "description": (
+                "Extracts key client information from a call transcript. "
+                "The tool should be called with parameters corresponding to the found information. "
+                "If a piece of information is not present, the corresponding parameter should be set to null."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": EXTRACTION_FIELDS,
+                "required": [], # Still good to keep this empty
+            },
+        },
+    }
+]
+
+# Emphasize using the tool and focus on accuracy
+EXTRACTION_SYSTEM_PROMPT = (
+    "You are an expert AI assistant tasked with extracting structured client information from call transcripts. "
+    "Your goal is to accurately identify the client's name, company, contact details (phone, email), "
+    "their primary service interest, and any mentioned deal size estimate. "
+    "Use the `extract_client_info_tool` to format the extracted data. "
+    "IMPORTANT: If a piece of information is not explicitly mentioned, DO NOT include that parameter in the tool call. "
+    "DO NOT use placeholder values like 'N/A', 'None', or 'null'. Only return values for parameters that are directly found in the transcript."
+    "Be precise and only extract what is clearly stated or strongly implied."
+)
+
+# Batched variant: the same tool with a recording_id, called once per transcript in the request
+BATCH_EXTRACTION_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": EXTRACTION_TOOL_NAME,
+            "description": (
+                "Extracts key client information from ONE of the call transcripts. "
+                "Call it once per transcript, with recording_id set to that transcript's id. "
+                "If a piece of information is not present, the corresponding parameter should be set to null."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "recording_id": {"type": "integer", "description": "The id of the transcript this call is for."},
+                    **EXTRACTION_FIELDS,
+                },
+                "required": ["recording_id"],
+            },
+        },
+    }
+]
+
+BATCH_EXTRACTION_SYSTEM_PROMPT = (
+    EXTRACTION_SYSTEM_PROMPT + " "
+    "You will be given several independent call transcripts, each labelled with its recording id. "
+    "Call `extract_client_info_tool` exactly once for every transcript, never mixing information between transcripts."
+)
+
+# Transient Groq failures (429s, 5xx, timeouts, rate limiter waits) are retried with jittered
+# exponential backoff instead of failing the recording; see agents/rate_limit.py
+GROQ_RETRY_OPTIONS = {
+    'autoretry_for': TRANSIENT_GROQ_ERRORS,
+    'retry_backoff': settings.GROQ_RETRY_BACKOFF,
+    'retry_backoff_max': settings.GROQ_RETRY_BACKOFF_MAX,
+    'retry_jitter': True,
+    'max_retries': settings.GROQ_RETRY_MAX,
+}
+
+BATCH_PENDING_KEY = 'llm_batch:pending'
+BATCH_FLUSH_SCHEDULED_KEY = 'llm_batch:flush_scheduled'
+
+
+def _tool_call_arguments(tool_call):
+    extracted_args = json.loads(tool_call.function.arguments)
+    # This line is crucial: it filters out any parameters with a `None` value
+    return {k: v for k, v in extracted_args.items() if v is not None}
+
+
+def _without_fields(tools, skip_fields):
+    """
+    Drops already-known fields from the tool schema, so the model neither looks for nor returns them.
+    """
+    if not skip_fields:
+        return tools
+    trimmed = []
+    for tool in tools:
+        parameters = tool["function"]["parameters"]
+        properties = {k: v for k, v in parameters["properties"].items() if k not in skip_fields}
+        trimmed.append({**tool, "function": {**tool["function"], "parameters": {**parameters, "properties": properties}}})
+    return trimmed
+
+
+def _llm_cost(messages, tools):
+    # Tokens a request counts against the shared LLM budget: the prompt plus the output allowance
+    return estimate_tokens(json.dumps(messages)) + estimate_tokens(json.dumps(tools)) + settings.EXTRACTION_MAX_OUTPUT_TOKENS
+
+
+def _skip_fields_note(skip_fields):
+    if not skip_fields:
+        return ""
+    return f" The following fields are already known, do not extract them: {', '.join(sorted(skip_fields))}."
+
+
+def _extract_single(client, transcript_text, skip_fields=()):
+    """
+    One extraction request for a transcript (or one window of it). Returns (extracted fields, raw response).
+    skip_fields are fields the local pre-extractor already filled.
+    """
+    # Craft the prompt for the LLM
+    messages = [
+        {
+            "role": "system",
+            "content": EXTRACTION_SYSTEM_PROMPT,
+        },
+        {
+            "role": "user",
+            "content": f"Here is the call transcript: '{transcript_text}'\n\nPlease extract the relevant client information and call the `extract_client_info_tool`.{_skip_fields_note(skip_fields)}"
+        }
+    ]
+
+    tools = _without_fields(EXTRACTION_TOOLS, skip_fields)
+
+    # Call Groq with tool_choice 'auto' to allow it to decide if/when to use the tool
+    with groq_rate_limited(LLM, _llm_cost(messages, tools)):
+        chat_completion = client.chat.completions.create(
+            messages=messages,
+            model=EXTRACTION_MODEL,
+            tools=tools,
+            tool_choice="auto", # Allow the model to decide whether to call the tool
+            max_tokens=settings.EXTRACTION_MAX_OUTPUT_TOKENS,
+        )
+
+    observe_llm_usage(chat_completion.usage)
+    tool_calls = chat_completion.choices[0].message.tool_calls
+    extracted_data = {}
+    raw_llm_output = chat_completion.model_dump(mode='json') # Store full LLM response for debugging
+
+    if tool_calls:
+        for tool_call in tool_calls:
+            if tool_call.function.name == EXTRACTION_TOOL_NAME:
+                extracted_data = _tool_call_arguments(tool_call)
+                break
+    return extracted_data, raw_llm_output
+
+
+def _extract_map_reduce(client, transcript_text, skip_fields=()):
+    """
+    For transcripts that don't fit the model context: extracts candidates from token-bounded
+    windows in parallel (map), then picks one value per field with provenance (reduce).
+    """
+    windows = split_transcript(
+        transcript_text,
+        max_tokens=settings.EXTRACTION_WINDOW_TOKENS,
+        overlap_tokens=settings.EXTRACTION_WINDOW_OVERLAP_TOKENS,
+    )
+    with ThreadPoolExecutor(max_workers=max(1, settings.EXTRACTION_MAX_CONCURRENCY)) as executor:
+        results = list(executor.map(lambda window: _extract_single(client, window, skip_fields), windows))
+
+    extracted_data, provenance = merge_window_results([fields for fields, _ in results])
+    raw_llm_output = {
+        'map_reduce': {'windows': len(windows), 'provenance': provenance},
+        'window_responses': [raw for _, raw in results],
+    }
+    return extracted_data, raw_llm_output
+
+
+def _extract(client, transcript_text, skip_fields=()):
+    # Single request, or map-reduce over windows for transcripts that don't fit the model context
+    if estimate_tokens(transcript_text) > settings.EXTRACTION_WINDOW_TOKENS:
+        return _extract_map_reduce(client, transcript_text, skip_fields)
+    return _extract_single(client, transcript_text, skip_fields)
+
+
+def _save_extracted_info(recording, user_id, extracted_data, raw_llm_output):
+    """
+    Creates or updates the recording's ExtractedClientInfo and marks it ready for review.
+    A speculative result from the partial transcript is replaced, with the fields that changed noted.
+    """
+    speculative = ExtractedClientInfo.objects.filter(call_recording=recording, is_speculative=True).first()
+    if speculative is not None:
+        changed = sorted(
+            field for field in EXTRACTION_FIELDS
+            if (getattr(speculative, field) or None) != (extracted_data.get(field) or None)
+        )
+        speculative_raw = RawLLMOutput.objects.filter(extracted_info=speculative).first()
+        raw_llm_output = {**raw_llm_output, 'reconciled_speculative': {
+            'transcribed_seconds': (speculative_raw.value if speculative_raw else {}).get('speculative', {}).get('transcribed_seconds'),
+            'changed_fields': changed,
+        }}
+        logger.info(f"CallRecording {recording.id} speculative extraction reconciled, changed fields: {changed or 'none'}.")
+
+    with transaction.atomic():
+        extracted_info, _ = ExtractedClientInfo.objects.update_or_create(
+            call_recording=recording,
+            defaults={
+                'client_name': extracted_data.get('client_name'),
+                'company_name': extracted_data.get('company_name'),
+                'contact_number': extracted_data.get('contact_number'),
+                'email': extracted_data.get('email'),
+                'service_interest': extracted_data.get('service_interest'),
+                'is_speculative': False,
+                'is_approved': False,
+                'approved_by': None,
+                'approval_timestamp': None,
+                'review_notes': None,
+            }
+        )
+        RawLLMOutput.store(extracted_info.id, raw_llm_output)
+    logger.info(f"Information extracted for CallRecording {recording.id}.")
+
+    recording.status = 'READY_FOR_REVIEW'
+    recording.save(update_fields=['status'])
+    record_stage(recording, 'extract_finished')
+    record_stage(recording, 'ready_for_review')
+    send_status_update(user_id, recording.id, recording.status)
+
+
+def _save_speculative_extraction(recording, user_id, extracted_data, raw_llm_output):
+    """
+    Stores an extraction from the partial transcript, unless the regular extraction has started
+    (the row lock orders this against its status change, so a late result can't overwrite it).
+    """
+    with transaction.atomic():
+        status = CallRecording.objects.select_for_update().values_list('status', flat=True).get(id=recording.id)
+        if status not in ('TRANSCRIBING', 'TRANSCRIBED'):
+            logger.info(f"CallRecording {recording.id} already past transcription, speculative result dropped.")
+            return False
+        extracted_info, _ = ExtractedClientInfo.objects.update_or_create(
+            call_recording=recording,
+            defaults={
+                **{field: extracted_data.get(field) for field in EXTRACTION_FIELDS},
+                'is_speculative': True,
+            }
+        )
+        RawLLMOutput.store(extracted_info.id, raw_llm_output)
+    send_status_update(user_id, recording.id, status, speculative_extraction=True)
+    return True
+
+
+def _fail_recording(recording, user_id, status, stage):
+    """
+    Marks the recording failed and drops any speculative extraction: only a successful
+    extraction reconciles one, so it would otherwise stay in every onboarder's queue unreviewable.
+    """
+    with transaction.atomic():
+        recording.status = status
+        recording.save(update_fields=['status'])
+        discarded, _ = ExtractedClientInfo.objects.filter(call_recording=recording, is_speculative=True).delete()
+    if discarded:
+        logger.info(f"CallRecording {recording.id} speculative extraction discarded.")
+    record_stage(recording, stage)
+    send_status_update(user_id, recording.id, recording.status)
+
+
+def _round_seconds(seconds):
+    return None if seconds is None else round(seconds, 1)
+
+
+def _transcribe_incrementally(recording, user_id, client, audio_path, duration=None):
+    """
+    Transcribes in time-ordered segments, saving and publishing the transcript after each one and
+    starting a speculative extraction once SPECULATIVE_EXTRACTION_AFTER_SECONDS are transcribed.
+    """
+    speculate_after = settings.SPECULATIVE_EXTRACTION_AFTER_SECONDS
+    speculated = False
+    transcript_text = ''
+    for transcript_text, appended, transcribed, total in transcribe_incrementally(
+        client,
+        audio_path,
+        segment_seconds=settings.INCREMENTAL_SEGMENT_SECONDS,
+        overlap_seconds=settings.TRANSCRIPTION_CHUNK_OVERLAP_SECONDS,
+        max_concurrency=settings.TRANSCRIPTION_MAX_CONCURRENCY,
+        duration=duration,
+    ):
+        recording.transcript_text = transcript_text
+        recording.transcribed_seconds = transcribed
+        recording.save(update_fields=['transcript_text', 'transcribed_seconds'])
+        # Both are None when the duration couldn't be probed and the file went in one request
+        send_status_update(
+            user_id, recording.id, recording.status,
+            transcribed_seconds=_round_seconds(transcribed), total_seconds=_round_seconds(total), transcript_appended=appended,
+        )
+        # Only worth it while there is more audio to come
+        if speculate_after and not speculated and total is not None and speculate_after <= transcribed < total:
+            speculated = True
+            process_partial_transcript_speculatively.delay(recording.id)
+    return transcript_text
+
+
+def _normalised_audio(recording, work_dir):
+    """
+    Writes the recording as 16 kHz mono with silence trimmed into work_dir and fills the size and
+    duration fields on the recording (not saved). Returns the path to send for transcription;
+    the original upload if normalisation is disabled or ffmpeg can't process it.
+    """
+    if not settings.AUDIO_NORMALISATION_ENABLED:
+        return recording.audio_file.path
+    try:
+        audio_path, report = normalise_audio(
+            recording.audio_file.path,
+            work_dir,
+            threshold_db=settings.AUDIO_SILENCE_THRESHOLD_DB,
+            max_silence_seconds=settings.AUDIO_MAX_SILENCE_SECONDS,
+            padding_seconds=settings.AUDIO_SILENCE_PADDING_SECONDS,
+            fmt=settings.AUDIO_NORMALISED_FORMAT,
+            bitrate=settings.AUDIO_NORMALISED_BITRATE,
+        )
+    except Exception as e:
+        logger.warning(f"Could not normalise audio of CallRecording {recording.id}, sending the upload as is: {e}")
+        return recording.audio_file.path
+
+    recording.audio_bytes = report['input_bytes']
+    recording.normalised_audio_bytes = report['output_bytes']
+    recording.audio_seconds = report['input_seconds']
+    recording.normalised_audio_seconds = report['output_seconds']
+    observe_audio_normalisation(report)
+    logger.info(
+        f"CallRecording {recording.id} audio normalised from {report['input_bytes']} to {report['output_bytes']} bytes "
+        f"and {report['input_seconds']:.1f}s to {report['output_seconds']:.1f}s "
+        f"({report['bytes_saved']} bytes, {report['seconds_saved']:.1f}s saved)."
+    )
+    return audio_path
+
+
+def _apply_compaction(recording):
+    """
+    Fills the compacted transcript and its token counts on the recording (not saved).
+    """
+    if not settings.TRANSCRIPT_COMPACTION_ENABLED:
+        recording.compacted_transcript_text = None
+        recording.transcript_tokens = recording.compacted_transcript_tokens = None
+        return
+    recording.compacted_transcript_text = compact_transcript(
+        recording.transcript_text, settings.TRANSCRIPT_COMPACTION_ENTITY_CONTEXT_SENTENCES,
+    )
+    report = compaction_report(recording.transcript_text or '', recording.compacted_transcript_text)
+    recording.transcript_tokens = report['input_tokens']
+    recording.compacted_transcript_tokens = report['output_tokens']
+    logger.info(
+        f"CallRecording {recording.id} transcript compacted from {report['input_tokens']} to "
+        f"{report['output_tokens']} tokens ({report['saved_ratio']:.0%} saved)."
+    )
+
+
+def _prompt_transcript(recording):
+    # Recordings transcribed before compaction existed (or with it disabled) use the full transcript
+    if settings.TRANSCRIPT_COMPACTION_ENABLED and recording.compacted_transcript_text:
+        return recording.compacted_transcript_text
+    return recording.transcript_text
+
+
+def _llm_cache_key(transcript_text, skip_fields):
+    return cache_key(transcript_hash(transcript_text, skip_fields), EXTRACTION_MODEL, PROMPT_VERSION)
+
+
+def _skip_fields(pre_extracted):
+    """
+    Pre-extracted fields the LLM isn't asked for (PRE_EXTRACTION_SKIP_LLM_FIELDS).
+    """
+    configured = {field.strip() for field in settings.PRE_EXTRACTION_SKIP_LLM_FIELDS.split(',')}
+    return frozenset(field for field in pre_extracted if field in configured)
+
+
+def _with_pre_extracted(extracted_data, raw_llm_output, pre_extracted, skip_fields=()):
+    """
+    Skipped fields take the locally pre-extracted value. The other pre-extracted fields only fill
+    in what the LLM left empty; where both found a value the LLM's wins, since it reads the whole
+    conversation rather than a pattern and its cue words.
+    """
+    if not pre_extracted:
+        return extracted_data, raw_llm_output
+    local = {
+        field: value for field, value in pre_extracted.items()
+        if field in skip_fields or not extracted_data.get(field)
+    }
+    return {**extracted_data, **local}, {**raw_llm_output, 'pre_extracted': pre_extracted}
+
+
+def _queue_for_batch(recording_id):
+    """
+    Adds a recording to the pending batch. The batch is flushed as soon as it is full,
+    or at most LLM_BATCH_WINDOW_SECONDS after the first item arrived.
+    """
+    redis = get_redis()
+    pending = redis.rpush(BATCH_PENDING_KEY, recording_id)
+    if pending >= settings.LLM_BATCH_MAX_ITEMS:
+        process_extraction_batch.delay()
+    elif redis.set(BATCH_FLUSH_SCHEDULED_KEY, 1, nx=True, ex=settings.LLM_BATCH_WINDOW_SECONDS):
+        process_extraction_batch.apply_async(countdown=settings.LLM_BATCH_WINDOW_SECONDS)
+
+
+
+@shared_task(bind=True, **GROQ_RETRY_OPTIONS)
 def process_call_recording_for_transcription(self, recording_id):
     """
     Celery task to handle audio transcription using Groq API.
@@ -21,146 +445,251 @@ def process_call_recording_for_transcription(self, recording_id):
         
         recording.status = 'TRANSCRIBING'
         recording.save(update_fields=['status'])
+        record_stage(recording, 'transcribe_started')
+        send_status_update(user_id, recording.id, recording.status)
 
-        # Initialize Groq client
-        client = Groq(api_key=settings.GROQ_API_KEY)
+        # Recordings uploaded before hashing was added get their hash on first processing
+        if not recording.audio_sha256:
+            with recording.audio_file.open('rb') as file:
+                recording.audio_sha256 = compute_sha256(file)
+            recording.save(update_fields=['audio_sha256'])
 
-        # Open audio file in binary read mode
-        audio_file_path = recording.audio_file.path
-        with open(audio_file_path, "rb") as file:
-            transcript = client.audio.transcriptions.create(
-                file=(os.path.basename(audio_file_path), file.read()),
-                model="whisper-large-v3", # Groq's STT model
-            )
+        transcript_text = get_cached_transcript(recording.audio_sha256, STT_MODEL)
+        if transcript_text is not None:
+            logger.info(f"CallRecording {recording.id} transcript served from cache.")
+        else:
+            # Pooled per-process client, so connections are reused across tasks
+            client = get_groq_client()
 
-        recording.transcript_text = transcript.text
+            # Whisper only needs 16 kHz mono speech: send that instead of the raw upload. Long
+            # recordings are split into overlapping chunks and transcribed concurrently
+            with tempfile.TemporaryDirectory(prefix='normalise_') as work_dir:
+                audio_path = _normalised_audio(recording, work_dir)
+                if settings.INCREMENTAL_TRANSCRIPTION_ENABLED:
+                    # Partial transcripts are published as segments land; see _transcribe_incrementally
+                    duration = recording.normalised_audio_seconds if audio_path != recording.audio_file.path else None
+                    transcript_text = _transcribe_incrementally(recording, user_id, client, audio_path, duration)
+                else:
+                    transcript_text = transcribe_recording(client, audio_path)
+            store_transcript(recording.audio_sha256, STT_MODEL, transcript_text)
+
+        recording.transcript_text = transcript_text
+        _apply_compaction(recording)
         recording.status = 'TRANSCRIBED'
-        recording.save(update_fields=['transcript_text', 'status'])
+        recording.save(update_fields=[
+            'transcript_text', 'compacted_transcript_text', 'transcript_tokens', 'compacted_transcript_tokens', 'status',
+            'audio_bytes', 'normalised_audio_bytes', 'audio_seconds', 'normalised_audio_seconds',
+        ])
+        record_stage(recording, 'transcribe_finished')
         logger.info(f"CallRecording {recording.id} successfully transcribed.")
+        send_status_update(user_id, recording.id, recording.status)
 
-        
-        recording.status = 'EXTRACTING_INFO'
-        recording.save(update_fields=['status'])
-        process_transcript_with_llm_agent.delay(recording.id)
-        
-        # ... (send status update) ...
-        
+        # The return value is passed to the next stage of the pipeline chain (see pipeline.py)
+        return recording.id
 
     except CallRecording.DoesNotExist:
         logger.error(f"CallRecording with ID {recording_id} not found.")
         # You might send an error message to a general admin channel here
     except Exception as e:
+        if isinstance(e, TRANSIENT_GROQ_ERRORS) and self.request.retries < self.max_retries:
+            logger.warning(f"Transient Groq error transcribing CallRecording {recording_id}, will retry: {e}")
+            raise # autoretry_for reschedules the task
         logger.error(f"Error transcribing CallRecording {recording_id}: {e}", exc_info=True)
         # Update status to reflect error
-        recording.status = 'TRANSCRIPTION_FAILED'
-        recording.save(update_fields=['status'])
+        _fail_recording(recording, user_id, 'TRANSCRIPTION_FAILED', 'transcribe_failed')
+    return None # tells the extraction stage there is nothing to do
 
 
-@shared_task(bind=True)
-def process_transcript_with_llm_agent(self, recording_id):
+@shared_task(bind=True, **GROQ_RETRY_OPTIONS)
+def process_transcript_with_llm_agent(self, recording_id, batch=True):
     """
     Celery task to extract information from the transcript using Groq LLM with MCP tools.
+    Short transcripts go through the batching stage when LLM_BATCHING_ENABLED is set;
+    batch=False forces a single-item request (used as the fallback for failed batch items).
     """
+    if recording_id is None: # transcription stage failed, nothing to extract
+        return None
     try:
-        recording = CallRecording.objects.get(id=recording_id)
+        recording = CallRecording.objects.with_transcripts().get(id=recording_id)
         user_id = recording.uploaded_by.id if recording.uploaded_by else None
 
-        client = Groq(api_key=settings.GROQ_API_KEY)
+        recording.status = 'EXTRACTING_INFO'
+        recording.save(update_fields=['status'])
+        record_stage(recording, 'extract_started')
+        send_status_update(user_id, recording.id, recording.status)
 
-        # 1. Define the tool for Groq (matching the MCP server's exposed tool)
-        tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "extract_client_info_tool",
-                    "description": (
-                        "Extracts key client information from a call transcript. "
-                        "The tool should be called with parameters corresponding to the found information. "
-                        "If a piece of information is not present, the corresponding parameter should be set to null."
-                    ),
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            # Change all properties to be of type ['string', 'null']
-                            "client_name": {"type": ["string", "null"], "description": "The full name of the potential client."},
-                            "company_name": {"type": ["string", "null"], "description": "The company name of the potential client."},
-                            "contact_number": {"type": ["string", "null"], "description": "The primary contact phone number of the client."},
-                            "email": {"type": ["string", "null"], "description": "The primary email address of the client."},
-                            "service_interest": {"type": ["string", "null"], "description": "A brief description of the services the client is interested in, derived from the conversation."},
-                        },
-                        "required": [], # Still good to keep this empty
-                    },
-                },
-            }
-        ]
+        # Emails and phone numbers are pattern-matchable; fill them locally and, when the
+        # configured rule set is satisfied, skip the LLM round trip altogether
+        pre_extracted = pre_extract(recording.transcript_text) if settings.PRE_EXTRACTION_ENABLED else {}
+        skip_fields = _skip_fields(pre_extracted)
+        if satisfies_skip_rule(pre_extracted, parse_skip_llm_rules(settings.PRE_EXTRACTION_SKIP_LLM_RULES)):
+            logger.info(f"CallRecording {recording.id} extracted locally, LLM skipped.")
+            _save_extracted_info(recording, user_id, pre_extracted, {'pre_extracted': pre_extracted, 'llm_skipped': True})
+            return recording.id
 
-        # 2. Craft the prompt for the LLM
-        # Emphasize using the tool and focus on accuracy
-        messages = [
-            {
-                "role": "system",
-                "content": (
-                    "You are an expert AI assistant tasked with extracting structured client information from call transcripts. "
-                    "Your goal is to accurately identify the client's name, company, contact details (phone, email), "
-                    "their primary service interest, and any mentioned deal size estimate. "
-                    "Use the `extract_client_info_tool` to format the extracted data. "
-                    "IMPORTANT: If a piece of information is not explicitly mentioned, DO NOT include that parameter in the tool call. "
-                    "DO NOT use placeholder values like 'N/A', 'None', or 'null'. Only return values for parameters that are directly found in the transcript."
-                    "Be precise and only extract what is clearly stated or strongly implied."
-                )
-            },
-            {
-                "role": "user",
-                "content": f"Here is the call transcript: '{recording.transcript_text}'\n\nPlease extract the relevant client information and call the `extract_client_info_tool`."
-            }
-        ]
+        transcript_text = _prompt_transcript(recording)
 
-        # 3. Call Groq with tool_choice 'auto' to allow it to decide if/when to use the tool
-        chat_completion = client.chat.completions.create(
-            messages=messages,
-            model="llama3-8b-8192", # Or "llama3-70b-8192" if you prefer, or Groq's tool-use preview models
-            tools=tools,
-            tool_choice="auto", # Allow the model to decide whether to call the tool
-            max_tokens=4096, # Adjust as needed
-        )
+        # Identical prompt input (reprocessing, or a transcript served from the transcript cache)
+        # gets the stored LLM result instead of a new request
+        llm_cache_key = _llm_cache_key(transcript_text, skip_fields)
+        cached = get_cached_extraction(llm_cache_key)
+        if cached is not None:
+            extracted_data, raw_llm_output = cached
+            logger.info(f"CallRecording {recording.id} LLM cache hit ({llm_cache_key}).")
+            _save_extracted_info(recording, user_id, *_with_pre_extracted(extracted_data, raw_llm_output, pre_extracted, skip_fields))
+            return recording.id
+        logger.info(f"CallRecording {recording.id} LLM cache miss.")
 
-        tool_calls = chat_completion.choices[0].message.tool_calls
-        extracted_data = {}
-        raw_llm_output = chat_completion.model_dump_json(indent=2) # Store full LLM response for debugging
-
-        if tool_calls:
-            for tool_call in tool_calls:
-                if tool_call.function.name == "extract_client_info_tool":
-                    extracted_args = json.loads(tool_call.function.arguments)
-                    # This line is crucial: it filters out any parameters with a `None` value
-                    extracted_data = {k: v for k, v in extracted_args.items() if v is not None}
-                    break
-        
-        # Create or update ExtractedClientInfo
-        extracted_info_instance, created = ExtractedClientInfo.objects.update_or_create(
-            call_recording=recording,
-            defaults={
-                'client_name': extracted_data.get('client_name'),
-                'company_name': extracted_data.get('company_name'),
-                'contact_number': extracted_data.get('contact_number'),
-                'email': extracted_data.get('email'),
-                'service_interest': extracted_data.get('service_interest'),
-                'raw_llm_output': json.loads(raw_llm_output),
-                'is_approved': False,
-                'approved_by': None,
-                'approval_timestamp': None,
-                'review_notes': None,
-            }
-        )
-        logger.info(f"Information extracted for CallRecording {recording.id}.")
+        if (batch and settings.LLM_BATCHING_ENABLED
+                and len(transcript_text or '') <= settings.LLM_BATCH_MAX_TRANSCRIPT_CHARS):
+            _queue_for_batch(recording.id)
+            return recording.id
 
-        recording.status = 'READY_FOR_REVIEW'
-        recording.save(update_fields=['status'])
+        extracted_data, raw_llm_output = _extract(get_groq_client(), transcript_text, skip_fields)
+        if 'map_reduce' in raw_llm_output:
+            logger.info(f"CallRecording {recording.id} extracted with map-reduce over {raw_llm_output['map_reduce']['windows']} windows.")
+        store_extraction(llm_cache_key, extracted_data, raw_llm_output)
 
+        _save_extracted_info(recording, user_id, *_with_pre_extracted(extracted_data, raw_llm_output, pre_extracted, skip_fields))
+        return recording.id
 
     except CallRecording.DoesNotExist:
         logger.error(f"CallRecording with ID {recording_id} not found for extraction.")
     except Exception as e:
+        if isinstance(e, TRANSIENT_GROQ_ERRORS) and self.request.retries < self.max_retries:
+            logger.warning(f"Transient Groq error extracting info for CallRecording {recording_id}, will retry: {e}")
+            raise # autoretry_for reschedules the task
         logger.error(f"Error extracting info for CallRecording {recording_id}: {e}", exc_info=True)
-        recording.status = 'EXTRACTION_FAILED'
-        recording.save(update_fields=['status'])
\ No newline at end of file
+        _fail_recording(recording, user_id, 'EXTRACTION_FAILED', 'extract_failed')
+
+
+@shared_task(bind=True, **GROQ_RETRY_OPTIONS)
+def process_partial_transcript_speculatively(self, recording_id):
+    """
+    Extracts client information from the part of a long recording transcribed so far, so a first
+    result is available early. It is stored as speculative (not reviewable) and reconciled by the
+    regular extraction once the full transcript is in.
+    """
+    try:
+        recording = CallRecording.objects.with_transcripts().get(id=recording_id)
+        transcript_text = recording.transcript_text or ''
+        transcribed_seconds = recording.transcribed_seconds
+
+        pre_extracted = pre_extract(transcript_text) if settings.PRE_EXTRACTION_ENABLED else {}
+        skip_fields = _skip_fields(pre_extracted)
+        if settings.TRANSCRIPT_COMPACTION_ENABLED:
+            transcript_text = compact_transcript(transcript_text, settings.TRANSCRIPT_COMPACTION_ENTITY_CONTEXT_SENTENCES)
+
+        llm_cache_key = _llm_cache_key(transcript_text, skip_fields)
+        cached = get_cached_extraction(llm_cache_key)
+        if cached is not None:
+            extracted_data, raw_llm_output = cached
+        else:
+            extracted_data, raw_llm_output = _extract(get_groq_client(), transcript_text, skip_fields)
+            store_extraction(llm_cache_key, extracted_data, raw_llm_output)
+
+        extracted_data, raw_llm_output = _with_pre_extracted(extracted_data, raw_llm_output, pre_extracted, skip_fields)
+        raw_llm_output = {**raw_llm_output, 'speculative': {'transcribed_seconds': transcribed_seconds}}
+        if _save_speculative_extraction(recording, recording.uploaded_by_id, extracted_data, raw_llm_output):
+            logger.info(f"CallRecording {recording.id} speculative extraction after {transcribed_seconds or 0:.0f}s of audio.")
+
+    except CallRecording.DoesNotExist:
+        logger.error(f"CallRecording with ID {recording_id} not found for speculative extraction.")
+    except Exception as e:
+        if isinstance(e, TRANSIENT_GROQ_ERRORS) and self.request.retries < self.max_retries:
+            logger.warning(f"Transient Groq error in speculative extraction for CallRecording {recording_id}, will retry: {e}")
+            raise # autoretry_for reschedules the task
+        # Nothing to clean up: the regular extraction still runs on the full transcript
+        logger.warning(f"Speculative extraction failed for CallRecording {recording_id}: {e}", exc_info=True)
+
+
+@shared_task(bind=True, **GROQ_RETRY_OPTIONS)
+def process_extraction_batch(self):
+    """
+    Sends up to LLM_BATCH_MAX_ITEMS pending short transcripts to the LLM in one request, so the
+    system prompt and tool schema are paid for once. Each transcript should come back as its own
+    tool call keyed by recording_id; anything missing or unparseable falls back to single-item extraction.
+    """
+    redis = get_redis()
+    redis.delete(BATCH_FLUSH_SCHEDULED_KEY)
+    recording_ids = [int(i) for i in (redis.lpop(BATCH_PENDING_KEY, settings.LLM_BATCH_MAX_ITEMS) or [])]
+    if redis.llen(BATCH_PENDING_KEY):
+        process_extraction_batch.delay() # more arrived while this batch was being collected
+    if not recording_ids:
+        return []
+
+    recordings = {r.id: r for r in CallRecording.objects.with_transcripts().filter(id__in=recording_ids).select_related('uploaded_by')}
+    pre_extracted = {
+        rid: pre_extract(recording.transcript_text) if settings.PRE_EXTRACTION_ENABLED else {}
+        for rid, recording in recordings.items()
+    }
+    skip_fields = {rid: _skip_fields(fields) for rid, fields in pre_extracted.items()}
+    extracted = {}
+    try:
+        transcripts = "\n\n".join(
+            f"--- Transcript for recording_id {rid} ---{_skip_fields_note(skip_fields[rid])}\n{_prompt_transcript(recordings[rid])}"
+            for rid in recording_ids if rid in recordings
+        )
+        messages = [
+            {"role": "system", "content": BATCH_EXTRACTION_SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": f"{transcripts}\n\nCall `extract_client_info_tool` once for each of the {len(recordings)} transcripts above."
+            },
+        ]
+        with groq_rate_limited(LLM, _llm_cost(messages, BATCH_EXTRACTION_TOOLS)):
+            chat_completion = get_groq_client().chat.completions.create(
+                messages=messages,
+                model=EXTRACTION_MODEL,
+                tools=BATCH_EXTRACTION_TOOLS,
+                tool_choice="auto",
+                max_tokens=settings.EXTRACTION_MAX_OUTPUT_TOKENS,
+            )
+        observe_llm_usage(chat_completion.usage)
+        usage = chat_completion.usage.model_dump(mode='json') if chat_completion.usage else None
+        for tool_call in chat_completion.choices[0].message.tool_calls or []:
+            if tool_call.function.name != EXTRACTION_TOOL_NAME:
+                continue
+            try:
+                extracted_data = _tool_call_arguments(tool_call)
+                rid = int(extracted_data.pop('recording_id'))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Discarding unparseable batch tool call {tool_call.id}: {e}")
+                continue
+            if rid in recordings and rid not in extracted:
+                extracted[rid] = (extracted_data, {
+                    'batch_recording_ids': recording_ids,
+                    'tool_call': tool_call.model_dump(mode='json'),
+                    'usage': usage,
+                })
+    except Exception as e:
+        if isinstance(e, TRANSIENT_GROQ_ERRORS) and self.request.retries < self.max_retries:
+            # Back to the front of the queue rather than fanning out into more requests under throttling
+            redis.lpush(BATCH_PENDING_KEY, *reversed(recording_ids))
+            logger.warning(f"Transient Groq error for batch {recording_ids}, will retry: {e}")
+            raise # autoretry_for reschedules the task
+        logger.error(f"Batch extraction request failed for recordings {recording_ids}: {e}", exc_info=True)
+
+    for rid in recording_ids:
+        recording = recordings.get(rid)
+        if recording is None:
+            continue
+        if rid not in extracted:
+            logger.info(f"CallRecording {rid} missing from batch response, falling back to single extraction.")
+            process_transcript_with_llm_agent.delay(rid, batch=False)
+            continue
+        extracted_data, raw_llm_output = extracted[rid]
+        store_extraction(
+            _llm_cache_key(_prompt_transcript(recording), skip_fields[rid]), extracted_data, raw_llm_output,
+        )
+        extracted_data, raw_llm_output = _with_pre_extracted(
+            extracted_data, raw_llm_output, pre_extracted[rid], skip_fields[rid],
+        )
+        try:
+            _save_extracted_info(recording, recording.uploaded_by_id, extracted_data, raw_llm_output)
+        except Exception as e:
+            logger.error(f"Could not save batch result for CallRecording {rid}: {e}", exc_info=True)
+            process_transcript_with_llm_agent.delay(rid, batch=False)
+
+    logger.info(f"Batch extraction: {len(extracted)}/{len(recording_ids)} recordings extracted in one request.")
+    return sorted(extracted)
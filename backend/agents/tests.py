@@ -1,3 +1,1561 @@
-from django.test import TestCase
+# agents/tests.py
+import asyncio
+import functools
+import hashlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from datetime import timedelta
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import fakeredis
+import numpy as np
+from asgiref.sync import async_to_sync, sync_to_async
+from groq import Groq
+from groq.types.chat import ChatCompletion
+from prometheus_client import REGISTRY
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.models import BinaryField
+from django.db.models.functions import Cast
+from django.test import Client as TestClient, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import NotAuthenticated, NotFound
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from agents import async_views, audio_normalisation, llm_cache, rate_limit, redis_client, tasks, transcription
+from agents.compaction import compact_transcript
+from agents.compression import compress_json, compress_text
+from agents.extraction import estimate_tokens, merge_window_results, split_transcript
+from agents.groq_stub import StubBehaviour
+from agents.management.commands import bench_groq_client, bench_transcription
+from agents.metrics import record_stages
+from agents.models import (
+    CallRecording, Client, ExtractedClientInfo, RawLLMOutput, RecordingStageTransition, TranscriptCache, UploadSession,
+)
+from agents.pagination import KeysetPagination, decode_cursor, encode_cursor
+from agents.preextract import pre_extract
+from agents.transcript_cache import cache_stats, get_cached_transcript, store_transcript
+from agents.views import CallRecordingViewSet, call_recordings_for, extracted_info_for, get_user_status
+
+
+class FakeRedisMixin:
+    """
+    Points get_redis() at an in-memory Redis (Lua scripts included) for each test.
+    """
+    def setUp(self):
+        super().setUp()
+        self.redis = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        for patcher in (mock.patch.object(redis_client, '_redis', self.redis), mock.patch.dict(rate_limit._scripts, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class FakeClock:
+    """
+    Virtual time for time.monotonic/time.time/time.sleep, shared with Redis' TIME. A sleep lasts
+    from the moment the thread last read the clock, so threads sleeping side by side overlap
+    and the clock only moves on to the latest wake-up time.
+    """
+    def __init__(self):
+        self.now = 1_000_000.0
+        self.lock = threading.Lock()
+        self.seen = threading.local()
+
+    def monotonic(self):
+        self.seen.now = self.now
+        return self.now
+
+    time = monotonic
+
+    def sleep(self, seconds):
+        with self.lock:
+            self.now = max(self.now, getattr(self.seen, 'now', self.now) + seconds)
+
+    def patch(self, test):
+        for module in (rate_limit, transcription, fakeredis.commands_mixins.server_mixin):
+            patcher = mock.patch.object(module, 'time', self)
+            patcher.start()
+            test.addCleanup(patcher.stop)
+
+
+def tool_call_completion(*arguments):
+    """
+    A chat completion that calls the extraction tool once with each of the given arguments.
+    """
+    return ChatCompletion.model_validate({
+        'id': 'chatcmpl-test', 'object': 'chat.completion', 'created': 0, 'model': tasks.EXTRACTION_MODEL,
+        'choices': [{'index': 0, 'finish_reason': 'tool_calls', 'message': {
+            'role': 'assistant', 'content': None,
+            'tool_calls': [
+                {'id': f"call_{index}", 'type': 'function', 'function': {
+                    'name': tasks.EXTRACTION_TOOL_NAME, 'arguments': json.dumps(args),
+                }}
+                for index, args in enumerate(arguments)
+            ],
+        }}],
+    })
+
+
+class TranscribeRecordingTests(SimpleTestCase):
+    @override_settings(TRANSCRIPTION_CHUNKING_ENABLED=True, GROQ_RATE_LIMIT_ENABLED=True)
+    def test_unprobeable_audio_is_sent_in_one_request(self):
+        # No ffprobe on the PATH, or a file ffprobe rejects
+        for error in (FileNotFoundError('ffprobe'), subprocess.CalledProcessError(1, 'ffprobe')):
+            with self.subTest(error=type(error).__name__), \
+                    mock.patch.object(transcription.subprocess, 'run', side_effect=error), \
+                    mock.patch.object(transcription, 'transcribe_file', return_value="Hello.") as transcribe_file:
+                self.assertEqual(transcription.transcribe_recording(mock.Mock(), 'call.mp3'), "Hello.")
+                transcribe_file.assert_called_once_with(mock.ANY, 'call.mp3', audio_seconds=None)
+
+    def test_unprobeable_audio_is_one_incremental_segment(self):
+        for error in (FileNotFoundError('ffprobe'), subprocess.CalledProcessError(1, 'ffprobe')):
+            with self.subTest(error=type(error).__name__), \
+                    mock.patch.object(transcription.subprocess, 'run', side_effect=error), \
+                    mock.patch.object(transcription, 'split_audio') as split_audio, \
+                    mock.patch.object(transcription, 'transcribe_file', return_value="Hello.") as transcribe_file:
+                segments = transcription.transcribe_incrementally(mock.Mock(), 'call.mp3', 120, 5, 2)
+                self.assertEqual(list(segments), [("Hello.", "Hello.", None, None)])
+                transcribe_file.assert_called_once_with(mock.ANY, 'call.mp3', transcription.STT_MODEL)
+                split_audio.assert_not_called()
+
+    @override_settings(SPECULATIVE_EXTRACTION_AFTER_SECONDS=1)
+    @mock.patch.object(tasks.process_partial_transcript_speculatively, 'delay')
+    @mock.patch.object(tasks, 'send_status_update')
+    def test_unprobeable_audio_published_without_progress(self, send_status_update, speculate):
+        recording = mock.Mock(id=7, status='TRANSCRIBING')
+        with mock.patch.object(transcription.subprocess, 'run', side_effect=FileNotFoundError('ffprobe')), \
+                mock.patch.object(transcription, 'transcribe_file', return_value="Hello."):
+            self.assertEqual(tasks._transcribe_incrementally(recording, 3, mock.Mock(), 'call.mp3'), "Hello.")
+        self.assertEqual((recording.transcript_text, recording.transcribed_seconds), ("Hello.", None))
+        send_status_update.assert_called_once_with(
+            3, 7, 'TRANSCRIBING', transcribed_seconds=None, total_seconds=None, transcript_appended="Hello.",
+        )
+        speculate.assert_not_called()
+
+
+class ChunkedTranscriptionTests(SimpleTestCase):
+    def test_plan_chunks(self):
+        for duration, chunks in [
+            (0, []),
+            (250, [(0.0, 250)]), # below one chunk
+            (300, [(0.0, 300)]), # exactly one chunk
+            (300.5, [(0.0, 300), (290.0, 10.5)]), # just above: the second chunk starts inside the overlap
+            (880, [(0.0, 300), (290.0, 300), (580.0, 300)]),
+        ]:
+            with self.subTest(duration=duration):
+                self.assertEqual(transcription.plan_chunks(duration, 300, 10), chunks)
+
+    def test_overlap_must_be_shorter_than_chunk(self):
+        for overlap in (300, 301):
+            with self.subTest(overlap=overlap), self.assertRaises(ValueError):
+                transcription.plan_chunks(600, 300, overlap)
+
+    def test_stitch_drops_duplicated_boundary_words(self):
+        self.assertEqual(
+            transcription.stitch_transcripts([
+                "My budget is around five thousand",
+                "around five thousand, dollars a month.",
+                "",
+                "A month. Email me at jane@example.com",
+            ]),
+            "My budget is around five thousand dollars a month. Email me at jane@example.com",
+        )
+
+    def test_stitch_keeps_repeats_shorter_than_min_overlap(self):
+        # A single repeated word at the boundary is real speech, not overlap
+        self.assertEqual(transcription.stitch_transcripts(["I said no", "no thanks."]), "I said no no thanks.")
+        self.assertEqual(
+            transcription.stitch_transcripts(["It was very good", "very good indeed."], min_overlap_words=3),
+            "It was very good very good indeed.",
+        )
+
+
+class TranscriptCacheTests(FakeRedisMixin, TestCase):
+    def test_miss_then_hit(self):
+        self.assertIsNone(get_cached_transcript('a' * 64, 'whisper-large-v3'))
+        store_transcript('a' * 64, 'whisper-large-v3', "Hello.")
+        self.assertEqual(get_cached_transcript('a' * 64, 'whisper-large-v3'), "Hello.")
+        self.assertEqual(get_cached_transcript('a' * 64, 'whisper-large-v3'), "Hello.")
+
+        self.assertEqual(TranscriptCache.objects.get().hits, 2)
+        stats = cache_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (2, 1, 1))
+        self.assertAlmostEqual(stats['hit_rate'], 2 / 3)
+
+    def test_keyed_per_model(self):
+        store_transcript('a' * 64, 'whisper-large-v3', "Hello.")
+        store_transcript('a' * 64, 'whisper-large-v3-turbo', "Hello there.")
+        self.assertIsNone(get_cached_transcript('a' * 64, 'distil-whisper'))
+        self.assertEqual(get_cached_transcript('a' * 64, 'whisper-large-v3'), "Hello.")
+        self.assertEqual(get_cached_transcript('a' * 64, 'whisper-large-v3-turbo'), "Hello there.")
+
+    def test_store_replaces_entry(self):
+        store_transcript('a' * 64, 'whisper-large-v3', "Hello.")
+        store_transcript('a' * 64, 'whisper-large-v3', "Hello again.")
+        self.assertEqual(TranscriptCache.objects.get().transcript_text, "Hello again.")
+
+    def test_recordings_without_hash_never_cached(self):
+        store_transcript('', 'whisper-large-v3', "Hello.")
+        self.assertIsNone(get_cached_transcript('', 'whisper-large-v3'))
+        self.assertFalse(TranscriptCache.objects.exists())
+        self.assertEqual(cache_stats()['misses'], 0)
+
+    @override_settings(TRANSCRIPT_CACHE_MAX_ENTRIES=2)
+    def test_least_recently_used_evicted(self):
+        store_transcript('a' * 64, 'whisper-large-v3', "A")
+        store_transcript('b' * 64, 'whisper-large-v3', "B")
+        get_cached_transcript('a' * 64, 'whisper-large-v3') # b is now the least recently used
+        store_transcript('c' * 64, 'whisper-large-v3', "C")
+        self.assertEqual(
+            sorted(TranscriptCache.objects.values_list('transcript_text', flat=True)), ["A", "C"],
+        )
+
+    def test_counters_best_effort(self):
+        # Redis down: lookups still work, the counters read as zero
+        store_transcript('a' * 64, 'whisper-large-v3', "Hello.")
+        with mock.patch.object(self.redis, 'incr', side_effect=ConnectionError), \
+                mock.patch.object(self.redis, 'mget', side_effect=ConnectionError):
+            self.assertEqual(get_cached_transcript('a' * 64, 'whisper-large-v3'), "Hello.")
+            self.assertEqual(cache_stats()['hits'], 0)
+
+    @mock.patch.object(tasks, 'send_status_update')
+    @mock.patch.object(tasks, 'get_groq_client')
+    def test_cached_transcript_skips_transcription(self, get_groq_client, send_status_update):
+        user = User.objects.create_user(username='onboarder')
+        recording = CallRecording.objects.create(
+            uploaded_by=user, audio_file='call_recordings/call.mp3', audio_sha256='a' * 64,
+        )
+        store_transcript('a' * 64, transcription.STT_MODEL, "Hi, this is Jane Foster.")
+        self.assertEqual(tasks.process_call_recording_for_transcription(recording.id), recording.id)
+        get_groq_client.assert_not_called()
+        recording = CallRecording.objects.with_transcripts().get(id=recording.id)
+        self.assertEqual((recording.status, recording.transcript_text), ('TRANSCRIBED', "Hi, this is Jane Foster."))
+
+
+@mock.patch.object(tasks, 'send_status_update')
+class SpeculativeExtractionFailureTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='onboarder')
+        self.recording = CallRecording.objects.create(
+            uploaded_by=self.user, audio_file='call_recordings/call.mp3', status='TRANSCRIBING',
+            audio_sha256='0' * 64, transcript_text="Hi, this is Jane Foster from Tech Innovators.",
+        )
+        self.assertTrue(tasks._save_speculative_extraction(self.recording, self.user.id, {'client_name': 'Jane'}, {}))
+
+    def assertSpeculativeDiscarded(self):
+        self.assertFalse(ExtractedClientInfo.objects.filter(call_recording=self.recording).exists())
+        self.assertFalse(RawLLMOutput.objects.exists())
+        self.assertFalse(extracted_info_for(self.user).exists())
+
+    def test_speculative_result_shown_while_transcribing(self, send_status_update):
+        self.assertEqual(list(extracted_info_for(self.user).values_list('client_name', flat=True)), ['Jane'])
+
+    @mock.patch.object(tasks, 'get_groq_client', side_effect=RuntimeError("STT down"))
+    def test_discarded_when_transcription_fails(self, get_groq_client, send_status_update):
+        self.assertIsNone(tasks.process_call_recording_for_transcription(self.recording.id))
+        self.recording.refresh_from_db(fields=['status'])
+        self.assertEqual(self.recording.status, 'TRANSCRIPTION_FAILED')
+        self.assertSpeculativeDiscarded()
+
+    @override_settings(PRE_EXTRACTION_ENABLED=False, LLM_BATCHING_ENABLED=False)
+    @mock.patch.object(tasks, 'get_cached_extraction', return_value=None)
+    @mock.patch.object(tasks, 'get_groq_client', side_effect=RuntimeError("LLM down"))
+    def test_discarded_when_extraction_fails(self, get_groq_client, get_cached_extraction, send_status_update):
+        CallRecording.objects.filter(id=self.recording.id).update(status='TRANSCRIBED')
+        tasks.process_transcript_with_llm_agent(self.recording.id)
+        self.recording.refresh_from_db(fields=['status'])
+        self.assertEqual(self.recording.status, 'EXTRACTION_FAILED')
+        self.assertSpeculativeDiscarded()
+
+    def test_left_over_speculative_result_of_failed_recording_hidden(self, send_status_update):
+        CallRecording.objects.filter(id=self.recording.id).update(status='EXTRACTION_FAILED')
+        self.assertFalse(extracted_info_for(self.user).exists())
+
+
+@skipUnless(shutil.which('ffmpeg'), "needs ffmpeg")
+class NormaliseAudioTests(SimpleTestCase):
+    def test_streamed_blocks_match_whole_recording_trim(self):
+        rate = audio_normalisation.SAMPLE_RATE
+        tone = (8000 * np.sin(2 * np.pi * 440 * np.arange(rate * 2) / rate)).astype(np.int16)
+        silence = np.zeros(rate * 5, dtype=np.int16)
+        samples = np.concatenate((silence, tone, silence, tone, silence[:rate * 3 + 123]))
+
+        # What trimming the whole recording in memory keeps
+        frame_length = int(rate * audio_normalisation.FRAME_SECONDS)
+        speech = audio_normalisation.speech_frames(audio_normalisation.frame_levels(samples, frame_length), -40.0, 7)
+        keep = audio_normalisation.keep_frames(speech, 33)
+        expected_seconds = round(keep.sum() * frame_length / rate, 2)
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            wav_path = f"{work_dir}/call.wav"
+            subprocess.run(
+                ['ffmpeg', '-v', 'error', '-f', 's16le', '-ar', str(rate), '-ac', '1', '-i', '-', wav_path],
+                input=samples.tobytes(), check=True,
+            )
+            # Small blocks, so frames and silences span block boundaries
+            with mock.patch.object(audio_normalisation, 'BLOCK_FRAMES', 7):
+                output_path, report = audio_normalisation.normalise_audio(wav_path, work_dir, fmt='flac')
+            decoded = audio_normalisation.decode_audio(output_path)
+
+        self.assertEqual(report['input_seconds'], round(len(samples) / rate, 2))
+        self.assertEqual(report['output_seconds'], expected_seconds)
+        self.assertEqual(len(decoded), round(expected_seconds * rate))
+
+
+@override_settings(GROQ_RATE_LIMIT_ENABLED=True)
+class GroqRateLimitedTests(SimpleTestCase):
+    @mock.patch.object(rate_limit, '_refund')
+    @mock.patch.object(rate_limit, '_acquire_slot', side_effect=rate_limit.RateLimitTimeout("No free slot"))
+    @mock.patch.object(rate_limit, '_reserve', return_value=300)
+    def test_budget_refunded_when_no_slot(self, reserve, acquire_slot, refund):
+        with self.assertRaises(rate_limit.RateLimitTimeout):
+            with rate_limit.groq_rate_limited(rate_limit.LLM, 300):
+                self.fail("called without a concurrency slot")
+        refund.assert_called_once_with(rate_limit.LLM, 300)
+
+    @mock.patch.object(rate_limit, 'get_redis')
+    @mock.patch.object(rate_limit, '_adjust_safely')
+    @mock.patch.object(rate_limit, '_refund')
+    @mock.patch.object(rate_limit, '_acquire_slot', return_value='lease')
+    @mock.patch.object(rate_limit, '_reserve', return_value=300)
+    def test_budget_kept_when_call_made(self, reserve, acquire_slot, refund, adjust_safely, get_redis):
+        with rate_limit.groq_rate_limited(rate_limit.LLM, 300):
+            pass
+        refund.assert_not_called()
+
+
+@override_settings(TRANSCRIPTION_CHUNKING_ENABLED=True, GROQ_RATE_LIMIT_ENABLED=True)
+class ChunkedRateLimitTests(FakeRedisMixin, SimpleTestCase):
+    def test_long_recording_paced_and_charged_in_full(self):
+        clock = FakeClock()
+        clock.patch(self)
+        start = clock.now
+        calls = []
+
+        def create(file, model):
+            calls.append((clock.monotonic(), file[0]))
+            return SimpleNamespace(text=f"{file[0]} ends with the overlap")
+
+        def split_audio(audio_file_path, chunks, output_dir):
+            paths = [os.path.join(output_dir, f"chunk_{index}.mp3") for index in range(len(chunks))]
+            for path in paths:
+                open(path, 'wb').close()
+            return paths
+
+        client = mock.Mock()
+        client.audio.transcriptions.create.side_effect = create
+        # 45 minutes: five chunks, four transcribed at a time, with the default budgets
+        with mock.patch.object(transcription, 'get_audio_duration', return_value=2700), \
+                mock.patch.object(transcription, 'split_audio', side_effect=split_audio):
+            transcript = transcription.transcribe_recording(client, 'call.mp3')
+
+        chunks = transcription.plan_chunks(2700, 600, 5)
+        self.assertEqual(len(chunks), 5)
+        self.assertEqual(sorted(name for _, name in calls), [f"chunk_{index}.mp3" for index in range(5)])
+        self.assertEqual(transcript.count("ends with the overlap"), 5)
+
+        # Every chunk is charged its full length: by the time each is sent, the audio sent so far is
+        # within the bucket plus the budget earned since the start, give or take the deficit one
+        # chunk bigger than the bucket may leave
+        rate, capacity = rate_limit._bucket(rate_limit.AUDIO)
+        deficit = max(length for _, length in chunks) - capacity
+        sent = 0
+        for at, name in sorted(calls):
+            sent += chunks[int(name[6])][1]
+            self.assertLessEqual(sent, capacity + rate * (at - start) + deficit + 0.01, name)
+
+
+class PreExtractTests(SimpleTestCase):
+    def test_cued_contact_details_extracted(self):
+        cases = [
+            ("My phone number is 415-555-0199.", {'contact_number': '415-555-0199'}),
+            ("You can call me on nine nine nine, eight eight eight, seven seven seven seven.", {'contact_number': '999-888-7777'}),
+            ("What's the best number to reach you? It's (415) 555-0199.", {'contact_number': '(415) 555-0199'}),
+            ("My email is mark.s@email.com, thanks.", {'email': 'mark.s@email.com'}),
+            ("You can reach me at jane dot foster at gmail dot com.", {'email': 'jane.foster@gmail.com'}),
+        ]
+        for transcript, expected in cases:
+            with self.subTest(transcript=transcript):
+                self.assertEqual(pre_extract(transcript), expected)
+
+    def test_uncued_and_other_numbers_ignored(self):
+        for transcript in (
+            "My order number is 4155550199.",
+            "The account id is one two three four five six seven eight nine zero.",
+            "I am at home dot com.",
+            "We shipped 4155550199 units last year.",
+        ):
+            with self.subTest(transcript=transcript):
+                self.assertEqual(pre_extract(transcript), {})
+
+    def test_order_number_next_to_phone_number_not_taken(self):
+        transcript = "My phone number is 415-555-0199. My order number is 4155550100."
+        self.assertEqual(pre_extract(transcript), {'contact_number': '415-555-0199'})
+
+    def test_llm_value_wins_over_pre_extracted(self):
+        extracted, raw = tasks._with_pre_extracted(
+            {'client_name': 'Jane', 'contact_number': '415-555-0123'}, {},
+            {'contact_number': '415-555-0199', 'email': 'jane@example.com'},
+        )
+        self.assertEqual(extracted, {'client_name': 'Jane', 'contact_number': '415-555-0123', 'email': 'jane@example.com'})
+        self.assertEqual(raw['pre_extracted'], {'contact_number': '415-555-0199', 'email': 'jane@example.com'})
+
+    def test_skipped_field_takes_pre_extracted_value(self):
+        extracted, _ = tasks._with_pre_extracted(
+            {'client_name': 'Jane', 'contact_number': '415-555-0123'}, {},
+            {'contact_number': '415-555-0199', 'email': 'jane@example.com'}, skip_fields={'contact_number', 'email'},
+        )
+        self.assertEqual(extracted, {'client_name': 'Jane', 'contact_number': '415-555-0199', 'email': 'jane@example.com'})
+
+
+@override_settings(LLM_BATCHING_ENABLED=False, GROQ_RATE_LIMIT_ENABLED=False, TRANSCRIPT_COMPACTION_ENABLED=False)
+@mock.patch.object(tasks, 'send_status_update')
+@mock.patch.object(tasks, 'get_groq_client')
+class PreExtractedFieldsSkippedTests(FakeRedisMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.recording = CallRecording.objects.create(
+            uploaded_by=User.objects.create_user(username='onboarder'), audio_file='call_recordings/call.mp3',
+            status='TRANSCRIBED', transcript_text=(
+                "Hi, this is Jane Foster from Tech Innovators. You can reach me on 415-555-0199 "
+                "or email me at jane@example.com."
+            ),
+        )
+
+    def extract(self, get_groq_client, llm_fields):
+        create = get_groq_client.return_value.chat.completions.create
+        create.return_value = tool_call_completion(llm_fields)
+        tasks.process_transcript_with_llm_agent(self.recording.id)
+        request = create.call_args.kwargs
+        return (
+            set(request['tools'][0]['function']['parameters']['properties']),
+            request['messages'][-1]['content'],
+            ExtractedClientInfo.objects.get(call_recording=self.recording),
+        )
+
+    def test_cued_contact_details_left_out_of_llm_request(self, get_groq_client, send_status_update):
+        fields, prompt, info = self.extract(get_groq_client, {'client_name': 'Jane Foster', 'company_name': 'Tech Innovators'})
+        self.assertEqual(fields, {'client_name', 'company_name', 'service_interest'})
+        self.assertIn("already known, do not extract them: contact_number, email.", prompt)
+        self.assertEqual(
+            (info.client_name, info.contact_number, info.email), ('Jane Foster', '415-555-0199', 'jane@example.com'),
+        )
+
+    @override_settings(PRE_EXTRACTION_SKIP_LLM_FIELDS='')
+    def test_every_field_asked_for_without_skip_fields(self, get_groq_client, send_status_update):
+        fields, prompt, info = self.extract(get_groq_client, {'contact_number': '415-555-0123'})
+        self.assertEqual(fields, set(tasks.EXTRACTION_FIELDS))
+        self.assertNotIn("already known", prompt)
+        self.assertEqual((info.contact_number, info.email), ('415-555-0123', 'jane@example.com'))
+
+
+@override_settings(LLM_BATCHING_ENABLED=False, GROQ_RATE_LIMIT_ENABLED=False, TRANSCRIPT_COMPACTION_ENABLED=False)
+@mock.patch.object(tasks, 'send_status_update')
+@mock.patch.object(tasks, 'get_groq_client')
+class LLMCacheTests(FakeRedisMixin, TestCase):
+    transcript = "Hi, this is Jane Foster from Tech Innovators, calling about your CRM integration."
+
+    def setUp(self):
+        super().setUp()
+        self.recording = CallRecording.objects.create(
+            uploaded_by=User.objects.create_user(username='onboarder'), audio_file='call_recordings/call.mp3',
+            status='TRANSCRIBED', transcript_text=self.transcript,
+        )
+
+    def extract(self, get_groq_client, client_name="Jane Foster"):
+        create = get_groq_client.return_value.chat.completions.create
+        create.return_value = tool_call_completion({'client_name': client_name, 'company_name': "Tech Innovators"})
+        tasks.process_transcript_with_llm_agent(self.recording.id)
+        return ExtractedClientInfo.objects.get(call_recording=self.recording)
+
+    def test_hit_skips_groq_call(self, get_groq_client, send_status_update):
+        self.extract(get_groq_client)
+        info = self.extract(get_groq_client, client_name="Someone Else")
+        get_groq_client.return_value.chat.completions.create.assert_called_once()
+        self.assertEqual((info.client_name, info.company_name), ("Jane Foster", "Tech Innovators"))
+        self.assertEqual(llm_cache.cache_stats(), {
+            'hits': 1, 'misses': 1, 'hit_rate': 0.5, 'entries': 1, 'max_entries': settings.LLM_CACHE_MAX_ENTRIES,
+        })
+
+    def test_prompt_or_model_change_misses(self, get_groq_client, send_status_update):
+        self.extract(get_groq_client)
+        for name, patcher in (
+            ("New Prompt", mock.patch.object(tasks, 'PROMPT_VERSION', 'test-prompt-v2')),
+            ("New Model", mock.patch.object(tasks, 'EXTRACTION_MODEL', 'test-model')),
+        ):
+            with self.subTest(name=name), patcher:
+                self.assertEqual(self.extract(get_groq_client, client_name=name).client_name, name)
+        self.assertEqual(get_groq_client.return_value.chat.completions.create.call_count, 3)
+        self.assertEqual(llm_cache.cache_stats()['entries'], 3)
+
+    def test_key_covers_prompt_input(self, get_groq_client, send_status_update):
+        key = tasks._llm_cache_key(self.transcript, frozenset())
+        self.assertEqual(key, tasks._llm_cache_key(self.transcript, frozenset()))
+        self.assertEqual(
+            tasks._llm_cache_key(self.transcript, frozenset({'email', 'contact_number'})),
+            tasks._llm_cache_key(self.transcript, frozenset({'contact_number', 'email'})),
+        )
+        other_keys = {
+            tasks._llm_cache_key(self.transcript + ".", frozenset()),
+            tasks._llm_cache_key(self.transcript, frozenset({'email'})),
+            llm_cache.cache_key(llm_cache.transcript_hash(self.transcript), tasks.EXTRACTION_MODEL, 'other-prompt'),
+            llm_cache.cache_key(llm_cache.transcript_hash(self.transcript), 'other-model', tasks.PROMPT_VERSION),
+        }
+        self.assertEqual(len(other_keys), 4)
+        self.assertNotIn(key, other_keys)
+
+    @override_settings(LLM_CACHE_MAX_ENTRIES=2)
+    def test_least_recently_used_evicted(self, get_groq_client, send_status_update):
+        keys = [llm_cache.cache_key(f"hash{index}", 'model', 'v1') for index in range(3)]
+        llm_cache.store_extraction(keys[0], {'client_name': "A"}, {})
+        llm_cache.store_extraction(keys[1], {'client_name': "B"}, {})
+        llm_cache.get_cached_extraction(keys[0])
+        llm_cache.store_extraction(keys[2], {'client_name': "C"}, {})
+        self.assertEqual(llm_cache.get_cached_extraction(keys[0]), ({'client_name': "A"}, {}))
+        self.assertIsNone(llm_cache.get_cached_extraction(keys[1]))
+        self.assertEqual(llm_cache.get_cached_extraction(keys[2]), ({'client_name': "C"}, {}))
+
+    def test_invalidate_command_removes_prompt_version(self, get_groq_client, send_status_update):
+        self.extract(get_groq_client)
+        old_key = llm_cache.cache_key("hash", 'model', 'old-prompt')
+        llm_cache.store_extraction(old_key, {'client_name': "Old"}, {})
+
+        stdout = io.StringIO()
+        call_command('invalidate_llm_cache', stdout=stdout)
+        self.assertIn(f"Deleted 1 LLM cache entries for prompt version {tasks.PROMPT_VERSION}.", stdout.getvalue())
+        self.assertEqual([key.decode() for key in self.redis.zrange(llm_cache.LRU_KEY, 0, -1)], [old_key])
+        self.extract(get_groq_client, client_name="Fresh")
+        self.assertEqual(get_groq_client.return_value.chat.completions.create.call_count, 2)
+
+        call_command('invalidate_llm_cache', 'old-prompt', stdout=io.StringIO())
+        self.assertIsNone(llm_cache.get_cached_extraction(old_key))
+        self.assertFalse(self.redis.exists(old_key))
+
+    @override_settings(LLM_CACHE_ENABLED=False)
+    def test_disabled_cache_always_calls_groq(self, get_groq_client, send_status_update):
+        self.extract(get_groq_client)
+        self.extract(get_groq_client)
+        self.assertEqual(get_groq_client.return_value.chat.completions.create.call_count, 2)
+        self.assertFalse(self.redis.keys('llm_cache:*'))
+
+
+@override_settings(
+    LLM_BATCHING_ENABLED=True, GROQ_RATE_LIMIT_ENABLED=False, TRANSCRIPT_COMPACTION_ENABLED=False, PRE_EXTRACTION_ENABLED=False,
+)
+@mock.patch.object(tasks.process_transcript_with_llm_agent, 'delay')
+@mock.patch.object(tasks.process_extraction_batch, 'apply_async')
+@mock.patch.object(tasks.process_extraction_batch, 'delay')
+@mock.patch.object(tasks, 'send_status_update')
+@mock.patch.object(tasks, 'get_groq_client')
+class BatchExtractionTests(FakeRedisMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        onboarder = User.objects.create_user(username='onboarder')
+        self.recordings = [
+            CallRecording.objects.create(
+                uploaded_by=onboarder, audio_file=f"call_recordings/call_{index}.mp3", status='TRANSCRIBED',
+                transcript_text=f"Hi, this is Client {index} from Company {index}.",
+            )
+            for index in range(3)
+        ]
+        self.ids = [recording.id for recording in self.recordings]
+
+    def run_batch(self, get_groq_client, *tool_calls):
+        for recording in self.recordings:
+            tasks.process_transcript_with_llm_agent(recording.id)
+        create = get_groq_client.return_value.chat.completions.create
+        create.assert_not_called()
+        create.return_value = tool_call_completion(*tool_calls)
+        return tasks.process_extraction_batch(), create
+
+    def extracted_names(self):
+        return dict(ExtractedClientInfo.objects.values_list('call_recording_id', 'client_name'))
+
+    def test_short_transcripts_queued_for_one_flush(self, get_groq_client, send_status_update, delay, apply_async, single_delay):
+        for recording in self.recordings:
+            tasks.process_transcript_with_llm_agent(recording.id)
+        get_groq_client.assert_not_called()
+        apply_async.assert_called_once_with(countdown=settings.LLM_BATCH_WINDOW_SECONDS)
+        delay.assert_not_called()
+        self.assertEqual([int(rid) for rid in self.redis.lrange(tasks.BATCH_PENDING_KEY, 0, -1)], self.ids)
+
+    def test_tool_calls_matched_by_recording_id(self, get_groq_client, send_status_update, delay, apply_async, single_delay):
+        # Answered out of order, with a duplicate for the first recording
+        extracted, create = self.run_batch(get_groq_client, *(
+            {'recording_id': self.ids[index], 'client_name': f"Client {index}", 'company_name': f"Company {index}"}
+            for index in (2, 0, 1)
+        ), {'recording_id': self.ids[0], 'client_name': "Someone Else"})
+        create.assert_called_once()
+        prompt = create.call_args.kwargs['messages'][-1]['content']
+        for rid in self.ids:
+            self.assertIn(f"--- Transcript for recording_id {rid} ---", prompt)
+        self.assertEqual(extracted, self.ids)
+        self.assertEqual(self.extracted_names(), {rid: f"Client {index}" for index, rid in enumerate(self.ids)})
+        self.assertEqual(
+            set(ExtractedClientInfo.objects.values_list('call_recording__status', flat=True)), {'READY_FOR_REVIEW'},
+        )
+        raw = RawLLMOutput.objects.get(extracted_info__call_recording_id=self.ids[1]).value
+        self.assertEqual(raw['batch_recording_ids'], self.ids)
+        self.assertEqual(json.loads(raw['tool_call']['function']['arguments'])['recording_id'], self.ids[1])
+        single_delay.assert_not_called()
+
+    def test_missing_recordings_fall_back_to_single_extraction(self, get_groq_client, send_status_update, delay, apply_async, single_delay):
+        extracted, create = self.run_batch(
+            get_groq_client,
+            {'recording_id': self.ids[1], 'client_name': "Client 1"},
+            {'recording_id': "not a number", 'client_name': "Client 0"},
+            {'recording_id': 999999, 'client_name': "Client 2"},
+            {'client_name': "No id"},
+        )
+        self.assertEqual(extracted, [self.ids[1]])
+        self.assertEqual(self.extracted_names(), {self.ids[1]: "Client 1"})
+        self.assertEqual(single_delay.call_args_list, [mock.call(self.ids[0], batch=False), mock.call(self.ids[2], batch=False)])
+
+    def test_failed_request_falls_back_for_every_recording(self, get_groq_client, send_status_update, delay, apply_async, single_delay):
+        for recording in self.recordings:
+            tasks.process_transcript_with_llm_agent(recording.id)
+        get_groq_client.return_value.chat.completions.create.side_effect = RuntimeError("LLM down")
+        self.assertEqual(tasks.process_extraction_batch(), [])
+        self.assertFalse(ExtractedClientInfo.objects.exists())
+        self.assertEqual(single_delay.call_args_list, [mock.call(rid, batch=False) for rid in self.ids])
+
+
+class WindowedExtractionTests(SimpleTestCase):
+    sentences = [f"Sentence number {index} is here." for index in range(12)]
+
+    def test_windows_fit_and_overlap(self):
+        windows = split_transcript(' '.join(self.sentences), max_tokens=30, overlap_tokens=10)
+        self.assertGreater(len(windows), 1)
+        for window in windows:
+            self.assertLessEqual(estimate_tokens(window), 30)
+        for previous, following in zip(windows, windows[1:]):
+            # The next window starts with the last sentence of the one before
+            last_sentence = previous.rsplit('. ', 1)[-1]
+            self.assertTrue(following.startswith(last_sentence))
+        self.assertEqual(windows[0].split('. ')[0], "Sentence number 0 is here")
+        self.assertTrue(windows[-1].endswith(self.sentences[-1]))
+
+    def test_no_overlap_covers_each_sentence_once(self):
+        windows = split_transcript(' '.join(self.sentences), max_tokens=30)
+        self.assertEqual(' '.join(windows), ' '.join(self.sentences))
+
+    def test_overlap_never_overflows_window(self):
+        # Room for one sentence only, so nothing can be carried over
+        windows = split_transcript(' '.join(self.sentences), max_tokens=15, overlap_tokens=10)
+        self.assertEqual(windows, self.sentences)
+
+    def test_short_and_empty_transcripts(self):
+        self.assertEqual(split_transcript("Hello there. Bye.", max_tokens=30, overlap_tokens=10), ["Hello there. Bye."])
+        self.assertEqual(split_transcript('', max_tokens=30), [])
+        self.assertEqual(split_transcript(None, max_tokens=30), [])
+
+    def test_unpunctuated_run_cut_on_words(self):
+        self.assertEqual(
+            split_transcript("one two three four five six seven eight nine ten", max_tokens=5),
+            ["one two three", "four five six", "seven eight nine", "ten"],
+        )
+
+    def test_later_window_fills_empty_field(self):
+        merged, provenance = merge_window_results([
+            {'client_name': '', 'email': None}, {'client_name': "Jane Doe", 'email': None},
+        ])
+        self.assertEqual(merged, {'client_name': "Jane Doe"})
+        self.assertEqual(provenance['client_name'], {'windows': [1], 'alternatives': []})
+
+    def test_first_window_wins_tie(self):
+        merged, provenance = merge_window_results([{'client_name': "Jane Doe"}, {'client_name': "John Smith"}])
+        self.assertEqual(merged, {'client_name': "Jane Doe"})
+        self.assertEqual(provenance['client_name'], {'windows': [0], 'alternatives': ["John Smith"]})
+
+    def test_value_found_by_more_windows_wins(self):
+        merged, provenance = merge_window_results([
+            {'contact_number': "555 999 0000"}, {'contact_number': "555-123-4567"}, {'contact_number': "(555) 123 4567"},
+        ])
+        self.assertEqual(merged, {'contact_number': "555-123-4567"})
+        self.assertEqual(provenance['contact_number'], {'windows': [1, 2], 'alternatives': ["555 999 0000"]})
+
+    def test_case_and_spacing_variants_agree(self):
+        merged, provenance = merge_window_results([
+            {'client_name': "John Smith"}, {'client_name': "Jane Doe"}, {'client_name': "jane  doe "},
+        ])
+        self.assertEqual(merged, {'client_name': "Jane Doe"})
+        self.assertEqual(provenance['client_name']['windows'], [1, 2])
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.onboarder = User.objects.create_user(username='onboarder')
+        cls.other = User.objects.create_user(username='other')
+        cls.recordings = CallRecording.objects.bulk_create([
+            CallRecording(uploaded_by=cls.onboarder, audio_file=f"call_recordings/call_{index}.mp3")
+            for index in range(7)
+        ])
+        CallRecording.objects.create(uploaded_by=cls.other, audio_file='call_recordings/other.mp3')
+        # Two pairs of recordings share an upload_timestamp; id breaks the tie
+        now = timezone.now()
+        for recording, minutes in zip(cls.recordings, [0, 1, 1, 2, 3, 3, 4]):
+            recording.upload_timestamp = now - timedelta(minutes=minutes)
+        CallRecording.objects.bulk_update(cls.recordings, ['upload_timestamp'])
+
+    def page(self, query=None):
+        paginator = KeysetPagination()
+        request = Request(APIRequestFactory().get('/api/call-recordings/', query or {}))
+        page = paginator.paginate_queryset(call_recordings_for(self.onboarder, list_rows=True), request)
+        return page, paginator.next_cursor
+
+    def test_cursor_round_trip(self):
+        recording = self.recordings[2]
+        cursor = encode_cursor(recording.upload_timestamp, recording.id)
+        self.assertEqual(decode_cursor(cursor), (recording.upload_timestamp, recording.id))
+        for invalid in ['not-a-cursor', encode_cursor(recording.upload_timestamp, 'x')]:
+            with self.assertRaises(NotFound):
+                decode_cursor(invalid)
+
+    def test_pages_split_ties_on_upload_timestamp(self):
+        expected = sorted(self.recordings, key=lambda r: (r.upload_timestamp, r.id), reverse=True)
+        seen, cursor = [], None
+        while True:
+            page, cursor = self.page({'page_size': 2, **({'cursor': cursor} if cursor else {})})
+            seen.extend(recording.id for recording in page)
+            if cursor is None:
+                break
+        # Every recording exactly once, in order, though page boundaries fall between tied rows
+        self.assertEqual(seen, [recording.id for recording in expected])
+
+    def test_last_page(self):
+        page, cursor = self.page({'page_size': 7})
+        self.assertEqual(len(page), 7)
+        self.assertIsNone(cursor) # an exactly full page is still the last one
+        page, cursor = self.page({'page_size': 6})
+        self.assertEqual(len(page), 6)
+        page, cursor = self.page({'page_size': 6, 'cursor': cursor})
+        self.assertEqual([recording.id for recording in page], [self.recordings[6].id])
+        self.assertIsNone(cursor)
+
+
+class IndexTests(TestCase):
+    def constraints(self, model):
+        with connection.cursor() as cursor:
+            return connection.introspection.get_constraints(cursor, model._meta.db_table)
+
+    def test_indexes_exist(self):
+        for model, names in [
+            (CallRecording, ['rec_user_uploaded_idx', 'rec_uploaded_idx', 'rec_review_ready_idx', 'rec_user_updated_idx']),
+            (RecordingStageTransition, ['stage_rec_stage_ts_idx']),
+            (ExtractedClientInfo, ['info_speculative_idx']),
+        ]:
+            constraints = self.constraints(model)
+            for name in names:
+                self.assertIn(name, constraints)
+                self.assertTrue(constraints[name]['index'])
+        self.assertEqual(
+            self.constraints(CallRecording)['rec_user_uploaded_idx']['columns'],
+            ['uploaded_by_id', 'upload_timestamp', 'id'],
+        )
+
+    def list_page_query(self):
+        user = User.objects.create_user(username='onboarder')
+        recording = CallRecording.objects.create(uploaded_by=user, audio_file='call_recordings/call.mp3')
+        request = Request(APIRequestFactory().get('/api/call-recordings/', {
+            'cursor': encode_cursor(recording.upload_timestamp, recording.id),
+        }))
+        return KeysetPagination().page_queryset(call_recordings_for(user, list_rows=True), request)
+
+    def test_user_list_page_filters_and_orders_on_index_columns(self):
+        sql = str(self.list_page_query().query)
+        where, order_by = sql.split(' WHERE ')[1].split(' ORDER BY ')
+        table = CallRecording._meta.db_table
+        for column in ['uploaded_by_id', 'upload_timestamp', 'id']:
+            self.assertIn(f'"{table}"."{column}"', where)
+        self.assertTrue(order_by.startswith(f'"{table}"."upload_timestamp" DESC, "{table}"."id" DESC'))
+
+    @skipUnless(connection.vendor == 'postgresql', "EXPLAIN output is PostgreSQL's")
+    def test_user_list_page_uses_index(self):
+        queryset = self.list_page_query()
+        with connection.cursor() as cursor:
+            # A handful of test rows would otherwise be read with a sequential scan
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+        self.assertIn('rec_user_uploaded_idx', plan)
+
+
+class CompactTranscriptTests(SimpleTestCase):
+    DETAILS = [
+        'Priya Raman', 'Northwind Traders Ltd', '415-555-0199', 'four one five, five five five, zero one nine nine',
+        'priya.raman@northwind-traders.com', 'priya dot raman at northwind dot com',
+    ]
+    TRANSCRIPT = (
+        "Hello. How are you today? Um, I'm good, thanks. Uh, my name is Priya Raman, I I work at Northwind Traders Ltd. "
+        "You know, we need we need a new website. My number is 415-555-0199, that's four one five, five five five, "
+        "zero one nine nine. Email is priya.raman@northwind-traders.com, or priya dot raman at northwind dot com. "
+        "We need a new website. Okay. Thank you for calling. Bye."
+    )
+
+    def test_fillers_repeats_and_boilerplate_removed(self):
+        self.assertEqual(compact_transcript(self.TRANSCRIPT), (
+            "My name is Priya Raman, I work at Northwind Traders Ltd. We need a new website. "
+            "My number is 415-555-0199, that's four one five, five five five, zero one nine nine. "
+            "Email is priya.raman@northwind-traders.com, or priya dot raman at northwind dot com."
+        ))
+
+    def test_client_details_survive_unchanged(self):
+        for entity_context_sentences in [None, 0]:
+            compacted = compact_transcript(self.TRANSCRIPT, entity_context_sentences)
+            for detail in self.DETAILS:
+                self.assertIn(detail, compacted)
+
+    def test_repeated_digits_kept(self):
+        self.assertEqual(
+            compact_transcript("It's nine nine nine, 12 12 34. Call me at 555 555 0100."),
+            "It's nine nine nine, 12 12 34. Call me at 555 555 0100.",
+        )
+
+    def test_entity_context_keeps_only_detail_sentences(self):
+        compacted = compact_transcript(self.TRANSCRIPT, entity_context_sentences=0)
+        self.assertNotIn("website", compacted)
+        self.assertTrue(compacted.startswith("My name is Priya Raman"))
+
+
+class CompressedTextFieldTests(TestCase):
+    texts = {
+        'empty': "",
+        'large': " ".join(f"Line {index}: the client asked about onboarding and pricing." for index in range(20000)),
+        'non_ascii': "Zoë from Müller & Søn — 東京オフィス, 📞 +49 30 1234567.",
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.onboarder = User.objects.create_user(username='onboarder')
+        cls.token = Token.objects.create(user=cls.onboarder)
+
+    def create(self, transcript_text, **fields):
+        return CallRecording.objects.create(
+            uploaded_by=self.onboarder, audio_file='call_recordings/call.mp3', status='TRANSCRIBED',
+            transcript_text=transcript_text, **fields,
+        )
+
+    def stored_bytes(self, recording):
+        return bytes(
+            CallRecording.objects.annotate(data=Cast('transcript_text', BinaryField())).values_list('data', flat=True).get(id=recording.id)
+        )
+
+    def test_round_trip(self):
+        for name, text in self.texts.items():
+            with self.subTest(name=name):
+                recording = self.create(text)
+                self.assertEqual(CallRecording.objects.with_transcripts().get(id=recording.id).transcript_text, text)
+                self.assertEqual(CallRecording.objects.values_list('transcript_text', flat=True).get(id=recording.id), text)
+                self.assertEqual(self.stored_bytes(recording), compress_text(text))
+
+    def test_none_stored_as_null(self):
+        recording = self.create(None)
+        self.assertIsNone(CallRecording.objects.with_transcripts().get(id=recording.id).transcript_text)
+        self.assertTrue(CallRecording.objects.filter(id=recording.id, transcript_text__isnull=True).exists())
+
+    def test_large_text_stored_compressed(self):
+        recording = self.create(self.texts['large'])
+        self.assertLess(len(self.stored_bytes(recording)), len(self.texts['large'].encode()) / 10)
+
+    def test_transcript_endpoint_returns_text(self):
+        api = TestClient(headers={'Authorization': f"Token {self.token.key}"})
+        for name, text in self.texts.items():
+            with self.subTest(name=name):
+                recording = self.create(text, compacted_transcript_text=f"Compacted: {text[:50]}")
+                response = api.get(f"/api/call-recordings/{recording.id}/transcript/")
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['Content-Type'], 'text/plain; charset=utf-8')
+                self.assertEqual(b''.join(response.streaming_content).decode(), text)
+                compacted = api.get(f"/api/call-recordings/{recording.id}/transcript/", {'compacted': 'true'})
+                self.assertEqual(b''.join(compacted.streaming_content).decode(), f"Compacted: {text[:50]}")
+                self.assertEqual(api.get(f"/api/call-recordings/{recording.id}/").json()['transcript_text'], text)
+
+        self.assertEqual(api.get(f"/api/call-recordings/{self.create(None).id}/transcript/").status_code, 404)
+        others = CallRecording.objects.create(
+            uploaded_by=User.objects.create_user(username='other'), audio_file='call_recordings/other.mp3', transcript_text="Private.",
+        )
+        self.assertEqual(api.get(f"/api/call-recordings/{others.id}/transcript/").status_code, 404)
+
+
+@mock.patch.object(tasks, 'send_status_update')
+class RawLLMOutputTests(TestCase):
+    raw_llm_output = {
+        'tool_call': {'id': "call_0", 'function': {'name': "extract_client_info_tool", 'arguments': '{"client_name": "Zoë Müller"}'}},
+        'usage': {'prompt_tokens': 812, 'completion_tokens': 41},
+        'pre_extracted': {'email': "zoe@example.com"},
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.onboarder = User.objects.create_user(username='onboarder')
+        cls.token = Token.objects.create(user=cls.onboarder)
+        cls.recording = CallRecording.objects.create(
+            uploaded_by=cls.onboarder, audio_file='call_recordings/call.mp3', status='EXTRACTING_INFO', transcript_text="Hello.",
+        )
+
+    def save(self, raw_llm_output):
+        tasks._save_extracted_info(self.recording, self.onboarder.id, {'client_name': "Zoë Müller"}, raw_llm_output)
+        return ExtractedClientInfo.objects.get(call_recording=self.recording)
+
+    def get_raw(self, info, token=None):
+        headers = {'Authorization': f"Token {token.key}"} if token else {}
+        return TestClient(headers=headers).get(f"/api/extracted-info/{info.id}/raw/")
+
+    def test_written_compressed_beside_extraction(self, send_status_update):
+        info = self.save(self.raw_llm_output)
+        raw_output = RawLLMOutput.objects.get(extracted_info=info)
+        self.assertEqual(raw_output.value, self.raw_llm_output)
+        self.assertEqual(bytes(raw_output.data), compress_json(self.raw_llm_output)[0])
+        self.assertEqual(raw_output.raw_bytes, len(json.dumps(self.raw_llm_output, separators=(',', ':'), ensure_ascii=False).encode()))
+
+        self.save({'llm_skipped': True})
+        self.assertEqual(RawLLMOutput.objects.get().value, {'llm_skipped': True})
+
+    def test_served_as_stored(self, send_status_update):
+        info = self.save(self.raw_llm_output)
+        response = self.get_raw(info, self.token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.content, json.dumps(self.raw_llm_output, separators=(',', ':'), ensure_ascii=False).encode())
+
+        detail = TestClient(headers={'Authorization': f"Token {self.token.key}"}).get(f"/api/extracted-info/{info.id}/").json()
+        self.assertNotIn('raw_llm_output', detail)
+        self.assertEqual(detail['client_name'], "Zoë Müller")
+
+    def test_permissions(self, send_status_update):
+        info = self.save(self.raw_llm_output)
+        self.assertEqual(self.get_raw(info).status_code, 401)
+
+        admin = User.objects.create_superuser(username='admin')
+        self.assertEqual(self.get_raw(info, Token.objects.create(user=admin)).status_code, 200)
+
+        # Once reviewed, only the reviewer (and superusers) can still see the record
+        other = Token.objects.create(user=User.objects.create_user(username='other'))
+        self.assertEqual(self.get_raw(info, other).status_code, 200)
+        ExtractedClientInfo.objects.filter(id=info.id).update(is_approved=True, approved_by=self.onboarder)
+        CallRecording.objects.filter(id=self.recording.id).update(status='APPROVED')
+        self.assertEqual(self.get_raw(info, other).status_code, 404)
+        self.assertEqual(self.get_raw(info, self.token).status_code, 200)
+
+    def test_missing_raw_output_is_404(self, send_status_update):
+        info = self.save(self.raw_llm_output)
+        RawLLMOutput.objects.all().delete()
+        self.assertEqual(self.get_raw(info, self.token).status_code, 404)
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.onboarder = User.objects.create_user(username='onboarder')
+        cls.token = Token.objects.create(user=cls.onboarder)
+        cls.recordings = CallRecording.objects.bulk_create([
+            CallRecording(uploaded_by=cls.onboarder, audio_file=f"call_recordings/call_{index}.mp3", status='READY_FOR_REVIEW')
+            for index in range(3)
+        ])
+        cls.infos = ExtractedClientInfo.objects.bulk_create([
+            ExtractedClientInfo(call_recording=recording, client_name=f"Client {index}")
+            for index, recording in enumerate(cls.recordings)
+        ])
+
+    def setUp(self):
+        self.api = TestClient(headers={'Authorization': f"Token {self.token.key}"})
+
+    def test_unchanged_resource_is_304_without_body(self):
+        for path in (
+            '/api/call-recordings/', f"/api/call-recordings/{self.recordings[0].id}/",
+            '/api/extracted-info/', f"/api/extracted-info/{self.infos[0].id}/",
+        ):
+            with self.subTest(path=path):
+                response = self.api.get(path)
+                self.assertEqual(response.status_code, 200)
+                etag = response['ETag']
+                not_modified = self.api.get(path, headers={'If-None-Match': etag})
+                self.assertEqual(not_modified.status_code, 304)
+                self.assertEqual(not_modified.content, b'')
+                self.assertEqual(not_modified['ETag'], etag)
+                self.assertEqual(not_modified['Cache-Control'], response['Cache-Control'])
+
+    def test_changed_resource_is_200_again(self):
+        response = self.api.get('/api/call-recordings/')
+        detail = self.api.get(f"/api/call-recordings/{self.recordings[0].id}/")
+        CallRecording.objects.filter(id=self.recordings[0].id).update(
+            status='APPROVED', updated_at=timezone.now() + timedelta(seconds=1),
+        )
+        for path, etag in (
+            ('/api/call-recordings/', response['ETag']), (f"/api/call-recordings/{self.recordings[0].id}/", detail['ETag']),
+        ):
+            with self.subTest(path=path):
+                response = self.api.get(path, headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_since_returns_only_changed_rows(self):
+        paths = {'/api/call-recordings/': self.recordings, '/api/extracted-info/': self.infos}
+        cursors = {path: self.api.get(path)['X-Since-Cursor'] for path in paths}
+        later = timezone.now() + timedelta(seconds=1)
+        CallRecording.objects.filter(id=self.recordings[0].id).update(audio_seconds=90.0, updated_at=later)
+        ExtractedClientInfo.objects.filter(id=self.infos[0].id).update(client_name="Jane Foster", updated_at=later)
+
+        for path, rows in paths.items():
+            with self.subTest(path=path):
+                delta = self.api.get(path, {'since': cursors[path]}).json()
+                # The first poll also repeats the row(s) last changed at the cursor's timestamp
+                self.assertEqual([row['id'] for row in delta['results']], [rows[2].id, rows[0].id])
+                self.assertFalse(delta['has_more'])
+                # Polling again from the returned cursor finds nothing new
+                again = self.api.get(path, {'since': delta['next_since']}).json()
+                self.assertEqual((again['results'], again['next_since']), ([], delta['next_since']))
+
+    def test_invalid_cursor_is_404(self):
+        for path, query in (
+            ('/api/call-recordings/', {'since': 'not-a-cursor'}),
+            ('/api/extracted-info/', {'since': 'not-a-cursor'}),
+            ('/api/call-recordings/', {'cursor': 'not-a-cursor'}),
+        ):
+            with self.subTest(path=path, query=query):
+                response = self.api.get(path, query)
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json(), {'detail': "Invalid cursor."})
+
+    def test_cursor_of_deleted_row_still_pages(self):
+        # Cursors are positions, not row references: the rows after a deleted one still come back
+        first_page = self.api.get('/api/call-recordings/', {'page_size': 1}).json()
+        self.assertEqual([row['id'] for row in first_page['results']], [self.recordings[2].id])
+        CallRecording.objects.filter(id=self.recordings[2].id).delete()
+        rest = self.api.get('/api/call-recordings/', {'cursor': first_page['next_cursor']}).json()
+        self.assertEqual([row['id'] for row in rest['results']], [self.recordings[1].id, self.recordings[0].id])
+
+
+class AsyncReadViewParityTests(TestCase):
+    """
+    The async read views answer exactly like the DRF views they stand in for.
+    """
+    # path -> (async view, the DRF view it stands in for)
+    views = {
+        '/api/call-recordings/': (async_views.call_recording_list, async_views.call_recordings_sync),
+        '/api/extracted-info/': (async_views.extracted_info_list, async_views.extracted_info_sync),
+        '/api/user-status/': (async_views.user_status, get_user_status),
+    }
+    compared_headers = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'X-Since-Cursor', 'WWW-Authenticate')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.onboarder = User.objects.create_user(username='onboarder')
+        cls.token = Token.objects.create(user=cls.onboarder)
+        cls.recordings = CallRecording.objects.bulk_create([
+            CallRecording(uploaded_by=cls.onboarder, audio_file=f"call_recordings/call_{index}.mp3", status='READY_FOR_REVIEW')
+            for index in range(4)
+        ])
+        ExtractedClientInfo.objects.bulk_create([
+            ExtractedClientInfo(call_recording=recording, client_name=f"Clïent {index}", email=f"client{index}@example.com")
+            for index, recording in enumerate(cls.recordings)
+        ])
+
+    def request(self, path, data, headers):
+        # As AuthenticationMiddleware leaves it for a request without a session
+        request = RequestFactory().get(path, data, headers=headers)
+        request.user = AnonymousUser()
+        request.auser = sync_to_async(lambda: request.user)
+        return request
+
+    def assertSameResponse(self, path, data=None, **headers):
+        async_view, sync_view = self.views[path]
+        async_response = async_to_sync(async_view)(self.request(path, data, headers))
+        sync_response = sync_view(self.request(path, data, headers))
+        if hasattr(sync_response, 'render'): # not on 304s
+            sync_response.render()
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.content, sync_response.content)
+        for header in self.compared_headers:
+            self.assertEqual(async_response.get(header), sync_response.get(header), header)
+        # Same headers in Vary, the order doesn't matter
+        self.assertEqual(*({value.strip() for value in response.get('Vary', '').split(',')} for response in (async_response, sync_response)))
+        return json.loads(async_response.content) if async_response.content else None, async_response
+
+    def test_async_views_serve_the_list_urls(self):
+        for path, (async_view, _) in self.views.items():
+            with self.subTest(path=path):
+                self.assertEqual(resolve(path).func, async_view)
+
+    def test_same_payload(self):
+        auth = {'Authorization': f"Token {self.token.key}"}
+        for path in self.views:
+            with self.subTest(path=path):
+                body, response = self.assertSameResponse(path, **auth)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(body)
+                if path != '/api/user-status/':
+                    self.assertEqual(self.assertSameResponse(path, **auth, **{'If-None-Match': response['ETag']})[1].status_code, 304)
+                    self.assertEqual(self.assertSameResponse(path, {'since': response['X-Since-Cursor']}, **auth)[1].status_code, 200)
+                    self.assertEqual(self.assertSameResponse(path, {'since': "not a cursor"}, **auth)[1].status_code, 404)
+
+        first_page, _ = self.assertSameResponse('/api/call-recordings/', {'page_size': 3}, **auth)
+        self.assertEqual(len(first_page['results']), 3)
+        cursor = parse_qs(urlsplit(first_page['next']).query)['cursor'][0]
+        second_page, _ = self.assertSameResponse('/api/call-recordings/', {'page_size': 3, 'cursor': cursor}, **auth)
+        self.assertEqual([row['id'] for row in second_page['results']], [self.recordings[0].id])
+
+    def test_same_401(self):
+        inactive = Token.objects.create(user=User.objects.create_user(username='inactive', is_active=False))
+        for headers in (
+            {}, {'Authorization': "Token not-a-token"}, {'Authorization': "Token"}, {'Authorization': "Token a b"},
+            {'Authorization': f"Token {inactive.key}"},
+        ):
+            for path in self.views:
+                with self.subTest(path=path, headers=headers):
+                    _, response = self.assertSameResponse(path, **headers)
+                    self.assertEqual(response.status_code, 401)
+                    self.assertEqual(response['WWW-Authenticate'], 'Token')
+
+
+class AsyncReadViewConnectionTests(SimpleTestCase):
+    def test_requests_in_flight_bounded(self):
+        in_flight, peak = 0, 0
+
+        async def authenticate(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            raise NotAuthenticated()
+
+        async def burst():
+            return await asyncio.gather(*(async_views.user_status(RequestFactory().get('/api/user-status/')) for _ in range(6)))
+
+        with mock.patch.object(async_views, '_db_slots', asyncio.Semaphore(2)), \
+                mock.patch.object(async_views, 'authenticate', authenticate):
+            responses = async_to_sync(burst)()
+        self.assertEqual([response.status_code for response in responses], [401] * 6)
+        self.assertEqual(peak, 2)
+
+
+class BulkReviewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.onboarder = User.objects.create_user(username='onboarder')
+        cls.token = Token.objects.create(user=cls.onboarder)
+        cls.recordings = CallRecording.objects.bulk_create([
+            CallRecording(uploaded_by=cls.onboarder, audio_file=f"call_recordings/call_{index}.mp3", status='READY_FOR_REVIEW')
+            for index in range(3)
+        ])
+        cls.infos = ExtractedClientInfo.objects.bulk_create([
+            ExtractedClientInfo(call_recording=recording, client_name=f"Client {index}")
+            for index, recording in enumerate(cls.recordings)
+        ])
+
+    def setUp(self):
+        self.api = TestClient(headers={'Authorization': f"Token {self.token.key}"})
+
+    def post(self, path, data):
+        body = data if isinstance(data, str) else json.dumps(data)
+        return self.api.post(f"/api/extracted-info/{path}/", body, content_type='application/json')
+
+    def assertNothingReviewed(self):
+        self.assertFalse(ExtractedClientInfo.objects.filter(approved_by__isnull=False).exists())
+        self.assertEqual(set(CallRecording.objects.values_list('status', flat=True)), {'READY_FOR_REVIEW'})
+        self.assertFalse(Client.objects.exists())
+
+    def test_bulk_approve(self):
+        response = self.post('bulk-approve', {'items': [
+            {'id': self.infos[0].id, 'email': 'client0@example.com'}, {'id': self.infos[1].id},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['approved'], [self.infos[0].id, self.infos[1].id])
+        self.assertEqual(
+            sorted(Client.objects.values_list('name', 'email')), [('Client 0', 'client0@example.com'), ('Client 1', None)],
+        )
+        self.assertEqual(
+            dict(CallRecording.objects.values_list('id', 'status')),
+            {self.recordings[0].id: 'APPROVED', self.recordings[1].id: 'APPROVED', self.recordings[2].id: 'READY_FOR_REVIEW'},
+        )
+
+    def test_bulk_reject(self):
+        response = self.post('bulk-reject', {'items': [{'id': self.infos[2].id}], 'review_notes': "Wrong number."})
+        self.assertEqual(response.status_code, 200)
+        info = ExtractedClientInfo.objects.select_related('call_recording').get(id=self.infos[2].id)
+        self.assertEqual((info.is_approved, info.review_notes, info.call_recording.status), (False, "Wrong number.", 'REJECTED'))
+        self.assertFalse(Client.objects.exists())
+
+    def test_unknown_id_is_404(self):
+        other = User.objects.create_user(username='other')
+        recording = CallRecording.objects.create(uploaded_by=other, audio_file='call_recordings/other.mp3', status='APPROVED')
+        # Reviewed by someone else, so no longer in this onboarder's queue
+        hidden = ExtractedClientInfo.objects.create(call_recording=recording, is_approved=True, approved_by=other)
+        for path in ('bulk-approve', 'bulk-reject'):
+            with self.subTest(path=path):
+                response = self.post(path, {'items': [{'id': self.infos[0].id}, {'id': hidden.id}, {'id': 999999}]})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json()['ids'], [hidden.id, 999999])
+        self.assertFalse(ExtractedClientInfo.objects.filter(approved_by=self.onboarder).exists())
+        self.assertFalse(Client.objects.exists())
+
+    def test_already_reviewed_is_409(self):
+        self.assertEqual(self.post('bulk-reject', {'items': [{'id': self.infos[0].id}]}).status_code, 200)
+        for path in ('bulk-approve', 'bulk-reject'):
+            with self.subTest(path=path):
+                response = self.post(path, {'items': [{'id': self.infos[0].id}, {'id': self.infos[1].id}]})
+                self.assertEqual(response.status_code, 409)
+                self.assertEqual(response.json()['ids'], [self.infos[0].id])
+        self.assertFalse(ExtractedClientInfo.objects.filter(id=self.infos[1].id, approved_by__isnull=False).exists())
+
+    def test_malformed_body_is_400(self):
+        for body in (
+            'not json', {}, {'items': []}, {'items': {'id': self.infos[0].id}}, {'items': [{'id': str(self.infos[0].id)}]},
+            {'items': [{'id': self.infos[0].id}, {'id': self.infos[0].id}]},
+        ):
+            with self.subTest(body=body):
+                self.assertEqual(self.post('bulk-approve', body).status_code, 400)
+        self.assertNothingReviewed()
+
+    def test_invalid_item_rolls_back_batch(self):
+        response = self.post('bulk-approve', {'items': [
+            {'id': self.infos[0].id, 'email': 'client0@example.com'},
+            {'id': self.infos[1].id, 'email': 'not an email'},
+        ]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()['errors']), [str(self.infos[1].id)])
+        self.assertNothingReviewed()
+        self.assertFalse(ExtractedClientInfo.objects.filter(email='client0@example.com').exists())
+
+
+class ResumableUploadTests(TestCase):
+    audio = b"ID3" + bytes(range(256)) * 40
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.onboarder = User.objects.create_user(username='onboarder')
+        cls.token = Token.objects.create(user=cls.onboarder)
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = self.settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.api = TestClient(headers={'Authorization': f"Token {self.token.key}"})
+
+    def start(self, sha256=None):
+        response = self.api.post('/api/uploads/', {
+            'filename': "call.mp3", 'total_size': len(self.audio), 'sha256': sha256 or hashlib.sha256(self.audio).hexdigest(),
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return UploadSession.objects.get(id=response.json()['id'])
+
+    def put_chunk(self, session, offset, data):
+        return self.api.put(
+            f"/api/uploads/{session.id}/chunk/", data, content_type='application/octet-stream', headers={'Upload-Offset': str(offset)},
+        )
+
+    def partial_bytes(self, session):
+        with open(os.path.join(settings.MEDIA_ROOT, session.partial_file), 'rb') as partial:
+            return partial.read()
+
+    @mock.patch('agents.views.publish_recording_status')
+    @mock.patch('agents.views.start_recording_pipeline')
+    def test_chunks_finalized_into_recording(self, start_recording_pipeline, publish_recording_status):
+        session = self.start()
+        half = len(self.audio) // 2
+        self.assertEqual(self.put_chunk(session, 0, self.audio[:half]).json(), {'received_bytes': half})
+        self.assertEqual(self.put_chunk(session, half, self.audio[half:]).json(), {'received_bytes': len(self.audio)})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.post(f"/api/uploads/{session.id}/finalize/")
+        self.assertEqual(response.status_code, 201)
+        recording = CallRecording.objects.get(id=response.json()['id'])
+        self.assertEqual((recording.uploaded_by, recording.status), (self.onboarder, 'UPLOADED'))
+        self.assertEqual(recording.audio_sha256, hashlib.sha256(self.audio).hexdigest())
+        with recording.audio_file.open('rb') as audio_file:
+            self.assertEqual(audio_file.read(), self.audio)
+        self.assertFalse(os.path.exists(os.path.join(settings.MEDIA_ROOT, session.partial_file)))
+        session.refresh_from_db()
+        self.assertEqual(session.call_recording, recording)
+        start_recording_pipeline.assert_called_once_with(recording.id)
+
+        self.assertEqual(self.api.post(f"/api/uploads/{session.id}/finalize/").status_code, 400)
+        self.assertEqual(CallRecording.objects.count(), 1)
+
+    def test_offset_mismatch_rejected(self):
+        session = self.start()
+        self.put_chunk(session, 0, self.audio[:100])
+        for offset in (0, 50, 200):
+            with self.subTest(offset=offset):
+                response = self.put_chunk(session, offset, self.audio[offset:offset + 100])
+                self.assertEqual(response.status_code, 409)
+                self.assertEqual(response.json()['received_bytes'], 100)
+        self.assertEqual(self.put_chunk(session, 100, b"").status_code, 200)
+        self.assertEqual(self.api.put(f"/api/uploads/{session.id}/chunk/", b"x", content_type='application/octet-stream').status_code, 400)
+        session.refresh_from_db()
+        self.assertEqual(session.received_bytes, 100)
+        self.assertEqual(self.partial_bytes(session), self.audio[:100])
+
+    def test_oversize_chunk_rejected(self):
+        session = self.start()
+        self.put_chunk(session, 0, self.audio[:100])
+        response = self.put_chunk(session, 100, self.audio[100:] + b"extra")
+        self.assertEqual(response.status_code, 400)
+        session.refresh_from_db()
+        self.assertEqual(session.received_bytes, 100)
+        self.assertEqual(self.partial_bytes(session), self.audio[:100])
+
+    def test_checksum_mismatch_resets_upload(self):
+        session = self.start(sha256=hashlib.sha256(b"other audio").hexdigest())
+        self.put_chunk(session, 0, self.audio)
+        response = self.api.post(f"/api/uploads/{session.id}/finalize/")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['received_bytes'], 0)
+        session.refresh_from_db()
+        self.assertEqual((session.received_bytes, session.call_recording), (0, None))
+        self.assertFalse(os.path.exists(os.path.join(settings.MEDIA_ROOT, session.partial_file)))
+        self.assertFalse(CallRecording.objects.exists())
+        self.assertEqual(self.put_chunk(session, 0, self.audio).status_code, 200)
+
+    def test_incomplete_upload_not_finalized(self):
+        session = self.start()
+        self.put_chunk(session, 0, self.audio[:-1])
+        response = self.api.post(f"/api/uploads/{session.id}/finalize/")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['received_bytes'], len(self.audio) - 1)
+        self.assertFalse(CallRecording.objects.exists())
+
+
+class StageMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        onboarder = User.objects.create_user(username='onboarder')
+        cls.recordings = CallRecording.objects.bulk_create([
+            CallRecording(uploaded_by=onboarder, audio_file=f"call_recordings/call_{index}.mp3", status='READY_FOR_REVIEW')
+            for index in range(3)
+        ])
+
+    def review_wait(self, statistic):
+        return REGISTRY.get_sample_value(f"pipeline_stage_seconds_{statistic}", {'stage': 'review', 'phase': 'queue_wait'}) or 0
+
+    def test_record_stages_observes_time_since_previous_stage(self):
+        now = timezone.now()
+        first, second, never_ready = (recording.id for recording in self.recordings)
+        RecordingStageTransition.objects.bulk_create([
+            RecordingStageTransition(call_recording_id=first, stage='ready_for_review', timestamp=now - timedelta(minutes=10)),
+            # A recording reprocessed after review waits from its latest ready_for_review
+            RecordingStageTransition(call_recording_id=first, stage='ready_for_review', timestamp=now - timedelta(seconds=60)),
+            RecordingStageTransition(call_recording_id=second, stage='ready_for_review', timestamp=now - timedelta(seconds=120)),
+            RecordingStageTransition(call_recording_id=never_ready, stage='extract_finished', timestamp=now - timedelta(seconds=30)),
+        ])
+        count, total = self.review_wait('count'), self.review_wait('sum')
+
+        with self.assertNumQueries(2):
+            record_stages([first, second, never_ready], 'approved')
+
+        self.assertEqual(self.review_wait('count') - count, 2)
+        self.assertAlmostEqual(self.review_wait('sum') - total, 180, delta=5)
+        approved = RecordingStageTransition.objects.filter(stage='approved')
+        self.assertEqual(sorted(approved.values_list('call_recording_id', flat=True)), [first, second, never_ready])
+        self.assertEqual(len(set(approved.values_list('timestamp', flat=True))), 1)
+
+    def test_untimed_stage_only_recorded(self):
+        count = self.review_wait('count')
+        with self.assertNumQueries(1):
+            record_stages([self.recordings[0].id], 'queued')
+        self.assertEqual(self.review_wait('count'), count)
+        self.assertTrue(RecordingStageTransition.objects.filter(call_recording=self.recordings[0], stage='queued').exists())
+
+
+class PrometheusMetricsTests(SimpleTestCase):
+    @override_settings(DEBUG=False, METRICS_BEARER_TOKEN='')
+    def test_refused_without_token_in_production(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+    @override_settings(DEBUG=True, METRICS_BEARER_TOKEN='')
+    def test_open_without_token_in_debug(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'pipeline_stage_seconds', response.content)
+
+    @override_settings(DEBUG=False, METRICS_BEARER_TOKEN='scrape-secret')
+    def test_bearer_token_required(self):
+        for headers, expected in (
+            ({}, 403), ({'Authorization': "Bearer wrong"}, 403), ({'Authorization': "scrape-secret"}, 403),
+            ({'Authorization': "Bearer scrape-secret"}, 200),
+        ):
+            with self.subTest(headers=headers):
+                self.assertEqual(self.client.get('/metrics', headers=headers).status_code, expected)
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Query counts of the API endpoints and admin pages with ROWS of everything seeded. A query
+    per row (N+1) makes the count grow with the rows, so any such regression fails here.
+    """
+    ROWS = 25
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.onboarder = User.objects.create_user(username='onboarder')
+        cls.token = Token.objects.create(user=cls.onboarder)
+        cls.superuser = User.objects.create_superuser(username='admin')
+        cls.recordings = CallRecording.objects.bulk_create([
+            CallRecording(
+                uploaded_by=cls.onboarder, audio_file=f"call_recordings/call_{index}.mp3",
+                status='READY_FOR_REVIEW', transcript_text="Agent: Thanks for calling. " * 50,
+            )
+            for index in range(cls.ROWS)
+        ])
+        cls.infos = ExtractedClientInfo.objects.bulk_create([
+            ExtractedClientInfo(
+                call_recording=recording, client_name=f"Client {recording.id}",
+                email=f"client{recording.id}@example.com", approved_by=cls.superuser,
+            )
+            for recording in cls.recordings
+        ])
+        RawLLMOutput.objects.bulk_create([
+            RawLLMOutput(extracted_info=info, data=data, raw_bytes=raw_bytes)
+            for info in cls.infos
+            for data, raw_bytes in [compress_json({'client_name': info.client_name})]
+        ])
+        # Not linked to the extractions, which the approvals below create their own Clients for
+        cls.clients = Client.objects.bulk_create([Client(name=f"Client {info.id}") for info in cls.infos])
+        cls.transitions = RecordingStageTransition.objects.bulk_create([
+            RecordingStageTransition(call_recording=recording, stage='ready_for_review') for recording in cls.recordings
+        ])
+        cls.upload = UploadSession.objects.create(
+            user=cls.onboarder, filename='call.mp3', total_size=1, sha256='0' * 64, partial_file='uploads/call.part',
+        )
+
+    def setUp(self):
+        self.api = TestClient(headers={'Authorization': f"Token {self.token.key}"})
+        self.admin = TestClient()
+        self.admin.force_login(self.superuser)
+
+    def assertQueries(self, budget, method, path, data=None):
+        # Change forms look up content types; start every request with the cache cold
+        ContentType.objects.clear_cache()
+        with self.subTest(path=path):
+            with self.assertNumQueries(budget):
+                if data is None:
+                    response = method(path)
+                else:
+                    response = method(path, data, content_type='application/json')
+            self.assertLess(response.status_code, 400)
+
+    def test_api_reads(self):
+        recording, info = self.recordings[0], self.infos[0]
+        since = encode_cursor(recording.updated_at, 0)
+        for budget, path in [
+            # Token auth is 1 query (the token and its user)
+            (1, '/api/user-status/'),
+            (3, '/api/call-recordings/'), # + ETag aggregate, page
+            (2, f"/api/call-recordings/?since={since}"), # + changed rows
+            (2, f"/api/call-recordings/{recording.id}/"),
+            (2, f"/api/call-recordings/{recording.id}/transcript/"),
+            (3, '/api/extracted-info/'), # + ETag aggregate, rows
+            (2, f"/api/extracted-info/?since={since}"),
+            (2, f"/api/extracted-info/{info.id}/"),
+            (3, f"/api/extracted-info/{info.id}/raw/"), # + record, raw output
+            (2, '/api/clients/'),
+            (2, f"/api/uploads/{self.upload.id}/"),
+        ]:
+            self.assertQueries(budget, self.api.get, path)
+
+    def test_review_actions(self):
+        info = self.infos[0]
+        every = {'items': [{'id': i.id} for i in self.infos]}
+        for budget, path, data in [
+            (7, f"/api/extracted-info/{info.id}/approve/", {}), # + row, updates, Client, stage transition and its timing
+            (6, f"/api/extracted-info/{info.id}/reject/", {}),
+            (9, '/api/extracted-info/bulk-approve/', every), # every row at once
+            (8, '/api/extracted-info/bulk-reject/', every),
+        ]:
+            # Each action sees the seeded rows as they are
+            with transaction.atomic():
+                self.assertQueries(budget, self.api.post, path, data)
+                transaction.set_rollback(True)
+
+    def test_admin_pages(self):
+        # Session auth is 2 queries (session and user)
+        for budget, path in [
+            (5, '/admin/agents/callrecording/'),
+            (6, f"/admin/agents/callrecording/{self.recordings[0].id}/change/"),
+            (5, '/admin/agents/extractedclientinfo/'),
+            (8, f"/admin/agents/extractedclientinfo/{self.infos[0].id}/change/"), # + raw output
+            (5, '/admin/agents/client/'),
+            (4, f"/admin/agents/client/{self.clients[0].id}/change/"),
+            (5, '/admin/agents/recordingstagetransition/'),
+            (6, f"/admin/agents/recordingstagetransition/{self.transitions[0].id}/change/"),
+        ]:
+            self.assertQueries(budget, self.admin.get, path)
+
+
+class BenchmarkCommandTests(SimpleTestCase):
+    def test_bench_transcription_rejects_invalid_runs(self):
+        for options in ({'minutes': [0]}, {'concurrency': 0}, {'chunk_seconds': 60, 'overlap_seconds': 60}):
+            with self.subTest(options=options), self.assertRaises(CommandError):
+                call_command('bench_transcription', stdout=io.StringIO(), **options)
+
+    def test_bench_transcription_fails_when_audio_cannot_be_made(self):
+        with mock.patch.object(bench_transcription.subprocess, 'run', side_effect=subprocess.CalledProcessError(1, 'ffmpeg')), \
+                self.assertRaisesMessage(CommandError, "Benchmark of a 5 minute recording failed"):
+            call_command('bench_transcription', minutes=[5], stdout=io.StringIO())
+
+    def test_bench_transcription_checks_segments(self):
+        command = bench_transcription.Command()
+        command.check_transcript(5, 'chunked', "segment 1 of 605 seconds. segment 2 of 5 seconds.", 2)
+        with self.assertRaisesMessage(CommandError, "has 1 segments, expected 2"):
+            command.check_transcript(5, 'chunked', "segment 1 of 605 seconds.", 2)
+        with self.assertRaises(CommandError):
+            command.check_transcript(5, 'single', None, 1)
+
+    def test_bench_groq_client_rejects_invalid_runs(self):
+        for options in ({'tasks': 0}, {'calls_per_task': 0}):
+            with self.subTest(options=options), self.assertRaises(CommandError):
+                call_command('bench_groq_client', stdout=io.StringIO(), **options)
+
+    @override_settings(GROQ_SDK_MAX_RETRIES=0)
+    def test_bench_groq_client_fails_on_errored_requests(self):
+        failing_stub = functools.partial(bench_groq_client.start_stub_server, behaviour=StubBehaviour(rate_5xx=1.0))
+        with mock.patch.object(bench_groq_client, 'start_stub_server', failing_stub), \
+                mock.patch.object(bench_groq_client, 'Groq', functools.partial(Groq, max_retries=0)), \
+                self.assertRaisesMessage(CommandError, "Groq request failed during the benchmark"):
+            call_command('bench_groq_client', tasks=1, stdout=io.StringIO())
+
+
+class BenchRecordingListTests(TestCase):
+    def bench(self, **options):
+        stdout = io.StringIO()
+        call_command('bench_recording_list', stdout=stdout, **{'rows': 3, 'repeat': 1, **options})
+        return stdout.getvalue()
+
+    def test_reports_both_modes(self):
+        output = self.bench()
+        self.assertIn("unpaginated full rows", output)
+        self.assertIn("keyset page, slim rows", output)
+        self.assertFalse(CallRecording.objects.exists())
+
+    def test_rejects_invalid_runs(self):
+        for options in ({'rows': 0}, {'repeat': 0}):
+            with self.subTest(options=options), self.assertRaises(CommandError):
+                self.bench(**options)
+
+    def test_fails_on_error_response(self):
+        with mock.patch.object(CallRecordingViewSet, 'list', lambda viewset, request: Response(status=503)), \
+                self.assertRaisesMessage(CommandError, "Recording list answered 503"):
+            self.bench()
+
+    def test_fails_when_nothing_listed(self):
+        with mock.patch.object(CallRecordingViewSet, 'get_queryset', lambda viewset: CallRecording.objects.none()), \
+                self.assertRaisesMessage(CommandError, "keyset page, slim rows returned 0 recordings, expected 3."):
+            self.bench()
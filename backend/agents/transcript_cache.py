@@ -0,0 +1,74 @@
+# agents/transcript_cache.py
+import logging
+from django.conf import settings
+from django.db.models import F
+from .models import TranscriptCache
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+HITS_KEY = 'transcript_cache:hits'
+MISSES_KEY = 'transcript_cache:misses'
+
+
+def _count(key):
+    try:
+        get_redis().incr(key)
+    except Exception as e: # counters are best effort, never fail the task over them
+        logger.warning(f"Could not update transcript cache counter {key}: {e}")
+
+
+def get_cached_transcript(content_sha256, stt_model):
+    """
+    Returns the cached transcript for this audio hash and STT model, or None.
+    """
+    if not content_sha256:
+        return None
+    entry = TranscriptCache.objects.filter(content_sha256=content_sha256, stt_model=stt_model).first()
+    if entry is None:
+        _count(MISSES_KEY)
+        return None
+
+    # last_used_at is auto_now, so this also refreshes the entry's LRU position
+    entry.hits = F('hits') + 1
+    entry.save(update_fields=['hits', 'last_used_at'])
+    _count(HITS_KEY)
+    return entry.transcript_text
+
+
+def store_transcript(content_sha256, stt_model, transcript_text):
+    """
+    Caches a transcript and evicts the least recently used entries beyond TRANSCRIPT_CACHE_MAX_ENTRIES.
+    """
+    if not content_sha256:
+        return
+    TranscriptCache.objects.update_or_create(
+        content_sha256=content_sha256,
+        stt_model=stt_model,
+        defaults={'transcript_text': transcript_text},
+    )
+
+    overflow = TranscriptCache.objects.count() - settings.TRANSCRIPT_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        stale_ids = list(TranscriptCache.objects.order_by('last_used_at').values_list('id', flat=True)[:overflow])
+        TranscriptCache.objects.filter(id__in=stale_ids).delete()
+        logger.info(f"Evicted {len(stale_ids)} transcript cache entries.")
+
+
+def cache_stats():
+    """
+    Hit/miss counters and current size of the transcript cache.
+    """
+    try:
+        hits, misses = (int(v or 0) for v in get_redis().mget(HITS_KEY, MISSES_KEY))
+    except Exception as e:
+        logger.warning(f"Could not read transcript cache counters: {e}")
+        hits = misses = 0
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / lookups if lookups else 0.0,
+        'entries': TranscriptCache.objects.count(),
+        'max_entries': settings.TRANSCRIPT_CACHE_MAX_ENTRIES,
+    }
@@ -0,0 +1,216 @@
+# agents/transcription.py
+import json
+import logging
+import os
+import random
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from .rate_limit import AUDIO, TRANSIENT_GROQ_ERRORS, budget_seconds, groq_rate_limited
+
+logger = logging.getLogger(__name__)
+
+STT_MODEL = "whisper-large-v3" # Groq's STT model
+MIN_BILLED_AUDIO_SECONDS = 10 # Groq bills every transcription request as at least 10 seconds
+
+
+def get_audio_duration(audio_file_path):
+    """
+    Returns the duration of an audio file in seconds (uses ffprobe).
+    """
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'json', audio_file_path],
+        capture_output=True, check=True, text=True,
+    )
+    return float(json.loads(result.stdout)['format']['duration'])
+
+
+def _probe_duration(audio_file_path):
+    # None if there is no ffprobe installed or it can't read the file; callers then send the
+    # file in one request, which the rate limiter bills at MIN_BILLED_AUDIO_SECONDS
+    try:
+        return get_audio_duration(audio_file_path)
+    except (OSError, subprocess.CalledProcessError, ValueError, KeyError) as e:
+        logger.warning(f"Could not probe the duration of {audio_file_path}, transcribing it in one request: {e}")
+        return None
+
+
+def plan_chunks(duration, chunk_seconds, overlap_seconds):
+    """
+    Splits [0, duration) into (start, length) windows of chunk_seconds that overlap by overlap_seconds.
+    """
+    if overlap_seconds >= chunk_seconds:
+        raise ValueError("Chunk overlap must be shorter than the chunk length.")
+
+    chunks = []
+    start = 0.0
+    step = chunk_seconds - overlap_seconds
+    while start < duration:
+        length = min(chunk_seconds, duration - start)
+        chunks.append((start, length))
+        if start + length >= duration:
+            break
+        start += step
+    return chunks
+
+
+def split_audio(audio_file_path, chunks, output_dir):
+    """
+    Cuts the audio file into the given (start, length) windows with ffmpeg, without re-encoding.
+    Returns the chunk file paths in time order.
+    """
+    extension = os.path.splitext(audio_file_path)[1] or '.mp3'
+    paths = []
+    for index, (start, length) in enumerate(chunks):
+        chunk_path = os.path.join(output_dir, f"chunk_{index:04d}{extension}")
+        subprocess.run(
+            ['ffmpeg', '-v', 'error', '-y', '-ss', f"{start:.3f}", '-t', f"{length:.3f}",
+             '-i', audio_file_path, '-vn', '-c', 'copy', chunk_path],
+            check=True,
+        )
+        paths.append(chunk_path)
+    return paths
+
+
+def _normalise_word(word):
+    return re.sub(r"[^\w@.']", '', word.lower()).strip(".")
+
+
+def stitch_transcripts(texts, max_overlap_words=60, min_overlap_words=2):
+    """
+    Joins chunk transcripts in order, dropping the words that the overlapping audio produced twice.
+    The longest run of words that ends one chunk and starts the next is treated as the duplicate.
+    """
+    stitched = []
+    for text in texts:
+        words = (text or '').split()
+        if not words:
+            continue
+        if stitched:
+            tail = [_normalise_word(w) for w in stitched[-max_overlap_words:]]
+            head = [_normalise_word(w) for w in words[:max_overlap_words]]
+            for size in range(min(len(tail), len(head)), min_overlap_words - 1, -1):
+                if tail[-size:] == head[:size]:
+                    words = words[size:]
+                    break
+        stitched.extend(words)
+    return ' '.join(stitched)
+
+
+def transcribe_file(client, audio_file_path, model=STT_MODEL, audio_seconds=None, max_wait=None):
+    """
+    Sends a single audio file to the STT endpoint and returns the transcript text.
+    audio_seconds is what the call costs against the shared audio-seconds budget.
+    """
+    cost = max(audio_seconds or 0, MIN_BILLED_AUDIO_SECONDS)
+    with groq_rate_limited(AUDIO, cost, max_wait=max_wait), open(audio_file_path, "rb") as file:
+        # Passing the open file (not its bytes) lets httpx stream the multipart body from disk
+        transcript = client.audio.transcriptions.create(
+            file=(os.path.basename(audio_file_path), file),
+            model=model,
+        )
+    return transcript.text
+
+
+def _transcribe_chunk(client, audio_file_path, model, audio_seconds, max_wait):
+    """
+    Transcribes one chunk, retrying transient Groq errors itself (exponential backoff, full
+    jitter) so one throttled chunk doesn't send the whole recording back through the task
+    retry, which would pay again for the chunks already transcribed.
+    """
+    for attempt in range(settings.GROQ_RETRY_MAX + 1):
+        try:
+            return transcribe_file(client, audio_file_path, model, audio_seconds=audio_seconds, max_wait=max_wait)
+        except TRANSIENT_GROQ_ERRORS as e:
+            if attempt == settings.GROQ_RETRY_MAX:
+                raise
+            delay = random.uniform(0, min(settings.GROQ_RETRY_BACKOFF_MAX, settings.GROQ_RETRY_BACKOFF * 2 ** attempt))
+            logger.warning(f"Transient Groq error transcribing {os.path.basename(audio_file_path)}, retrying in {delay:.1f}s: {e}")
+            time.sleep(delay)
+
+
+def _transcribe_chunks(executor, client, chunk_paths, chunks, model):
+    # A recording's chunks queue behind each other for the shared audio budget, so each may wait
+    # as long as the whole recording takes to pay for on top of the usual wait
+    cost = sum(max(length, MIN_BILLED_AUDIO_SECONDS) for _, length in chunks)
+    max_wait = settings.GROQ_RATE_LIMIT_MAX_WAIT + budget_seconds(AUDIO, cost)
+    # map() yields results in submission order, so chunks stay time ordered
+    return executor.map(
+        lambda path, chunk: _transcribe_chunk(client, path, model, chunk[1], max_wait), chunk_paths, chunks,
+    )
+
+
+def transcribe_chunked(client, audio_file_path, chunk_seconds, overlap_seconds, max_concurrency,
+                       model=STT_MODEL, duration=None):
+    """
+    Splits a long recording into overlapping chunks, transcribes them concurrently on a bounded
+    thread pool and stitches the results back together in time order.
+    """
+    if duration is None:
+        duration = get_audio_duration(audio_file_path)
+    chunks = plan_chunks(duration, chunk_seconds, overlap_seconds)
+
+    work_dir = tempfile.mkdtemp(prefix='transcribe_')
+    try:
+        chunk_paths = split_audio(audio_file_path, chunks, work_dir)
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            texts = list(_transcribe_chunks(executor, client, chunk_paths, chunks, model))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return stitch_transcripts(texts)
+
+
+def transcribe_incrementally(client, audio_file_path, segment_seconds, overlap_seconds, max_concurrency,
+                             model=STT_MODEL, duration=None):
+    """
+    Transcribes a recording in time-ordered segments (up to max_concurrency in flight) and yields
+    (transcript so far, text appended, seconds transcribed, total seconds) as each segment lands
+    in order, so callers can publish partial transcripts long before the end of the recording.
+    If the duration is unknown and can't be probed, the whole file is one segment and both
+    second counts are None.
+    """
+    if duration is None:
+        duration = _probe_duration(audio_file_path)
+        if duration is None:
+            transcript = transcribe_file(client, audio_file_path, model)
+            yield transcript, transcript, None, None
+            return
+    segments = plan_chunks(duration, segment_seconds, overlap_seconds)
+
+    work_dir = tempfile.mkdtemp(prefix='transcribe_')
+    try:
+        segment_paths = split_audio(audio_file_path, segments, work_dir)
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            texts = _transcribe_chunks(executor, client, segment_paths, segments, model)
+            transcript = ''
+            for (start, length), text in zip(segments, texts):
+                stitched = stitch_transcripts([transcript, text])
+                appended = stitched[len(transcript):].strip()
+                transcript = stitched
+                yield transcript, appended, min(duration, start + length), duration
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def transcribe_recording(client, audio_file_path):
+    """
+    Transcribes a recording, switching to chunked mode for recordings longer than one chunk.
+    """
+    duration = None
+    if settings.TRANSCRIPTION_CHUNKING_ENABLED or settings.GROQ_RATE_LIMIT_ENABLED:
+        duration = _probe_duration(audio_file_path)
+    if settings.TRANSCRIPTION_CHUNKING_ENABLED and duration is not None and duration > settings.TRANSCRIPTION_CHUNK_SECONDS:
+        return transcribe_chunked(
+            client,
+            audio_file_path,
+            chunk_seconds=settings.TRANSCRIPTION_CHUNK_SECONDS,
+            overlap_seconds=settings.TRANSCRIPTION_CHUNK_OVERLAP_SECONDS,
+            max_concurrency=settings.TRANSCRIPTION_MAX_CONCURRENCY,
+            duration=duration,
+        )
+    return transcribe_file(client, audio_file_path, audio_seconds=duration)
@@ -0,0 +1,37 @@
+# agents/uploadhandlers.py
+import hashlib
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+class Sha256UploadHandler(FileUploadHandler):
+    """
+    Hashes uploaded files while they stream in, then hands every chunk on to the next handler
+    (memory or temporary file) unchanged. Digests are stored on request.upload_sha256 by field name.
+    """
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return raw_data # pass the chunk along so the next handler writes it
+
+    def file_complete(self, file_size):
+        if not hasattr(self.request, 'upload_sha256'):
+            self.request.upload_sha256 = {}
+        self.request.upload_sha256[self.field_name] = self.hasher.hexdigest()
+        return None # let the next handler build the uploaded file object
+
+
+def compute_sha256(file, chunk_size=1024 * 1024):
+    """
+    Hashes a file-like object in chunks (fallback when the upload handler did not run).
+    """
+    hasher = hashlib.sha256()
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    for chunk in iter(lambda: file.read(chunk_size), b''):
+        hasher.update(chunk)
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    return hasher.hexdigest()
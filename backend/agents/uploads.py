@@ -0,0 +1,69 @@
+# agents/uploads.py
+import os
+import uuid
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.text import get_valid_filename
+from .uploadhandlers import compute_sha256
+
+UPLOAD_DIR = 'call_recordings' # matches CallRecording.audio_file upload_to
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+class UploadOffsetMismatch(Exception):
+    pass
+
+
+def partial_path_for(filename):
+    """
+    Relative path (under MEDIA_ROOT) for the in-progress file of a new upload session.
+    """
+    return os.path.join(UPLOAD_DIR, f"{uuid.uuid4().hex}_{get_valid_filename(filename)}.part")
+
+
+def append_chunk(session, offset, stream):
+    """
+    Appends the request body to the session's partial file, reading it in small pieces.
+    The offset must equal the bytes already received, so a retried chunk can't be written twice.
+    """
+    if offset != session.received_bytes:
+        raise UploadOffsetMismatch(f"Expected offset {session.received_bytes}, got {offset}.")
+
+    path = os.path.join(settings.MEDIA_ROOT, session.partial_file)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    written = 0
+    with open(path, 'ab') as partial:
+        partial.truncate(session.received_bytes) # drop any bytes from an interrupted earlier attempt
+        for piece in iter(lambda: stream.read(COPY_CHUNK_SIZE), b''):
+            if session.received_bytes + written + len(piece) > session.total_size:
+                partial.truncate(session.received_bytes)
+                raise ValueError("Chunk exceeds the declared upload size.")
+            partial.write(piece)
+            written += len(piece)
+
+    session.received_bytes += written
+    session.save(update_fields=['received_bytes'])
+    return written
+
+
+def finalize_upload(session):
+    """
+    Verifies the completed partial file against the expected checksum and moves it into place.
+    Returns (relative path, sha256). Raises ValueError if the upload is incomplete or corrupt.
+    """
+    path = os.path.join(settings.MEDIA_ROOT, session.partial_file)
+    if session.received_bytes != session.total_size or os.path.getsize(path) != session.total_size:
+        raise ValueError(f"Upload incomplete: {session.received_bytes} of {session.total_size} bytes received.")
+
+    with open(path, 'rb') as partial:
+        digest = compute_sha256(partial)
+    if digest != session.sha256.lower():
+        # Start over; the client has to resend the file from offset 0
+        os.remove(path)
+        session.received_bytes = 0
+        session.save(update_fields=['received_bytes'])
+        raise ValueError("Checksum mismatch; the upload has been reset.")
+
+    final_name = default_storage.get_available_name(os.path.join(UPLOAD_DIR, get_valid_filename(session.filename)))
+    os.replace(path, os.path.join(settings.MEDIA_ROOT, final_name))
+    return final_name, digest
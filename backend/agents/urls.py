@@ -1,14 +1,26 @@
 # agents/urls.py
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CallRecordingViewSet, ExtractedClientInfoViewSet, ClientViewSet, get_user_status
+from .async_views import call_recording_list, extracted_info_list, user_status
+from .views import CallRecordingViewSet, ExtractedClientInfoViewSet, ClientViewSet, UploadSessionViewSet, get_user_status, get_transcript_cache_stats
 
 router = DefaultRouter()
 router.register(r'call-recordings', CallRecordingViewSet, basename='call-recording')
 router.register(r'extracted-info', ExtractedClientInfoViewSet, basename='extracted-info')
 router.register(r'clients', ClientViewSet, basename='client')
+router.register(r'uploads', UploadSessionViewSet, basename='upload')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('user-status/', get_user_status, name='user-status'),
-]
\ No newline at end of file
+    path('transcript-cache/stats/', get_transcript_cache_stats, name='transcript-cache-stats'),
+]
+
+if settings.ASYNC_READ_VIEWS_ENABLED:
+    # Listed first so they take the router's list URLs; writes still reach the ViewSets through them
+    urlpatterns = [
+        path('call-recordings/', call_recording_list, name='call-recording-list'),
+        path('extracted-info/', extracted_info_list, name='extracted-info-list'),
+        path('user-status/', user_status, name='user-status'),
+    ] + urlpatterns
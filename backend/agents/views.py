@@ -1,27 +1,90 @@
 # agents/views.py
-from rest_framework import viewsets, permissions, status
+import io
+from rest_framework import mixins, viewsets, permissions, status
 from rest_framework.decorators import action, permission_classes, api_view
 from rest_framework.response import Response
-from .models import CallRecording, ExtractedClientInfo, Client
-from .serializers import CallRecordingSerializer, ClientSerializer, ExtractedClientInfoSerializer
-from .tasks import process_call_recording_for_transcription # celery task
+from .compression import decompress_bytes, iter_decompressed
+from .models import CallRecording, ExtractedClientInfo, Client, RawLLMOutput, UploadSession
+from .serializers import BulkReviewSerializer, CallRecordingSerializer, CallRecordingListSerializer, ClientSerializer, ExtractedClientInfoSerializer, UploadSessionSerializer
+from .conditional import ConditionalGetMixin
+from .events import publish_recording_status
+from .metrics import metrics_registry, record_stage, record_stages
+from .pagination import KeysetPagination
+from .pipeline import start_recording_pipeline # celery chain: transcribe -> extract
+from .transcript_cache import cache_stats
+from .uploadhandlers import compute_sha256
+from .uploads import UploadOffsetMismatch, append_chunk, finalize_upload, partial_path_for
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.db.models import BinaryField
+from django.db.models.functions import Cast
 from django.utils import timezone
-from django.db import models
+from django.db import transaction
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class CallRecordingViewSet(viewsets.ModelViewSet):
+def call_recordings_for(user, list_rows=False):
+    """
+    Recordings a user may see (all of them for superusers), newest first. list_rows loads only
+    the columns list responses include, never the large transcripts.
+    """
+    if user.is_superuser: # Admins can see all
+        queryset = CallRecording.objects.all()
+    else:
+        queryset = CallRecording.objects.filter(uploaded_by=user)
+    if list_rows:
+        queryset = queryset.only(*CallRecordingListSerializer.Meta.fields)
+    return queryset.order_by('-upload_timestamp', '-id')
+
+
+def extracted_info_for(user):
+    """
+    Extracted info a user may see, newest recording first.
+    """
+    if user.is_superuser:
+        return ExtractedClientInfo.objects.all().order_by('-call_recording__upload_timestamp')
+    # Onboarders see records ready for review, those they have already approved/rejected, and
+    # speculative results for recordings still being transcribed (read-only until final).
+    # The OR spans a join, which no single index can serve, so each side runs as its own
+    # indexed subquery (rec_review_ready_idx, the approved_by FK index, info_speculative_idx)
+    # and the ids are unioned.
+    ready_for_review = ExtractedClientInfo.objects.filter(call_recording__status='READY_FOR_REVIEW').values('id')
+    reviewed_by_user = ExtractedClientInfo.objects.filter(approved_by=user).values('id')
+    # Speculative rows of failed recordings are deleted when they fail; the status filter also
+    # hides any left behind
+    speculative = ExtractedClientInfo.objects.filter(
+        is_speculative=True, call_recording__status__in=('TRANSCRIBING', 'TRANSCRIBED', 'EXTRACTING_INFO'),
+    ).values('id')
+    return ExtractedClientInfo.objects.filter(
+        id__in=ready_for_review.union(reviewed_by_user, speculative)
+    ).order_by('-call_recording__upload_timestamp')
+
+
+class CallRecordingViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = CallRecording.objects.all().order_by('-upload_timestamp')
     serializer_class = CallRecordingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return CallRecordingListSerializer
+        return CallRecordingSerializer
 
     def perform_create(self, serializer):
+        # Content hash is computed by Sha256UploadHandler while the upload streams in
+        audio_sha256 = getattr(self.request, 'upload_sha256', {}).get('audio_file')
+        if audio_sha256 is None:
+            audio_sha256 = compute_sha256(serializer.validated_data['audio_file'])
+
         # Ensure the user who uploads is set
-        recording = serializer.save(uploaded_by=self.request.user, status='UPLOADED')
-        # Trigger the Celery task after saving the record
-        process_call_recording_for_transcription.delay(recording.id)
+        recording = serializer.save(uploaded_by=self.request.user, status='UPLOADED', audio_sha256=audio_sha256)
+        publish_recording_status(recording)
+        # Trigger the Celery pipeline after saving the record
+        start_recording_pipeline(recording.id)
 
     # Optional: Custom action to re-process if needed
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
@@ -30,33 +93,124 @@ class CallRecordingViewSet(viewsets.ModelViewSet):
             recording = self.get_object()
             recording.status = 'REPROCESSING_TRANSCRIPTION'
             recording.save(update_fields=['status'])
-            process_call_recording_for_transcription.delay(recording.id)
+            publish_recording_status(recording)
+            start_recording_pipeline(recording.id)
             return Response({'status': 'Transcription reprocessing initiated'}, status=status.HTTP_202_ACCEPTED)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=['get'])
+    def transcript(self, request, pk=None):
+        """
+        Streams the transcript as text/plain, decompressed chunk by chunk (?compacted=true for the
+        compacted transcript). The rest of the record is not loaded.
+        """
+        recording = self.get_object()
+        if recording.transcript_data is None:
+            return Response({"detail": "No transcript for this recording yet."}, status=status.HTTP_404_NOT_FOUND)
+        return StreamingHttpResponse(iter_decompressed(recording.transcript_data), content_type='text/plain; charset=utf-8')
+
     # Filter recordings by current user
     def get_queryset(self):
-        if self.request.user.is_superuser: # Admins can see all
-            return CallRecording.objects.all().order_by('-upload_timestamp')
-        return CallRecording.objects.filter(uploaded_by=self.request.user).order_by('-upload_timestamp')
+        queryset = call_recordings_for(self.request.user, list_rows=self.action == 'list')
+        if self.action in ('retrieve', 'update', 'partial_update'):
+            # Detail responses include the transcripts, which every other query leaves deferred
+            queryset = queryset.with_transcripts()
+        elif self.action == 'transcript':
+            # The compressed bytes as stored, rather than the decompressed text the field returns
+            field = 'compacted_transcript_text' if self.request.query_params.get('compacted') == 'true' else 'transcript_text'
+            queryset = queryset.only('id').annotate(transcript_data=Cast(field, BinaryField()))
+        return queryset
     
 
 
-class ExtractedClientInfoViewSet(viewsets.ModelViewSet):
+class UploadSessionViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Resumable chunked uploads: POST to start a session, PUT each chunk to /chunk/ with an
+    Upload-Offset header, GET the session to find where to resume, then POST /finalize/.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user, partial_file=partial_path_for(serializer.validated_data['filename']))
+
+    @action(detail=True, methods=['put'])
+    def chunk(self, request, pk=None):
+        with transaction.atomic():
+            # Lock the session so two concurrent chunk requests can't both append at the same offset
+            session = self.get_queryset().select_for_update().get(pk=self.get_object().pk)
+            if session.call_recording_id:
+                return Response({"detail": "Upload already finalized."}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                offset = int(request.headers.get('Upload-Offset', ''))
+            except ValueError:
+                return Response({"detail": "Upload-Offset header is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+            try:
+                # The body is read straight from the request stream, never buffered whole
+                append_chunk(session, offset, request.stream or io.BytesIO())
+            except UploadOffsetMismatch as e:
+                return Response({"detail": str(e), "received_bytes": session.received_bytes}, status=status.HTTP_409_CONFLICT)
+            except ValueError as e:
+                return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"received_bytes": session.received_bytes}, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        with transaction.atomic():
+            session = self.get_queryset().select_for_update().get(pk=self.get_object().pk)
+            if session.call_recording_id:
+                return Response({"detail": "Upload already finalized."}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                audio_path, audio_sha256 = finalize_upload(session)
+            except ValueError as e:
+                return Response({"detail": str(e), "received_bytes": session.received_bytes}, status=status.HTTP_400_BAD_REQUEST)
+
+            recording = CallRecording.objects.create(
+                uploaded_by=request.user,
+                audio_file=audio_path,
+                status='UPLOADED',
+                audio_sha256=audio_sha256,
+            )
+            session.call_recording = recording
+            session.save(update_fields=['call_recording'])
+            transaction.on_commit(lambda: publish_recording_status(recording))
+            transaction.on_commit(lambda: start_recording_pipeline(recording.id))
+
+        serializer = CallRecordingSerializer(recording, context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class ExtractedClientInfoViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     # Only show unapproved or approved by current user, or all for superuser
     queryset = ExtractedClientInfo.objects.all().order_by('-call_recording__upload_timestamp')
     serializer_class = ExtractedClientInfoSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        if self.request.user.is_superuser:
-            return ExtractedClientInfo.objects.all().order_by('-call_recording__upload_timestamp')
-        # Onboarders see records ready for review or those they have already approved/rejected
-        return ExtractedClientInfo.objects.filter(
-            models.Q(call_recording__status='READY_FOR_REVIEW') |
-            models.Q(approved_by=self.request.user)
-        ).order_by('-call_recording__upload_timestamp')
+        queryset = extracted_info_for(self.request.user)
+        if self.action in ('approve', 'reject', 'bulk_approve', 'bulk_reject'):
+            # Review actions read and update the parent recording, but never its transcripts
+            queryset = queryset.select_related('call_recording').defer(
+                'call_recording__transcript_text', 'call_recording__compacted_transcript_text'
+            )
+        return queryset
+
+    @action(detail=True, methods=['get'])
+    def raw(self, request, pk=None):
+        """
+        The full LLM response(s) the extraction came from. Decompressed JSON goes out as stored,
+        without being parsed and re-rendered.
+        """
+        extracted_info = self.get_object()
+        raw_output = RawLLMOutput.objects.filter(extracted_info=extracted_info).first()
+        if raw_output is None:
+            return Response({"detail": "No raw LLM output stored for this record."}, status=status.HTTP_404_NOT_FOUND)
+        return HttpResponse(decompress_bytes(raw_output.data), content_type='application/json')
 
     # Custom action for approving extracted data
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
@@ -69,6 +223,8 @@ class ExtractedClientInfoViewSet(viewsets.ModelViewSet):
                 return Response({"detail": "This record is already approved."}, status=status.HTTP_400_BAD_REQUEST)
             if extracted_info.call_recording.status == 'REJECTED':
                     return Response({"detail": "This record has been rejected."}, status=status.HTTP_400_BAD_REQUEST)
+            if extracted_info.is_speculative:
+                return Response({"detail": "This recording is still being transcribed."}, status=status.HTTP_400_BAD_REQUEST)
 
 
             # Update ExtractedClientInfo fields based on request body (for corrections)
@@ -95,6 +251,8 @@ class ExtractedClientInfoViewSet(viewsets.ModelViewSet):
             # Update the parent CallRecording status
             extracted_info.call_recording.status = 'APPROVED'
             extracted_info.call_recording.save(update_fields=['status'])
+            publish_recording_status(extracted_info.call_recording)
+            record_stage(extracted_info.call_recording, 'approved')
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         except ExtractedClientInfo.DoesNotExist:
@@ -112,6 +270,8 @@ class ExtractedClientInfoViewSet(viewsets.ModelViewSet):
 
             if extracted_info.is_approved or extracted_info.call_recording.status == 'REJECTED':
                 return Response({"detail": "This record is already processed."}, status=status.HTTP_400_BAD_REQUEST)
+            if extracted_info.is_speculative:
+                return Response({"detail": "This recording is still being transcribed."}, status=status.HTTP_400_BAD_REQUEST)
 
             extracted_info.is_approved = False
             extracted_info.approved_by = request.user
@@ -121,6 +281,8 @@ class ExtractedClientInfoViewSet(viewsets.ModelViewSet):
 
             extracted_info.call_recording.status = 'REJECTED' # Mark parent call as rejected
             extracted_info.call_recording.save(update_fields=['status'])
+            publish_recording_status(extracted_info.call_recording)
+            record_stage(extracted_info.call_recording, 'rejected')
             return Response({"status": "Extracted information rejected."}, status=status.HTTP_200_OK)
 
         except ExtractedClientInfo.DoesNotExist:
@@ -129,6 +291,98 @@ class ExtractedClientInfoViewSet(viewsets.ModelViewSet):
             logger.error(f"Error rejecting extracted info {pk}: {e}", exc_info=True)
             return Response({"detail": f"An error occurred during rejection: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    # Bulk versions of approve/reject for clearing review queues in one request
+    @action(detail=False, methods=['post'], url_path='bulk-approve', permission_classes=[permissions.IsAuthenticated])
+    def bulk_approve(self, request):
+        return self._bulk_review(request, approve=True)
+
+    @action(detail=False, methods=['post'], url_path='bulk-reject', permission_classes=[permissions.IsAuthenticated])
+    def bulk_reject(self, request):
+        return self._bulk_review(request, approve=False)
+
+    def _bulk_review(self, request, approve):
+        """
+        Validates every item first, then applies all of them in one transaction: one locking
+        SELECT, one bulk_update per table and (for approvals) one bulk_create of Clients.
+        Nothing is written unless every item is valid and still awaiting review.
+        """
+        payload = BulkReviewSerializer(data=request.data)
+        payload.is_valid(raise_exception=True)
+        items = {item['id']: item for item in payload.validated_data['items']}
+        default_notes = payload.validated_data.get('review_notes', None if approve else 'Rejected by user.')
+
+        with transaction.atomic():
+            # Row locks stop two reviewers from approving the same record twice
+            records = list(
+                self.get_queryset()
+                .filter(id__in=items.keys())
+                .select_for_update(of=('self', 'call_recording'))
+            )
+
+            missing = sorted(set(items) - {record.id for record in records})
+            if missing:
+                return Response({"detail": "Extracted info not found.", "ids": missing}, status=status.HTTP_404_NOT_FOUND)
+            processed = [record.id for record in records
+                         if record.is_approved or record.call_recording.status in ('APPROVED', 'REJECTED')]
+            if processed:
+                return Response({"detail": "Some records are already processed.", "ids": processed}, status=status.HTTP_409_CONFLICT)
+            speculative = [record.id for record in records if record.is_speculative]
+            if speculative:
+                return Response({"detail": "Some recordings are still being transcribed.", "ids": speculative}, status=status.HTTP_409_CONFLICT)
+
+            errors = {}
+            now = timezone.now()
+            for record in records:
+                item = items[record.id]
+                if approve:
+                    # Per-item corrections, validated exactly like the single approve action
+                    serializer = self.get_serializer(record, data=item, partial=True)
+                    if not serializer.is_valid():
+                        errors[record.id] = serializer.errors
+                        continue
+                    for field, value in serializer.validated_data.items():
+                        setattr(record, field, value)
+                record.is_approved = approve
+                record.approved_by = request.user
+                record.approval_timestamp = now
+                record.review_notes = item.get('review_notes', default_notes if default_notes is not None else record.review_notes)
+                record.updated_at = now # bulk_update skips auto_now
+                record.call_recording.status = 'APPROVED' if approve else 'REJECTED'
+                record.call_recording.updated_at = now
+            if errors:
+                transaction.set_rollback(True)
+                return Response({"detail": "Validation failed.", "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+            ExtractedClientInfo.objects.bulk_update(
+                records,
+                ['client_name', 'company_name', 'contact_number', 'email', 'service_interest',
+                 'is_approved', 'approved_by', 'approval_timestamp', 'review_notes', 'updated_at'],
+            )
+            recordings = [record.call_recording for record in records]
+            CallRecording.objects.bulk_update(recordings, ['status', 'updated_at'])
+            record_stages([recording.id for recording in recordings], 'approved' if approve else 'rejected')
+
+            clients = []
+            if approve:
+                clients = Client.objects.bulk_create([
+                    Client(
+                        name=record.client_name,
+                        company=record.company_name,
+                        contact_number=record.contact_number,
+                        email=record.email,
+                        service_purchased=record.service_interest,
+                        original_extraction=record,
+                    )
+                    for record in records
+                ])
+
+            transaction.on_commit(lambda: [publish_recording_status(recording) for recording in recordings])
+
+        response = {'approved' if approve else 'rejected': sorted(items)}
+        if approve:
+            response['client_ids'] = [client.id for client in clients]
+        return Response(response, status=status.HTTP_200_OK)
+
 class ClientViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Client.objects.all().order_by('-onboard_date')
     serializer_class = ClientSerializer
@@ -142,4 +396,23 @@ def get_user_status(request):
         'username': user.username,
         'is_staff': user.is_staff,
         'is_superuser': user.is_superuser
-    })
\ No newline at end of file
+    })
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def get_transcript_cache_stats(request):
+    return Response(cache_stats())
+
+def prometheus_metrics(request):
+    """
+    Prometheus scrape endpoint. Plain Django view so scrapers don't need a DRF token; requests
+    must send METRICS_BEARER_TOKEN as a bearer token. Without a token configured the metrics are
+    only served with DEBUG on.
+    """
+    token = settings.METRICS_BEARER_TOKEN
+    if not token and not settings.DEBUG:
+        logger.warning("Refusing to serve /metrics: METRICS_BEARER_TOKEN is not set.")
+        return HttpResponseForbidden()
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        return HttpResponseForbidden()
+    return HttpResponse(generate_latest(metrics_registry()), content_type=CONTENT_TYPE_LATEST)
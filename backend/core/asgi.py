@@ -1 +1,25 @@
 # backend/core/asgi.py
+"""
+ASGI config for core project: plain HTTP goes to Django, WebSockets go through Channels.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+# Initialise Django before importing anything that touches models
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter
+from channels.security.websocket import AllowedHostsOriginValidator
+from agents.middleware import TokenAuthMiddlewareStack
+from agents.routing import websocket_urlpatterns
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_app,
+    'websocket': AllowedHostsOriginValidator(
+        TokenAuthMiddlewareStack(URLRouter(websocket_urlpatterns))
+    ),
+})
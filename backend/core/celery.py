@@ -1,6 +1,8 @@
 # core/celery.py
 import os
 from celery import Celery
+from kombu import Queue
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
@@ -16,6 +18,40 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks()
 
+# Each pipeline stage gets its own queue, so a burst of long transcriptions can't starve
+# the short extraction step. Run one worker pool per queue (see docker-compose.yml).
+app.conf.task_default_queue = 'celery'
+app.conf.task_queues = (
+    Queue('celery'),
+    Queue('transcribe'),
+    Queue('extract'),
+)
+app.conf.task_routes = {
+    'agents.tasks.process_call_recording_for_transcription': {'queue': 'transcribe'},
+    'agents.tasks.process_transcript_with_llm_agent': {'queue': 'extract'},
+    'agents.tasks.process_extraction_batch': {'queue': 'extract'},
+    'agents.tasks.process_partial_transcript_speculatively': {'queue': 'extract'},
+}
+
+@worker_process_init.connect
+def init_worker_clients(**kwargs):
+    # Each worker child builds its own pooled API client after the fork
+    from agents.groq_client import init_groq_client
+    init_groq_client()
+
+@worker_init.connect
+def start_worker_metrics(**kwargs):
+    # Served from the main worker process; prefork children write to PROMETHEUS_MULTIPROC_DIR
+    from django.conf import settings
+    if settings.WORKER_METRICS_PORT:
+        from agents.metrics import start_metrics_server
+        start_metrics_server(settings.WORKER_METRICS_PORT)
+
+@worker_process_shutdown.connect
+def mark_worker_metrics_dead(pid=None, **kwargs):
+    from agents.metrics import mark_process_dead
+    mark_process_dead(pid or os.getpid())
+
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
\ No newline at end of file
@@ -38,6 +38,7 @@ ALLOWED_HOSTS = []
 # Application definition
 
 INSTALLED_APPS = [
+    'daphne', # ASGI runserver (HTTP + WebSockets); must come before staticfiles
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -51,6 +52,7 @@ INSTALLED_APPS = [
     # Third-party apps
     'rest_framework',
     'rest_framework.authtoken', # For TokenAuthentication
+    'channels', # WebSocket status push
 
     # My apps
     'agents',
@@ -85,6 +87,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'core.wsgi.application'
+ASGI_APPLICATION = 'core.asgi.application'
 
 
 # Database
@@ -170,4 +173,143 @@ CELERY_TASK_TRACK_STARTED = True # Track task status more granularly
 # Allow frontend to send requests
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",  # Your React app's local development server
-]
\ No newline at end of file
+]
+
+# Chunked transcription: recordings longer than one chunk are split into overlapping
+# segments and transcribed concurrently, then stitched back together
+TRANSCRIPTION_CHUNKING_ENABLED = os.getenv('TRANSCRIPTION_CHUNKING_ENABLED', 'True') == 'True'
+TRANSCRIPTION_CHUNK_SECONDS = int(os.getenv('TRANSCRIPTION_CHUNK_SECONDS', 600))
+TRANSCRIPTION_CHUNK_OVERLAP_SECONDS = int(os.getenv('TRANSCRIPTION_CHUNK_OVERLAP_SECONDS', 5))
+TRANSCRIPTION_MAX_CONCURRENCY = int(os.getenv('TRANSCRIPTION_MAX_CONCURRENCY', 4))
+
+# Redis database for application state (cache counters etc.), separate from the Celery broker/results
+REDIS_URL = os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/2')
+
+# Hash uploads while they stream in, then fall back to Django's default memory/temp-file handlers
+FILE_UPLOAD_HANDLERS = [
+    'agents.uploadhandlers.Sha256UploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Transcript cache keyed by (audio hash, STT model); least recently used entries are evicted past this size
+TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.getenv('TRANSCRIPT_CACHE_MAX_ENTRIES', 5000))
+
+# Pooled Groq client shared by all tasks in a worker process (see agents/groq_client.py)
+GROQ_HTTP2 = os.getenv('GROQ_HTTP2', 'True') == 'True'
+GROQ_MAX_CONNECTIONS = int(os.getenv('GROQ_MAX_CONNECTIONS', 20))
+GROQ_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('GROQ_MAX_KEEPALIVE_CONNECTIONS', 10))
+GROQ_KEEPALIVE_EXPIRY = float(os.getenv('GROQ_KEEPALIVE_EXPIRY', 60))
+GROQ_TIMEOUT = float(os.getenv('GROQ_TIMEOUT', 120))
+GROQ_CONNECT_TIMEOUT = float(os.getenv('GROQ_CONNECT_TIMEOUT', 10))
+GROQ_SDK_MAX_RETRIES = int(os.getenv('GROQ_SDK_MAX_RETRIES', 0))
+# Point Django, Celery and the benchmarks at another Groq-compatible server, e.g. the local
+# stub from `manage.py run_groq_stub` for load tests. Empty = the real API.
+GROQ_BASE_URL = os.getenv('GROQ_BASE_URL') or None
+
+# Cluster-wide Groq rate limiting shared by all workers through Redis (see agents/rate_limit.py).
+# Set the budgets to the account's limits; calls wait for budget up to GROQ_RATE_LIMIT_MAX_WAIT (the chunks of a
+# long recording also as long as the recording's own audio takes to earn).
+GROQ_RATE_LIMIT_ENABLED = os.getenv('GROQ_RATE_LIMIT_ENABLED', 'True') == 'True'
+GROQ_AUDIO_SECONDS_PER_HOUR = float(os.getenv('GROQ_AUDIO_SECONDS_PER_HOUR', 7200))
+GROQ_LLM_TOKENS_PER_MINUTE = float(os.getenv('GROQ_LLM_TOKENS_PER_MINUTE', 30000))
+GROQ_RATE_LIMIT_BURST_SECONDS = float(os.getenv('GROQ_RATE_LIMIT_BURST_SECONDS', 60)) # bucket size, in seconds of budget
+GROQ_RATE_LIMIT_MAX_WAIT = float(os.getenv('GROQ_RATE_LIMIT_MAX_WAIT', 60))
+# Adaptive (AIMD) limit on concurrent Groq calls per kind (audio / LLM), across all workers
+GROQ_CONCURRENCY_START = float(os.getenv('GROQ_CONCURRENCY_START', 4))
+GROQ_CONCURRENCY_MIN = float(os.getenv('GROQ_CONCURRENCY_MIN', 1))
+GROQ_CONCURRENCY_MAX = float(os.getenv('GROQ_CONCURRENCY_MAX', 32))
+GROQ_CONCURRENCY_INCREASE_INTERVAL = float(os.getenv('GROQ_CONCURRENCY_INCREASE_INTERVAL', 1))
+GROQ_CONCURRENCY_DECREASE_COOLDOWN = float(os.getenv('GROQ_CONCURRENCY_DECREASE_COOLDOWN', 5))
+GROQ_CONCURRENCY_DECREASE_FACTOR = float(os.getenv('GROQ_CONCURRENCY_DECREASE_FACTOR', 0.75))
+GROQ_LLM_LATENCY_TARGET_SECONDS = float(os.getenv('GROQ_LLM_LATENCY_TARGET_SECONDS', 15))
+GROQ_AUDIO_LATENCY_TARGET_RATIO = float(os.getenv('GROQ_AUDIO_LATENCY_TARGET_RATIO', 0.25)) # seconds per audio second
+# Celery retries for transient Groq errors: exponential backoff from GROQ_RETRY_BACKOFF seconds, full jitter
+GROQ_RETRY_MAX = int(os.getenv('GROQ_RETRY_MAX', 6))
+GROQ_RETRY_BACKOFF = int(os.getenv('GROQ_RETRY_BACKOFF', 2))
+GROQ_RETRY_BACKOFF_MAX = int(os.getenv('GROQ_RETRY_BACKOFF_MAX', 300))
+
+# Channels: WebSocket status events fan out through Redis so Celery workers can publish them
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'CONFIG': {
+            'hosts': [os.getenv('CHANNEL_LAYER_REDIS_URL', 'redis://127.0.0.1:6379/3')],
+        },
+    },
+}
+
+# Opt-in micro-batching of LLM extraction: short transcripts are collected for up to
+# LLM_BATCH_WINDOW_SECONDS (or LLM_BATCH_MAX_ITEMS) and extracted in a single request
+LLM_BATCHING_ENABLED = os.getenv('LLM_BATCHING_ENABLED', 'False') == 'True'
+LLM_BATCH_MAX_ITEMS = int(os.getenv('LLM_BATCH_MAX_ITEMS', 8))
+LLM_BATCH_WINDOW_SECONDS = int(os.getenv('LLM_BATCH_WINDOW_SECONDS', 5))
+LLM_BATCH_MAX_TRANSCRIPT_CHARS = int(os.getenv('LLM_BATCH_MAX_TRANSCRIPT_CHARS', 1500)) # roughly a one minute call
+
+# LLM extraction budget. llama3-8b-8192 has an 8192 token context shared by prompt and output,
+# so transcripts estimated above EXTRACTION_WINDOW_TOKENS are split into overlapping windows,
+# extracted in parallel and merged (see agents/extraction.py)
+EXTRACTION_MAX_OUTPUT_TOKENS = int(os.getenv('EXTRACTION_MAX_OUTPUT_TOKENS', 1024))
+EXTRACTION_WINDOW_TOKENS = int(os.getenv('EXTRACTION_WINDOW_TOKENS', 6000))
+EXTRACTION_WINDOW_OVERLAP_TOKENS = int(os.getenv('EXTRACTION_WINDOW_OVERLAP_TOKENS', 200))
+EXTRACTION_MAX_CONCURRENCY = int(os.getenv('EXTRACTION_MAX_CONCURRENCY', 4))
+
+# Local regex pre-extraction of contact_number/email before the LLM (see agents/preextract.py).
+# Fields in PRE_EXTRACTION_SKIP_LLM_FIELDS that were found locally (one cued, unambiguous match) are
+# left out of the LLM prompt and tool schema and take the local value; empty asks the LLM for every
+# field and lets its value win.
+# PRE_EXTRACTION_SKIP_LLM_RULES skips the LLM when all fields of any rule were found locally:
+# rules separated by ';', fields by ',' - e.g. 'contact_number,email'. Empty never skips.
+PRE_EXTRACTION_ENABLED = os.getenv('PRE_EXTRACTION_ENABLED', 'True') == 'True'
+PRE_EXTRACTION_SKIP_LLM_FIELDS = os.getenv('PRE_EXTRACTION_SKIP_LLM_FIELDS', 'contact_number,email')
+PRE_EXTRACTION_SKIP_LLM_RULES = os.getenv('PRE_EXTRACTION_SKIP_LLM_RULES', '')
+
+# Transcript compaction before extraction (see agents/compaction.py). When
+# TRANSCRIPT_COMPACTION_ENTITY_CONTEXT_SENTENCES is set, only sentences that look like they mention
+# a client detail are kept, plus that many neighbours on each side.
+TRANSCRIPT_COMPACTION_ENABLED = os.getenv('TRANSCRIPT_COMPACTION_ENABLED', 'True') == 'True'
+TRANSCRIPT_COMPACTION_ENTITY_CONTEXT_SENTENCES = (
+    int(os.environ['TRANSCRIPT_COMPACTION_ENTITY_CONTEXT_SENTENCES'])
+    if os.getenv('TRANSCRIPT_COMPACTION_ENTITY_CONTEXT_SENTENCES') else None
+)
+
+# Audio normalisation before transcription (see agents/audio_normalisation.py): decode to 16 kHz
+# mono, drop leading/trailing silence, shorten internal silences to AUDIO_MAX_SILENCE_SECONDS and
+# encode as AUDIO_NORMALISED_FORMAT ('ogg' = Opus at AUDIO_NORMALISED_BITRATE, or 'flac').
+# Frames below AUDIO_SILENCE_THRESHOLD_DB (dBFS) always count as silence.
+AUDIO_NORMALISATION_ENABLED = os.getenv('AUDIO_NORMALISATION_ENABLED', 'True') == 'True'
+AUDIO_SILENCE_THRESHOLD_DB = float(os.getenv('AUDIO_SILENCE_THRESHOLD_DB', -40))
+AUDIO_MAX_SILENCE_SECONDS = float(os.getenv('AUDIO_MAX_SILENCE_SECONDS', 1.0))
+AUDIO_SILENCE_PADDING_SECONDS = float(os.getenv('AUDIO_SILENCE_PADDING_SECONDS', 0.2))
+AUDIO_NORMALISED_FORMAT = os.getenv('AUDIO_NORMALISED_FORMAT', 'ogg')
+AUDIO_NORMALISED_BITRATE = os.getenv('AUDIO_NORMALISED_BITRATE', '24k')
+
+# Incremental transcription (opt-in): recordings are transcribed in INCREMENTAL_SEGMENT_SECONDS
+# segments, in time order, and transcript_text/transcribed_seconds are saved and published after
+# each one. Once SPECULATIVE_EXTRACTION_AFTER_SECONDS are transcribed (and more audio remains), a
+# speculative extraction runs on the partial transcript; the final extraction reconciles it. 0 = never.
+INCREMENTAL_TRANSCRIPTION_ENABLED = os.getenv('INCREMENTAL_TRANSCRIPTION_ENABLED', 'False') == 'True'
+INCREMENTAL_SEGMENT_SECONDS = int(os.getenv('INCREMENTAL_SEGMENT_SECONDS', 120))
+SPECULATIVE_EXTRACTION_AFTER_SECONDS = int(os.getenv('SPECULATIVE_EXTRACTION_AFTER_SECONDS', 300))
+
+# Redis cache of LLM extraction results keyed by (prompt transcript hash, model, PROMPT_VERSION in
+# agents/tasks.py). Entries expire LLM_CACHE_TTL_SECONDS after last use; least recently used ones
+# are evicted past LLM_CACHE_MAX_ENTRIES.
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'True') == 'True'
+LLM_CACHE_TTL_SECONDS = int(os.getenv('LLM_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', 20000))
+
+# Prometheus metrics (see agents/metrics.py). Django serves them at /metrics to requests bearing
+# METRICS_BEARER_TOKEN; with it unset /metrics answers 403 unless DEBUG is on. Celery workers serve
+# theirs, unauthenticated, on WORKER_METRICS_PORT (0 = off), so keep that port off public networks.
+# Prefork workers also need PROMETHEUS_MULTIPROC_DIR pointing at a writable, per-worker directory.
+METRICS_BEARER_TOKEN = os.getenv('METRICS_BEARER_TOKEN', '')
+WORKER_METRICS_PORT = int(os.getenv('WORKER_METRICS_PORT', 0))
+
+# Serve GET call-recordings/, extracted-info/ and user-status/ (what every open dashboard polls)
+# from the async views in agents/async_views.py. They pay off under an ASGI server (gunicorn with
+# uvicorn workers, see gunicorn.conf.py); set False when serving WSGI so the DRF views answer directly.
+ASYNC_READ_VIEWS_ENABLED = os.getenv('ASYNC_READ_VIEWS_ENABLED', 'True') == 'True'
+# Every request in flight in an async view holds its own database connection, so each worker process
+# serves at most this many at once and queues the rest. Keep workers x this below Postgres' max_connections.
+ASYNC_READ_VIEWS_MAX_DB_CONNECTIONS = int(os.getenv('ASYNC_READ_VIEWS_MAX_DB_CONNECTIONS', 10))
@@ -4,12 +4,14 @@ from rest_framework.authtoken import views # import views for token authenticati
 from django.conf import settings
 from django.conf.urls.static import static
 from django.core.asgi import get_asgi_application
+from agents.views import prometheus_metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api-auth/', include('rest_framework.urls')), # for login/logout in browsable API
     path('api/token/', views.obtain_auth_token), # endpoint to get auth token
     path('api/', include('agents.urls')), # including agents' urls
+    path('metrics', prometheus_metrics, name='metrics'), # Prometheus scrape endpoint
 ]
 
 if settings.DEBUG:
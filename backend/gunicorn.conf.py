@@ -0,0 +1,27 @@
+# backend/gunicorn.conf.py
+# Web server settings: `gunicorn core.asgi:application -c gunicorn.conf.py`. Uvicorn workers serve
+# ASGI, so each process handles the REST API (sync DRF views and the async read views) and the
+# status WebSocket; gunicorn adds several of them and restarts any that die.
+import glob
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', 4))
+worker_class = 'uvicorn_worker.UvicornWorker'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120)) # uploads of long recordings can take a while
+graceful_timeout = 30
+keepalive = 5 # dashboards poll over the same connection
+
+
+def on_starting(server):
+    # Metrics files left by a previous run would be counted again (see agents/metrics.py)
+    multiprocess_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if multiprocess_dir:
+        for path in glob.glob(os.path.join(multiprocess_dir, '*.db')):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -7,20 +7,29 @@ function Dashboard() {
     const [file, setFile] = useState(null);
     const [uploadStatus, setUploadStatus] = useState('');
     const [calls, setCalls] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [isLoading, setIsLoading] = useState(true);
     const [selectedCallDetails, setSelectedCallDetails] = useState(null);
     const [extractedData, setExtractedData] = useState({});
     
     const navigate = useNavigate();
 
-    // Polling function to fetch all call recordings from the backend
+    // Polling function to fetch the newest page of call recordings from the backend
     const fetchCalls = async () => {
         try {
             const token = localStorage.getItem('token');
             const response = await axios.get('http://127.0.0.1:8000/api/call-recordings/', {
                 headers: { Authorization: `Token ${token}` },
             });
-            setCalls(response.data);
+            const firstPage = response.data.results;
+            // Refresh the newest rows but keep any older pages already loaded with "Load more"
+            setCalls(prevCalls => {
+                const firstPageIds = new Set(firstPage.map(call => call.id));
+                const oldestOnPage = firstPage.length ? firstPage[firstPage.length - 1].id : null;
+                const olderCalls = prevCalls.filter(call => !firstPageIds.has(call.id) && oldestOnPage !== null && call.id < oldestOnPage);
+                return [...firstPage, ...olderCalls];
+            });
+            setNextCursor(prevCursor => prevCursor ?? response.data.next_cursor);
             setIsLoading(false);
         } catch (error) {
             console.error('Failed to fetch call recordings:', error);
@@ -31,15 +40,82 @@ function Dashboard() {
         }
     };
 
+    // Status changes are pushed over a WebSocket instead of polling the REST API
     useEffect(() => {
         fetchCalls();
-        const interval = setInterval(() => {
-            fetchCalls();
-        }, 5000); 
 
-        return () => clearInterval(interval);
+        let socket = null;
+        let reconnectTimer = null;
+        let closedByUs = false;
+
+        const connect = () => {
+            const token = localStorage.getItem('token');
+            socket = new WebSocket(`ws://127.0.0.1:8000/ws/call-status/?token=${token}`);
+
+            socket.onmessage = (event) => {
+                const message = JSON.parse(event.data);
+                if (message.type !== 'recording.status') return;
+                // Incremental transcription also sends progress and the newly transcribed text
+                const progress = message.transcribed_seconds !== undefined
+                    ? { transcribed_seconds: message.transcribed_seconds }
+                    : {};
+                setCalls(prevCalls => {
+                    if (!prevCalls.some(call => call.id === message.recording_id)) {
+                        fetchCalls(); // a recording we haven't listed yet
+                        return prevCalls;
+                    }
+                    return prevCalls.map(call =>
+                        call.id === message.recording_id ? { ...call, status: message.status, ...progress } : call
+                    );
+                });
+                setSelectedCallDetails(prevDetails =>
+                    prevDetails && prevDetails.id === message.recording_id
+                        ? {
+                            ...prevDetails,
+                            status: message.status,
+                            ...progress,
+                            ...(message.transcript_appended && {
+                                transcript_text: [prevDetails.transcript_text, message.transcript_appended].filter(Boolean).join(' '),
+                            }),
+                        }
+                        : prevDetails
+                );
+            };
+
+            socket.onclose = () => {
+                if (closedByUs) return;
+                // Catch up on anything missed while disconnected, then reconnect
+                reconnectTimer = setTimeout(() => {
+                    fetchCalls();
+                    connect();
+                }, 3000);
+            };
+        };
+
+        connect();
+
+        return () => {
+            closedByUs = true;
+            clearTimeout(reconnectTimer);
+            if (socket) socket.close();
+        };
     }, []);
 
+    const fetchMoreCalls = async () => {
+        if (!nextCursor) return;
+        try {
+            const token = localStorage.getItem('token');
+            const response = await axios.get('http://127.0.0.1:8000/api/call-recordings/', {
+                headers: { Authorization: `Token ${token}` },
+                params: { cursor: nextCursor },
+            });
+            setCalls(prevCalls => [...prevCalls, ...response.data.results]);
+            setNextCursor(response.data.next_cursor);
+        } catch (error) {
+            console.error('Failed to fetch more call recordings:', error);
+        }
+    };
+
     const handleFileChange = (e) => {
         setFile(e.target.files[0]);
         setUploadStatus('');
@@ -162,7 +238,11 @@ function Dashboard() {
                                         onClick={() => handleSelectCall(call.id)} 
                                         className={`list-item ${selectedCallDetails?.id === call.id ? 'selected' : ''}`}
                                     >
-                                        <p>Call ID: {call.id} - Status: {call.status}</p>
+                                        <p>
+                                            Call ID: {call.id} - Status: {call.status}
+                                            {call.status === 'TRANSCRIBING' && call.transcribed_seconds != null &&
+                                                ` (${Math.round(call.transcribed_seconds)}s transcribed)`}
+                                        </p>
                                     </li>
                                 ))
                             ) : (
@@ -170,6 +250,11 @@ function Dashboard() {
                             )}
                         </ul>
                     )}
+                    {nextCursor && (
+                        <button onClick={fetchMoreCalls} className="btn btn-secondary">
+                            Load more
+                        </button>
+                    )}
                 </div>
             </div>
 